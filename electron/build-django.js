@@ -320,9 +320,16 @@ def _run_management_command(execute, command: Sequence[str]) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run the bundled Django server")
-    parser.add_argument("--port", required=True)
+    parser.add_argument("--port")
     parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run the inspector task workers instead of the web server.",
+    )
     args = parser.parse_args()
+    if not args.worker and not args.port:
+        parser.error("--port is required unless --worker is given")
 
     bundle_root = Path(__file__).resolve().parent
     src_root = bundle_root / "src"
@@ -340,6 +347,11 @@ def main() -> None:
 
     os.chdir(bundle_root)
 
+    if args.worker:
+        worker_command = ["manage.py", "run_inspector_workers"]
+        _run_management_command(execute_from_command_line, worker_command)
+        return
+
     migrate_command = ["manage.py", "migrate", "--noinput"]
     _run_management_command(execute_from_command_line, migrate_command)
 
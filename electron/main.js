@@ -10,6 +10,7 @@ const BUNDLE_RUNNER = path.join(DJANGO_BUNDLE_DIR, 'run_django.py');
 
 let mainWindow;
 let djangoProcess;
+let workerProcess;
 let djangoPort;
 let getPortModule;
 
@@ -186,9 +187,11 @@ async function startDjango() {
       }
     });
 
-    // Wait for Django to be ready
+    // Wait for Django to be ready (migrations have run by now)
     await waitForDjango();
 
+    startTaskWorkers(pythonInfo.interpreter, isBundled, managePyPath, djangoCwd, djangoEnv);
+
     // Create the Electron window
     createWindow();
   } catch (error) {
@@ -197,11 +200,43 @@ async function startDjango() {
   }
 }
 
+/**
+ * Launch the django-tasks workers that execute queued task runs.
+ * Runs next to the web server so POST /api/task-runs/ returns immediately.
+ */
+function startTaskWorkers(interpreter, isBundled, managePyPath, cwd, env) {
+  const workerArgs = isBundled
+    ? [BUNDLE_RUNNER, '--worker']
+    : [managePyPath, 'run_inspector_workers'];
+
+  workerProcess = spawn(interpreter, workerArgs, { cwd, env });
+
+  workerProcess.stdout.on('data', (data) => {
+    console.log(`Workers: ${data.toString().trim()}`);
+  });
+
+  workerProcess.stderr.on('data', (data) => {
+    console.error(`Workers: ${data.toString().trim()}`);
+  });
+
+  workerProcess.on('error', (error) => {
+    console.error('Failed to start task workers:', error);
+  });
+
+  workerProcess.on('close', (code) => {
+    console.log(`Task worker supervisor exited with code ${code}`);
+    workerProcess = null;
+  });
+}
+
 /**
  * Kill Django process and quit the app
  * Used for startup failures before app is fully ready
  */
 function killDjangoAndQuit() {
+  if (workerProcess) {
+    workerProcess.kill('SIGTERM');
+  }
   if (djangoProcess) {
     console.log('Terminating Django process...');
     djangoProcess.kill('SIGTERM');
@@ -276,6 +311,10 @@ function createWindow() {
 
 // Cleanup on quit
 app.on('before-quit', () => {
+  if (workerProcess) {
+    console.log('Shutting down task workers...');
+    workerProcess.kill('SIGTERM');
+  }
   if (djangoProcess) {
     console.log('Shutting down Django server...');
     djangoProcess.kill('SIGTERM');
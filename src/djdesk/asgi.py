@@ -2,6 +2,8 @@
 ASGI config for djdesk project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; ``/ws/…`` WebSocket connections are routed to the
+inspector consumers via Channels.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -13,4 +15,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djdesk.settings.production")
 
-application = get_asgi_application()
+# Initialize Django before importing consumers so the app registry is ready.
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from djdesk.inspector.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter(
+    {
+        "http": django_asgi_app,
+        "websocket": AllowedHostsOriginValidator(
+            AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+        ),
+    }
+)
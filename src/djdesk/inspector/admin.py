@@ -3,6 +3,7 @@ from django.contrib import admin
 from .models import (
     DocLink,
     ScanJob,
+    TaskPipelineRun,
     TaskPreset,
     Workspace,
     WorkspaceTaskRun,
@@ -38,6 +39,13 @@ class WorkspaceTaskRunAdmin(admin.ModelAdmin):
     search_fields = ("workspace__name", "preset__label")
 
 
+@admin.register(TaskPipelineRun)
+class TaskPipelineRunAdmin(admin.ModelAdmin):
+    list_display = ("workspace", "label", "status", "created_at", "completed_at")
+    list_filter = ("status", "key")
+    search_fields = ("workspace__name", "label")
+
+
 @admin.register(DocLink)
 class DocLinkAdmin(admin.ModelAdmin):
     list_display = ("title", "stage", "url")
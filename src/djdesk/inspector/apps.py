@@ -7,5 +7,5 @@ class InspectorConfig(AppConfig):
     verbose_name = "DJDesk Project Inspector"
 
     def ready(self) -> None:  # pragma: no cover - import side effects
-        # Import the django-tasks definitions so they are registered.
-        from . import tasks  # noqa: F401
+        # Import the django-tasks definitions and signal receivers so they are registered.
+        from . import signals, tasks  # noqa: F401
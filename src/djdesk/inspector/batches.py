@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from django.db import transaction
+
+from .models import TaskPreset, Workspace, WorkspaceTaskRun
+from .scheduler import task_priority
+from .tasks import enqueue_task_run
+
+# Fan-out runs queue one step below the preset's own priority, so a run started by hand
+# still goes first. Presets at priority 0 thereby count as bulk work for the scheduler.
+BATCH_PRIORITY_OFFSET = 1
+FINISHED_STATUSES = {
+    WorkspaceTaskRun.Status.SUCCEEDED,
+    WorkspaceTaskRun.Status.FAILED,
+    WorkspaceTaskRun.Status.CANCELLED,
+}
+
+
+def create_task_batch(
+    preset: TaskPreset,
+    workspaces: Iterable[Workspace],
+    *,
+    requested_by: str = "inspector",
+    force_refresh: bool = False,
+) -> str:
+    """
+    Queue one run of ``preset`` per workspace and return the batch ID.
+
+    The rows are inserted with a single ``bulk_create`` and handed to the task backend, whose
+    worker pool and scheduler caps bound how many of them execute at once.
+    """
+
+    batch_id = uuid.uuid4().hex
+    with transaction.atomic():
+        runs = WorkspaceTaskRun.objects.bulk_create(
+            WorkspaceTaskRun(
+                workspace=workspace,
+                preset=preset,
+                requested_by=requested_by,
+                metadata={"batch": batch_id, "notes": "", "force_refresh": force_refresh},
+            )
+            for workspace in workspaces
+        )
+    priority = task_priority(preset) - BATCH_PRIORITY_OFFSET
+    for run in runs:
+        try:
+            result = enqueue_task_run(run, priority=priority)
+        except Exception:
+            run.status = WorkspaceTaskRun.Status.FAILED
+            run.append_log("Unable to enqueue task; please try again later.")
+            run.flush_log_buffer()
+            run.save(update_fields=["status"])
+            continue
+        WorkspaceTaskRun.objects.filter(pk=run.pk).update(result_id=result.id)
+    return batch_id
+
+
+def task_batch_summary(batch_id: str) -> dict[str, Any] | None:
+    """Aggregate exit codes, durations, and failures of a batch; ``None`` if it is unknown."""
+    runs = list(
+        WorkspaceTaskRun.objects.filter(metadata__batch=batch_id)
+        .select_related("workspace", "preset")
+        .order_by("workspace__slug")
+    )
+    if not runs:
+        return None
+
+    rows = []
+    durations = []
+    failures = []
+    exit_codes: Counter[str] = Counter()
+    for run in runs:
+        command = (run.metadata or {}).get("command", {})
+        exit_code = command.get("exit_code")
+        duration = command.get("duration_seconds")
+        row = {
+            "id": run.pk,
+            "workspace": run.workspace.slug,
+            "status": run.status,
+            "exit_code": exit_code,
+            "duration_seconds": duration,
+        }
+        rows.append(row)
+        if exit_code is not None:
+            exit_codes[str(exit_code)] += 1
+        if duration is not None:
+            durations.append(duration)
+        if run.status in {WorkspaceTaskRun.Status.FAILED, WorkspaceTaskRun.Status.CANCELLED}:
+            error = command.get("error") or (run.log_tail[-1] if run.log_tail else "")
+            failures.append({**row, "error": error})
+
+    statuses = Counter(run.status for run in runs)
+    finished = sum(count for status, count in statuses.items() if status in FINISHED_STATUSES)
+    return {
+        "batch": batch_id,
+        "preset": runs[0].preset.key,
+        "total": len(runs),
+        "finished": finished,
+        "done": finished == len(runs),
+        "statuses": dict(statuses),
+        "exit_codes": dict(exit_codes),
+        "duration_seconds": {
+            "total": round(sum(durations), 3),
+            "avg": round(sum(durations) / len(durations), 3) if durations else None,
+            "max": round(max(durations), 3) if durations else None,
+        },
+        "failures": failures,
+        "runs": rows,
+    }
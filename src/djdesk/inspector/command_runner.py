@@ -1,17 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
 import shlex
-import subprocess
-import threading
+import shutil
+import signal
+import sys
 import time
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
-from queue import Empty, Queue
-from typing import Callable
+from typing import Any
 
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 
+from . import output_parsers
+from .output_parsers import OutputParser
+
+LAUNCHER_PATH = Path(__file__).with_name("rusage_launcher.py")
+# Largest single output line buffered before the reader gives up on finding a newline.
+STREAM_LINE_LIMIT = 1024 * 1024
+# How long to keep draining output after a timed-out command was killed (grandchildren
+# may still hold the pipe open).
+DRAIN_AFTER_KILL_SECONDS = 2.0
+# How often ``tick_callback`` runs while a command is active (lets callers flush on a timer).
+TICK_SECONDS = 0.1
+
 
 class CommandExecutionError(Exception):
     """Raised when a workspace command cannot be executed."""
@@ -30,6 +46,25 @@ class CommandResult:
     output_lines: int
     safe_prefix: str
     timed_out: bool = False
+    warm: bool = False
+    cancelled: bool = False
+    # CPU, peak memory, block I/O, and context switches; ``None`` when not measured.
+    resources: dict[str, float | int] | None = None
+    # Structured output by parser kind (``showmigrations``, ``check``, …); see output_parsers.
+    parsed: dict[str, Any] | None = None
+
+
+@dataclass(slots=True)
+class CommandSpec:
+    """One command for ``run_commands`` to supervise."""
+
+    command: str
+    workspace_path: str
+    timeout: float
+    log_callback: Callable[[str], None]
+    safe_prefix: str | None = None
+    tick_callback: Callable[[], bool | None] | None = None
+    parsers: Sequence[OutputParser] = ()
 
 
 def _normalize_command(command: str) -> str:
@@ -71,90 +106,252 @@ def _resolve_workspace_path(raw_path: str) -> Path:
     return resolved
 
 
-def run_command(
-    *,
-    command: str,
-    workspace_path: str,
-    timeout: float,
-    log_callback: Callable[[str], None],
-    safe_prefix: str | None = None,
-) -> CommandResult:
-    """
-    Execute ``command`` inside ``workspace_path`` streaming output to ``log_callback``.
-    """
-
-    safe_prefix = safe_prefix or validate_safe_command(command)
-    workdir = _resolve_workspace_path(workspace_path)
+def command_env() -> dict[str, str]:
+    """Environment for workspace commands: unbuffered output, the project's own settings."""
     env = os.environ.copy()
     env.setdefault("PYTHONUNBUFFERED", "1")
+    # djdesk's settings module would otherwise shadow the one the project's manage.py selects.
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    return env
+
 
+def kill_process_group(pid: int) -> None:
+    """SIGKILL the process group led by ``pid`` (commands run in their own session)."""
+    if not hasattr(os, "killpg"):  # pragma: no cover - Windows
+        return
     try:
-        args = shlex.split(command)
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def resource_usage(raw: dict[str, float]) -> dict[str, float | int]:
+    """Normalize ``getrusage`` fields; ``ru_maxrss`` is bytes on macOS and KiB elsewhere."""
+    max_rss = raw["ru_maxrss"] // 1024 if sys.platform == "darwin" else raw["ru_maxrss"]
+    return {
+        "user_cpu_seconds": round(raw["ru_utime"], 3),
+        "system_cpu_seconds": round(raw["ru_stime"], 3),
+        "max_rss_kb": int(max_rss),
+        "block_input_ops": int(raw["ru_inblock"]),
+        "block_output_ops": int(raw["ru_oublock"]),
+        "voluntary_context_switches": int(raw["ru_nvcsw"]),
+        "involuntary_context_switches": int(raw["ru_nivcsw"]),
+    }
+
+
+def _with_launcher(
+    args: list[str], workdir: Path, env: dict[str, str]
+) -> tuple[list[str], tuple[int, int]]:
+    """Wrap ``args`` in ``rusage_launcher.py``; also returns the (read, write) report pipe."""
+    executable = args[0]
+    if os.sep in executable:
+        found = os.access(workdir / executable, os.X_OK)
+    else:
+        found = shutil.which(executable, path=env.get("PATH")) is not None
+    if not found:
+        # Keep failing like a direct exec would, instead of a launcher exit status.
+        raise CommandExecutionError(f"Unable to start command: {executable!r} not found.")
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    return [sys.executable, str(LAUNCHER_PATH), str(write_fd), *args], (read_fd, write_fd)
+
+
+def _read_usage_report(read_fd: int) -> dict[str, float | int] | None:
+    try:
+        data = os.read(read_fd, 4096)
+    except BlockingIOError:  # launcher killed before reporting
+        return None
+    try:
+        return resource_usage(json.loads(data)) if data else None
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _prepare(spec: CommandSpec) -> tuple[list[str], Path, str]:
+    safe_prefix = spec.safe_prefix or validate_safe_command(spec.command)
+    workdir = _resolve_workspace_path(spec.workspace_path)
+    try:
+        args = shlex.split(spec.command)
     except ValueError as exc:
         raise CommandExecutionError("Unable to parse command string.") from exc
+    return args, workdir, safe_prefix
+
+
+async def run_command_async(spec: CommandSpec) -> CommandResult:
+    """
+    Run ``spec`` on the current event loop, delivering each output line as soon as it is read.
+
+    ``log_callback`` is synchronous (it usually writes to the database), so it is invoked
+    through ``sync_to_async`` and runs in the thread that entered the loop via
+    ``async_to_sync``. ``parsers`` see every line first, right on the loop: they only
+    update in-memory state, so there is no second pass over the stored log afterwards.
+    """
+
+    args, workdir, safe_prefix = _prepare(spec)
+    env = command_env()
+    log_callback = sync_to_async(spec.log_callback)
+    report_fds: tuple[int, int] | None = None
+    if settings.INSPECTOR_TASK_RESOURCE_ACCOUNTING and hasattr(os, "wait4"):
+        args, report_fds = _with_launcher(args, workdir, env)
 
     start = time.monotonic()
     try:
-        process = subprocess.Popen(
-            args,
+        process = await asyncio.create_subprocess_exec(
+            *args,
             cwd=str(workdir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
             env=env,
+            limit=STREAM_LINE_LIMIT,
+            # Own process group, so timeouts and cancellation also reap grandchildren.
+            start_new_session=True,
+            pass_fds=report_fds[1:] if report_fds else (),
         )
     except OSError as exc:
+        if report_fds:
+            os.close(report_fds[0])
         raise CommandExecutionError(f"Unable to start command: {exc}") from exc
+    finally:
+        if report_fds:
+            os.close(report_fds[1])
 
-    queue: Queue[str] = Queue()
+    timed_out = cancelled = False
+    output_lines = 0
 
-    def _reader() -> None:
-        assert process.stdout is not None
-        for raw_line in process.stdout:
-            queue.put(raw_line)
-        process.stdout.close()
+    async def _pump_output(stream: asyncio.StreamReader) -> None:
+        nonlocal output_lines
+        while True:
+            try:
+                raw_line = await stream.readline()
+            except ValueError:
+                # Line longer than STREAM_LINE_LIMIT: deliver what is buffered as one line.
+                raw_line = await stream.read(STREAM_LINE_LIMIT)
+            if not raw_line:
+                return
+            line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+            output_parsers.feed(spec.parsers, line)
+            await log_callback(line)
+            output_lines += 1
 
-    reader = threading.Thread(target=_reader, daemon=True)
-    reader.start()
+    def _kill() -> None:
+        if process.returncode is None:
+            kill_process_group(process.pid)
+            process.kill()
 
-    output_lines = 0
-    deadline = time.monotonic() + timeout
-    timed_out = False
-
-    while True:
-        remaining = deadline - time.monotonic()
-        wait_time = 0.2
-        if remaining < wait_time:
-            wait_time = max(0.05, remaining)
-        try:
-            line = queue.get(timeout=max(wait_time, 0.05))
-        except Empty:
-            line = None
-        if line is not None:
-            cleaned = line.rstrip("\r\n")
-            log_callback(cleaned)
-            output_lines += 1
-        process_done = process.poll() is not None
-        if process_done and queue.empty():
-            break
-        if not timed_out and time.monotonic() > deadline:
+    def _on_timeout() -> None:
+        nonlocal timed_out
+        if process.returncode is None:
             timed_out = True
-            log_callback(f"Timeout reached ({timeout}s). Terminating command.")
-            process.kill()
+            _kill()
 
-    reader.join(timeout=0.5)
+    async def _tick() -> None:
+        nonlocal cancelled
+        assert spec.tick_callback is not None
+        tick_callback = sync_to_async(spec.tick_callback)
+        while True:
+            await asyncio.sleep(TICK_SECONDS)
+            if await tick_callback() and process.returncode is None:
+                cancelled = True
+                _kill()
+                return
 
-    if process.returncode is None:
-        exit_code = process.wait()
-    else:
-        exit_code = process.returncode
+    assert process.stdout is not None
+    reader = asyncio.ensure_future(_pump_output(process.stdout))
+    ticker = asyncio.ensure_future(_tick()) if spec.tick_callback else None
+    timer = asyncio.get_running_loop().call_later(spec.timeout, _on_timeout)
+    try:
+        exit_code = await process.wait()
+        drain_timeout = DRAIN_AFTER_KILL_SECONDS if timed_out or cancelled else None
+        _, pending = await asyncio.wait({reader}, timeout=drain_timeout)
+        for task in pending:
+            task.cancel()
+        if reader.done() and not reader.cancelled():
+            reader.result()  # surface log_callback failures
+    except asyncio.CancelledError:
+        _kill()
+        reader.cancel()
+        raise
+    finally:
+        timer.cancel()
+        if ticker is not None:
+            ticker.cancel()
+        resources = None
+        if report_fds:
+            resources = _read_usage_report(report_fds[0])
+            os.close(report_fds[0])
+
+    if timed_out:
+        await log_callback(f"Timeout reached ({spec.timeout}s). Terminated command.")
 
-    duration = time.monotonic() - start
     return CommandResult(
         exit_code=exit_code,
-        duration=duration,
+        duration=time.monotonic() - start,
         output_lines=output_lines,
         safe_prefix=safe_prefix,
         timed_out=timed_out,
+        cancelled=cancelled,
+        resources=resources,
+        parsed=output_parsers.results(spec.parsers),
+    )
+
+
+def run_command(
+    *,
+    command: str,
+    workspace_path: str,
+    timeout: float,
+    log_callback: Callable[[str], None],
+    safe_prefix: str | None = None,
+    tick_callback: Callable[[], bool | None] | None = None,
+    parsers: Sequence[OutputParser] = (),
+) -> CommandResult:
+    """
+    Execute ``command`` inside ``workspace_path`` streaming output to ``log_callback``.
+
+    ``tick_callback`` (if given) is called every ``TICK_SECONDS`` while the command runs,
+    in the same thread as ``log_callback``. Returning ``True`` cancels the command: its
+    whole process group is killed and the result has ``cancelled`` set. ``parsers`` turn
+    the output into ``CommandResult.parsed`` while it streams.
+    """
+
+    spec = CommandSpec(
+        command=command,
+        workspace_path=workspace_path,
+        timeout=timeout,
+        log_callback=log_callback,
+        safe_prefix=safe_prefix,
+        tick_callback=tick_callback,
+        parsers=parsers,
     )
+    return async_to_sync(run_command_async)(spec)
+
+
+async def _gather_commands(
+    specs: Sequence[CommandSpec], limit: int | None = None
+) -> list[CommandResult | CommandExecutionError]:
+    slots = asyncio.Semaphore(limit or len(specs))
+
+    async def _run(spec: CommandSpec) -> CommandResult | CommandExecutionError:
+        async with slots:
+            try:
+                return await run_command_async(spec)
+            except CommandExecutionError as exc:
+                return exc
+
+    return list(await asyncio.gather(*(_run(spec) for spec in specs)))
+
+
+def run_commands(
+    specs: Sequence[CommandSpec], *, limit: int | None = None
+) -> list[CommandResult | CommandExecutionError]:
+    """
+    Run several commands concurrently from a single event loop.
+
+    At most ``limit`` processes run at once (all of them when ``None``). Results are
+    returned in ``specs`` order; a command that could not be started yields its
+    ``CommandExecutionError`` instead of aborting the others.
+    """
+
+    if not specs:
+        return []
+    return async_to_sync(_gather_commands)(specs, limit)
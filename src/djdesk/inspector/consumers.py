@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.db.models import Q
+
+from . import realtime
+from .models import Workspace, WorkspaceTaskRun
+from .services import workspace_status_payload
+
+
+@database_sync_to_async
+def _resolve_workspace_id(slug: str) -> int | None:
+    return Workspace.objects.filter(slug=slug).values_list("pk", flat=True).first()
+
+
+@database_sync_to_async
+def _status_version(workspace_id: int) -> int | None:
+    queryset = Workspace.objects.filter(pk=workspace_id)
+    return queryset.values_list("status_version", flat=True).first()
+
+
+@database_sync_to_async
+def _status_payload(workspace_id: int, since: int | None) -> dict[str, Any] | None:
+    workspace = Workspace.objects.filter(pk=workspace_id).first()
+    if workspace is None:
+        return None
+    return workspace_status_payload(workspace, since=since)
+
+
+ACTIVE_RUN_STATUSES = (WorkspaceTaskRun.Status.REQUESTED, WorkspaceTaskRun.Status.RUNNING)
+
+
+@database_sync_to_async
+def _active_run_state(workspace_id: int) -> dict[int, dict[str, Any]]:
+    """Status, progress, and last log chunk of the workspace's active runs."""
+    runs = WorkspaceTaskRun.objects.filter(
+        workspace_id=workspace_id, status__in=ACTIVE_RUN_STATUSES
+    )
+    return {
+        run.pk: {
+            "status": run.status,
+            "progress": run.progress,
+            "seq": max((chunk.sequence for chunk in run.log_chunks.all()), default=0),
+        }
+        for run in runs.prefetch_related("log_chunks")
+    }
+
+
+@database_sync_to_async
+def _task_run_events(
+    workspace_id: int, since: int | None, state: dict[int, dict[str, Any]], skip: set[int]
+) -> list[dict[str, Any]]:
+    """
+    Task stream events for runs that changed after status version ``since``.
+
+    Active runs are always re-read, so a write that committed out of version order is
+    still picked up. ``state`` is updated in place; a chunk is sent once per run.
+    """
+
+    runs = WorkspaceTaskRun.objects.filter(workspace_id=workspace_id).exclude(pk__in=skip)
+    changed = Q(status__in=ACTIVE_RUN_STATUSES)
+    if since is not None:
+        changed |= Q(status_version__gt=since)
+    events = []
+    for run in runs.filter(changed).only("pk", "status", "progress"):
+        known = state.setdefault(run.pk, {"status": None, "progress": None, "seq": 0})
+        chunks = list(
+            run.log_chunks.filter(sequence__gt=known["seq"]).values_list("sequence", "lines")
+        )
+        for seq, lines in chunks:
+            events.append(
+                realtime.task_event(
+                    run_id=run.pk,
+                    status=run.status,
+                    progress=run.progress,
+                    log_line=lines,
+                    seq=seq,
+                )
+            )
+            known["seq"] = seq
+        if (run.status, run.progress) != (known["status"], known["progress"]) and not chunks:
+            events.append(
+                realtime.task_event(run_id=run.pk, status=run.status, progress=run.progress)
+            )
+        known.update(status=run.status, progress=run.progress)
+    return events
+
+
+def _has_changes(payload: dict[str, Any]) -> bool:
+    if payload["full"] or payload["scans"] or payload["tasks"]:
+        return True
+    # Delta payloads only carry metadata sections when the metadata changed.
+    return "insights" in payload
+
+
+class WorkspaceStatusConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes status payloads for ``/ws/workspaces/<slug>/``.
+
+    Sends the full payload on connect and a delta (see ``workspace_status_payload``)
+    whenever the workspace's status version bumps. A slow safety-net check catches
+    writes made by other processes that cannot reach the in-process channel layer.
+    """
+
+    async def connect(self) -> None:
+        slug = self.scope["url_route"]["kwargs"]["slug"]
+        self.workspace_id = await _resolve_workspace_id(slug)
+        if self.workspace_id is None:
+            await self.close()
+            return
+        self.groups = [
+            realtime.workspace_status_group(self.workspace_id),
+            realtime.ALL_WORKSPACES_GROUP,
+        ]
+        for group in self.groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        self.cursor: int | None = None
+        self.push_lock = asyncio.Lock()
+        self.push_scheduled = False
+        await self.accept()
+        await self.push_status()
+        self.fallback_task = asyncio.create_task(self.fallback_refresh())
+
+    async def disconnect(self, code: int) -> None:
+        fallback = getattr(self, "fallback_task", None)
+        if fallback is not None:
+            fallback.cancel()
+
+    async def status_changed(self, event: dict[str, Any]) -> None:
+        # Coalesce bursts (one bump per log flush) into a single push.
+        if self.push_scheduled:
+            return
+        self.push_scheduled = True
+        asyncio.create_task(self.debounced_push())
+
+    async def debounced_push(self) -> None:
+        await asyncio.sleep(settings.INSPECTOR_STATUS_PUSH_DEBOUNCE)
+        self.push_scheduled = False
+        await self.push_status()
+
+    async def push_status(self) -> None:
+        async with self.push_lock:
+            payload = await _status_payload(self.workspace_id, self.cursor)
+            if payload is None:
+                await self.close()
+                return
+            if _has_changes(payload):
+                await self.send_json(payload)
+            self.cursor = payload["cursor"]
+
+    async def fallback_refresh(self) -> None:
+        while True:
+            await asyncio.sleep(settings.INSPECTOR_STATUS_PUSH_FALLBACK_INTERVAL)
+            version = await _status_version(self.workspace_id)
+            if version is not None and version != self.cursor:
+                await self.push_status()
+
+
+class TaskRunStreamConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Relays task progress deltas and log lines for ``/ws/task-runs/<workspace>/``.
+
+    Runs executed by ``db_worker`` processes publish to their own channel layer, so the
+    consumer also polls the database every ``INSPECTOR_TASK_STREAM_POLL_INTERVAL`` seconds
+    while the workspace's status version moves, and relays new log chunks and state
+    changes. Runs whose log lines already arrive through the channel layer are skipped.
+    """
+
+    async def connect(self) -> None:
+        slug = self.scope["url_route"]["kwargs"]["workspace"]
+        self.workspace_id = await _resolve_workspace_id(slug)
+        if self.workspace_id is None:
+            await self.close()
+            return
+        self.groups = [realtime.task_runs_group(self.workspace_id)]
+        await self.channel_layer.group_add(self.groups[0], self.channel_name)
+        self.version = await _status_version(self.workspace_id)
+        self.run_state = await _active_run_state(self.workspace_id)
+        self.live_runs: set[int] = set()
+        await self.accept()
+        self.relay_task = asyncio.create_task(self.relay_database_events())
+
+    async def disconnect(self, code: int) -> None:
+        relay = getattr(self, "relay_task", None)
+        if relay is not None:
+            relay.cancel()
+
+    async def task_event(self, event: dict[str, Any]) -> None:
+        if event["event"].get("log_line") is not None:
+            # Only the process executing a run publishes its lines.
+            self.live_runs.add(event["event"]["id"])
+        await self.send_json(event["event"])
+
+    async def relay_database_events(self) -> None:
+        while True:
+            await asyncio.sleep(settings.INSPECTOR_TASK_STREAM_POLL_INTERVAL)
+            version = await _status_version(self.workspace_id)
+            if version is None or version == self.version:
+                continue
+            events = await _task_run_events(
+                self.workspace_id, self.version, self.run_state, self.live_runs
+            )
+            self.version = version
+            for event in events:
+                await self.send_json(event)
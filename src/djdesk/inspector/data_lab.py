@@ -167,6 +167,7 @@ def export_notebook(workspace: Workspace, template_slug: str) -> Path:
     workspace_dir = workspace_data_lab_dir(workspace)
     path = workspace_dir / f"{template_slug}.ipynb"
     path.write_text(json.dumps(notebook, indent=2), encoding="utf-8")
+    Workspace.bump_status_version(workspace.pk, reset=True)
     return path
 
 
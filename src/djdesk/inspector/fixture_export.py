@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import shlex
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+
+from .command_runner import (
+    CommandExecutionError,
+    _resolve_workspace_path,
+    command_env,
+    kill_process_group,
+    run_command,
+    validate_safe_command,
+)
+from .models import ScanJob
+from .output_parsers import ShowMigrationsParser
+from .workspace_db import connect_readonly, label_fingerprint, table_names, workspace_database
+
+DUMPDATA_COMMAND = "python manage.py dumpdata"
+SHOWMIGRATIONS_COMMAND = "python manage.py showmigrations"
+# Bytes read from a ``dumpdata`` pipe per gzip write.
+CHUNK_SIZE = 256 * 1024
+# Last stderr bytes kept as the error of a failed model export.
+ERROR_TAIL_BYTES = 2000
+MANIFEST_NAME = "manifest.json"
+
+
+def export_dir(job: ScanJob) -> Path:
+    """Directory holding the compressed fixtures and manifest of ``job``."""
+    return Path(settings.INSPECTOR_FIXTURE_EXPORT_ROOT) / f"scan-{job.pk}"
+
+
+def export_targets(job: ScanJob) -> list[str]:
+    """
+    Labels to export, one ``dumpdata`` process each.
+
+    ``details.models`` wins; otherwise the models of the workspace schema graph, and for
+    workspaces without one the app labels listed by ``showmigrations``.
+    """
+
+    if requested := job.details.get("models"):
+        return list(requested)
+    nodes = job.workspace.schema_graph.get("nodes", [])
+    labels = [
+        node.get("label") or f"{node['badge']}.{node['name']}"
+        for node in nodes
+        if node.get("label") or (node.get("badge") and node.get("name"))
+    ]
+    if labels:
+        return labels
+    parser = ShowMigrationsParser()
+    result = run_command(
+        command=SHOWMIGRATIONS_COMMAND,
+        workspace_path=job.workspace.project_path,
+        timeout=settings.INSPECTOR_TASK_TIMEOUT,
+        log_callback=lambda line: None,
+        parsers=[parser],
+    )
+    if result.exit_code != 0:
+        raise CommandExecutionError(f"showmigrations exited with code {result.exit_code}.")
+    return list(parser.result()["apps"])
+
+
+def export_label(label: str, workdir: Path, dest: Path, *, timeout: float) -> dict[str, Any]:
+    """
+    Stream ``dumpdata <label> --format jsonl`` into ``dest`` (gzip) and return its stats.
+
+    The file only appears once the command succeeded, so a checkpointed entry always points
+    at a complete fixture. JSON Lines puts one object per line: the row count is the number
+    of newlines, and ``loaddata`` reads the ``.jsonl.gz`` file directly.
+    """
+
+    command = f"{DUMPDATA_COMMAND} {label} --natural-foreign --format jsonl"
+    validate_safe_command(command)
+    start = time.monotonic()
+    rows = raw_bytes = 0
+    partial = dest.with_name(f"{dest.name}.part")
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(
+                shlex.split(command),
+                cwd=str(workdir),
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                env=command_env(),
+                start_new_session=True,
+            )
+        except OSError as exc:
+            raise CommandExecutionError(f"Unable to start command: {exc}") from exc
+        timer = threading.Timer(timeout, kill_process_group, args=(process.pid,))
+        timer.start()
+        try:
+            assert process.stdout is not None
+            with process.stdout, gzip.open(partial, "wb") as fixture:
+                while chunk := process.stdout.read(CHUNK_SIZE):
+                    rows += chunk.count(b"\n")
+                    raw_bytes += len(chunk)
+                    fixture.write(chunk)
+            exit_code = process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                kill_process_group(process.pid)
+                process.wait()
+        if exit_code != 0:
+            partial.unlink(missing_ok=True)
+            size = stderr.seek(0, os.SEEK_END)
+            stderr.seek(max(0, size - ERROR_TAIL_BYTES))
+            error = stderr.read().decode("utf-8", errors="replace").strip()
+            if exit_code < 0:
+                error = error or f"Killed after {timeout:g}s."
+            return {
+                "status": "failed",
+                "exit_code": exit_code,
+                "error": error.splitlines()[-1] if error else f"Exit code {exit_code}.",
+                "seconds": round(time.monotonic() - start, 3),
+            }
+    os.replace(partial, dest)
+    return {
+        "status": "done",
+        "file": dest.name,
+        "rows": rows,
+        "bytes": raw_bytes,
+        "compressed_bytes": dest.stat().st_size,
+        "seconds": round(time.monotonic() - start, 3),
+    }
+
+
+def _checkpoint(job: ScanJob, state: dict[str, Any], directory: Path) -> None:
+    models = state["models"]
+    done = [entry for entry in models.values() if entry["status"] == "done"]
+    state["totals"] = {
+        "models": len(models),
+        "exported": len(done),
+        "rows": sum(entry["rows"] for entry in done),
+        "bytes": sum(entry["bytes"] for entry in done),
+        "compressed_bytes": sum(entry["compressed_bytes"] for entry in done),
+    }
+    state["updated_at"] = timezone.now().isoformat()
+    (directory / MANIFEST_NAME).write_text(json.dumps(state, indent=2))
+    finished = sum(1 for entry in models.values() if entry["status"] != "pending")
+    job.details = {**job.details, "fixtures": state}
+    job.progress = int(100 * finished / len(models)) if models else 100
+    job.save(update_fields=["details", "progress"])
+
+
+def _database(job: ScanJob, workdir: Path) -> Path | None:
+    """SQLite file to fingerprint tables in; ``None`` disables incremental exports."""
+    if not settings.INSPECTOR_FIXTURE_EXPORT_INCREMENTAL:
+        return None
+    return workspace_database(workdir, job.details.get("database"))
+
+
+def _reusable_entries(
+    job: ScanJob, directory: Path
+) -> dict[str, tuple[dict[str, Any], Path, int | None]]:
+    """
+    Finished entries by label: ``(entry, file, source scan ID)``.
+
+    This job's own entries (source ``None``) are resumed; those of the workspace's previous
+    export are reused when their table fingerprint still matches.
+    """
+
+    if job.details.get("force_refresh"):
+        return {}
+    reusable = {}
+    last = (
+        ScanJob.objects.filter(
+            workspace_id=job.workspace_id, kind=ScanJob.Kind.FIXTURES, details__has_key="fixtures"
+        )
+        .exclude(pk=job.pk)
+        .order_by("-pk")
+        .first()
+    )
+    if last is not None:
+        for label, entry in last.details["fixtures"]["models"].items():
+            if entry["status"] == "done" and entry.get("fingerprint"):
+                reusable[label] = (entry, export_dir(last) / entry["file"], last.pk)
+    for label, entry in job.details.get("fixtures", {}).get("models", {}).items():
+        if entry["status"] == "done":
+            reusable[label] = (entry, directory / entry["file"], None)
+    return reusable
+
+
+def _link(source: Path, dest: Path) -> None:
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(source, dest)
+    except OSError:  # other filesystem, or no hard links
+        shutil.copy2(source, dest)
+
+
+def export_target(
+    label: str,
+    workdir: Path,
+    directory: Path,
+    *,
+    database: Path | None,
+    reusable: tuple[dict[str, Any], Path, int | None] | None,
+    timeout: float,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Export ``label`` unless an earlier file is still current; returns ``(outcome, entry)``.
+
+    The outcome is ``exported``, ``failed``, ``resumed`` (kept from this job), or
+    ``unchanged`` (its tables match the previous export, whose file is hard-linked).
+    """
+
+    start = time.monotonic()
+    fingerprint = None
+    if database is not None:
+        try:
+            with closing(connect_readonly(database)) as connection:
+                fingerprint = label_fingerprint(connection, label, table_names(connection))
+        except sqlite3.Error:
+            fingerprint = None  # locked or unreadable: dump it to be safe
+    if reusable is not None:
+        entry, path, source = reusable
+        current = fingerprint is not None and entry.get("fingerprint") == fingerprint
+        if path.exists() and (current or (source is None and fingerprint is None)):
+            if source is None:
+                return "resumed", entry
+            _link(path, directory / entry["file"])
+            seconds = round(time.monotonic() - start, 3)
+            return "unchanged", {**entry, "reused_from": source, "seconds": seconds}
+
+    entry = export_label(label, workdir, directory / f"{label}.jsonl.gz", timeout=timeout)
+    if entry["status"] == "failed":
+        return "failed", entry
+    if fingerprint is not None:
+        entry["fingerprint"] = fingerprint
+    return "exported", entry
+
+
+def export_fixtures(job: ScanJob) -> dict[str, Any]:
+    """
+    Export each target of ``job`` to ``<label>.jsonl.gz`` with parallel ``dumpdata`` runs.
+
+    Up to ``INSPECTOR_FIXTURE_EXPORT_WORKERS`` processes run at once; their output is
+    compressed as it arrives, so no export is ever held in memory or in the database.
+    Each finished model is checkpointed to ``details.fixtures`` and ``manifest.json``.
+    Running the job again resumes it: models whose file is still on disk are skipped.
+
+    With a local SQLite database, each model's tables are fingerprinted (row count, max
+    primary key, row checksum) over a read-only connection first. Models whose
+    fingerprint matches the previous export reuse its file instead of running ``dumpdata``.
+    """
+
+    job.status = ScanJob.Status.RUNNING
+    job.started_at = job.started_at or timezone.now()
+    job.completed_at = None
+    job.summary = "Exporting fixtures"
+    job.save(update_fields=["status", "started_at", "completed_at", "summary"])
+
+    directory = export_dir(job)
+    try:
+        workdir = _resolve_workspace_path(job.workspace.project_path)
+        targets = export_targets(job)
+    except CommandExecutionError as exc:
+        return _finish(job, summary=f"Fixture export failed: {exc}", failed=True)
+    directory.mkdir(parents=True, exist_ok=True)
+    database = _database(job, workdir)
+    reusable = _reusable_entries(job, directory)
+
+    models: dict[str, dict[str, Any]] = {label: {"status": "pending"} for label in targets}
+    state = {
+        "format": "jsonl.gz",
+        "directory": str(directory),
+        "database": str(database) if database else None,
+        "workers": settings.INSPECTOR_FIXTURE_EXPORT_WORKERS,
+        "resumed": 0,
+        "unchanged": 0,
+        "models": models,
+    }
+    _checkpoint(job, state, directory)
+
+    with ThreadPoolExecutor(max_workers=settings.INSPECTOR_FIXTURE_EXPORT_WORKERS) as pool:
+        futures = {
+            pool.submit(
+                export_target,
+                label,
+                workdir,
+                directory,
+                database=database,
+                reusable=reusable.get(label),
+                timeout=settings.INSPECTOR_TASK_TIMEOUT,
+            ): label
+            for label in targets
+        }
+        # Checkpoints are written from this thread only, one per finished model.
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                outcome, models[label] = future.result()
+            except CommandExecutionError as exc:
+                outcome, models[label] = "failed", {"status": "failed", "error": str(exc)}
+            if outcome in {"resumed", "unchanged"}:
+                state[outcome] += 1
+            _checkpoint(job, state, directory)
+
+    totals = state["totals"]
+    failed = [label for label, entry in models.items() if entry["status"] == "failed"]
+    summary = (
+        f"Exported {totals['exported']}/{totals['models']} models · {totals['rows']} rows · "
+        f"{totals['bytes'] / 1024:.0f} KiB → {totals['compressed_bytes'] / 1024:.0f} KiB"
+    )
+    if state["unchanged"]:
+        summary += f" · {state['unchanged']} unchanged"
+    log = "\n".join(f"{label}: {models[label]['error']}" for label in failed)
+    return _finish(job, summary=summary, failed=bool(failed), log=log)
+
+
+def _finish(job: ScanJob, *, summary: str, failed: bool, log: str = "") -> dict[str, Any]:
+    job.status = ScanJob.Status.FAILED if failed else ScanJob.Status.COMPLETED
+    job.summary = summary[:255]
+    job.log_excerpt = log
+    job.completed_at = timezone.now()
+    if not failed:
+        job.progress = 100
+    job.save(update_fields=["status", "summary", "log_excerpt", "completed_at", "progress"])
+    return {"id": job.pk, "status": job.status, "summary": job.summary}
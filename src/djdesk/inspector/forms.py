@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
 from django import forms
+from django.conf import settings
 
-from . import services
-from .models import TaskPreset, Workspace, WorkspaceTaskRun
-from .tasks import execute_workspace_task
+from . import batches, pipelines, services
+from .models import TaskPipelineRun, TaskPreset, Workspace, WorkspaceTaskRun
+from .tasks import enqueue_task_run, start_pipeline_steps
 
 PROTECTED_PATHS: list[Path] = [
     Path("/etc"),
@@ -135,6 +137,10 @@ class TaskRunForm(forms.Form):
         max_length=280,
         widget=forms.Textarea(attrs={"rows": 2, "placeholder": "Optional notes"}),
     )
+    force_refresh = forms.BooleanField(
+        required=False,
+        label="Ignore cached results and run the command again.",
+    )
     confirm_safe = forms.BooleanField(
         required=True,
         initial=False,
@@ -150,10 +156,13 @@ class TaskRunForm(forms.Form):
             workspace=workspace,
             preset=preset,
             requested_by=self.initial.get("requested_by", "inspector"),
-            metadata={"notes": self.cleaned_data.get("notes", "")},
+            metadata={
+                "notes": self.cleaned_data.get("notes", ""),
+                "force_refresh": self.cleaned_data.get("force_refresh", False),
+            },
         )
         try:
-            result = execute_workspace_task.enqueue(run.pk)
+            result = enqueue_task_run(run)
         except Exception as exc:
             run.status = WorkspaceTaskRun.Status.FAILED
             run.append_log("Unable to enqueue task; please try again later.")
@@ -166,3 +175,86 @@ class TaskRunForm(forms.Form):
         run.result_id = result.id
         run.save(update_fields=["result_id"])
         return run
+
+
+class TaskBatchForm(forms.Form):
+    """Fans one preset out to many workspaces as a batch of task runs."""
+
+    preset = forms.ModelChoiceField(
+        queryset=TaskPreset.objects.all(),
+        to_field_name="key",
+        label="Task",
+    )
+    workspaces = forms.ModelMultipleChoiceField(
+        queryset=Workspace.objects.all(),
+        to_field_name="slug",
+        required=False,
+        label="Workspaces",
+    )
+    all_workspaces = forms.BooleanField(
+        required=False,
+        label="Run in every workspace.",
+    )
+    force_refresh = forms.BooleanField(
+        required=False,
+        label="Ignore cached results and run the command again.",
+    )
+    confirm_safe = forms.BooleanField(
+        required=True,
+        initial=False,
+        label="Allow DJDesk to run the pre-approved command.",
+        error_messages={"required": "Confirmation is required to dispatch a task."},
+    )
+
+    def clean(self) -> dict[str, object]:
+        cleaned = super().clean()
+        if cleaned.get("all_workspaces"):
+            cleaned["workspaces"] = Workspace.objects.order_by("slug")
+        elif not cleaned.get("workspaces"):
+            self.add_error("workspaces", "Select at least one workspace.")
+        return cleaned
+
+    def save(self) -> str:
+        return batches.create_task_batch(
+            self.cleaned_data["preset"],
+            self.cleaned_data["workspaces"],
+            requested_by=self.initial.get("requested_by", "inspector"),
+            force_refresh=self.cleaned_data.get("force_refresh", False),
+        )
+
+
+class TaskPipelineForm(forms.Form):
+    """Starts a pipeline of presets (``INSPECTOR_TASK_PIPELINES``) for one workspace."""
+
+    workspace = forms.ModelChoiceField(
+        queryset=Workspace.objects.all(),
+        to_field_name="slug",
+        label="Workspace",
+    )
+    pipeline = forms.ChoiceField(label="Pipeline")
+    confirm_safe = forms.BooleanField(
+        required=True,
+        initial=False,
+        label="Allow DJDesk to run the pre-approved commands.",
+        error_messages={"required": "Confirmation is required to dispatch a task."},
+    )
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.fields["pipeline"].choices = [
+            (key, definition["label"])
+            for key, definition in settings.INSPECTOR_TASK_PIPELINES.items()
+        ]
+
+    def save(self) -> TaskPipelineRun:
+        try:
+            pipeline = pipelines.create_pipeline_run(
+                self.cleaned_data["workspace"],
+                self.cleaned_data["pipeline"],
+                requested_by=self.initial.get("requested_by", "inspector"),
+            )
+        except pipelines.PipelineError as exc:
+            raise forms.ValidationError({"pipeline": [str(exc)]}) from exc
+        start_pipeline_steps(pipeline.pk)
+        pipeline.refresh_from_db()
+        return pipeline
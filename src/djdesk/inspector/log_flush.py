@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+
+
+class LogFlushPolicy:
+    """
+    Decides when a task run's buffered log lines and staged fields should be written.
+
+    A flush is due when the oldest pending change is older than ``delay``, or the buffer
+    holds ``max_lines`` lines or ``max_bytes`` bytes, whichever comes first. When size
+    triggers fire faster than the base delay (a chatty command), the thresholds double up
+    to their caps; time-triggered flushes of small batches halve them again.
+    """
+
+    def __init__(self, *, base_lines: int) -> None:
+        self.base_delay = settings.INSPECTOR_LOG_FLUSH_DELAY
+        self.max_delay = settings.INSPECTOR_LOG_FLUSH_MAX_DELAY
+        self.base_lines = base_lines
+        self.line_cap = settings.INSPECTOR_LOG_FLUSH_MAX_LINES
+        self.base_bytes = settings.INSPECTOR_LOG_FLUSH_BYTES
+        self.delay = self.base_delay
+        self.max_lines = base_lines
+        self.max_bytes = self.base_bytes
+        self.pending_since: float | None = None
+        self.pending_lines = 0
+        self.pending_bytes = 0
+        self.last_flush: float | None = None
+        self.counters = {
+            "flushes": 0,
+            "lines": 0,
+            "bytes": 0,
+            "by_time": 0,
+            "by_lines": 0,
+            "by_bytes": 0,
+            "forced": 0,
+            "backoffs": 0,
+        }
+
+    def note(self, *, lines: int = 0, size: int = 0) -> None:
+        """Record a pending change (log lines or a staged field)."""
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+        self.pending_lines += lines
+        self.pending_bytes += size
+
+    def due(self) -> str | None:
+        """Return why a flush is due now, or ``None``."""
+        if self.pending_since is None:
+            return None
+        if self.pending_lines >= self.max_lines:
+            return "lines"
+        if self.pending_bytes >= self.max_bytes:
+            return "bytes"
+        if time.monotonic() - self.pending_since >= self.delay:
+            return "time"
+        return None
+
+    def flushed(self, reason: str) -> None:
+        """Update counters and adapt the thresholds after a write."""
+        now = time.monotonic()
+        self.counters["flushes"] += 1
+        self.counters["lines"] += self.pending_lines
+        self.counters["bytes"] += self.pending_bytes
+        self.counters["forced" if reason == "forced" else f"by_{reason}"] += 1
+        rapid = self.last_flush is not None and now - self.last_flush < self.base_delay
+        if reason in {"lines", "bytes"} and rapid:
+            self.delay = min(self.delay * 2, self.max_delay)
+            self.max_lines = min(self.max_lines * 2, self.line_cap)
+            self.max_bytes = min(self.max_bytes * 2, self.base_bytes * 16)
+            self.counters["backoffs"] += 1
+        elif reason == "time" and self.pending_lines < self.max_lines // 4:
+            self.delay = max(self.delay / 2, self.base_delay)
+            self.max_lines = max(self.max_lines // 2, self.base_lines)
+            self.max_bytes = max(self.max_bytes // 2, self.base_bytes)
+        self.pending_since = None
+        self.pending_lines = self.pending_bytes = 0
+        self.last_flush = now
+
+    def snapshot(self) -> dict[str, float | int]:
+        """Counters plus the thresholds in effect, for run metadata."""
+        return {
+            **self.counters,
+            "delay": self.delay,
+            "max_lines": self.max_lines,
+            "max_bytes": self.max_bytes,
+        }
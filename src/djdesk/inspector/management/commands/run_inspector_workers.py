@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import signal
+import subprocess
+import sys
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+RESTART_BACKOFF_SECONDS = 2.0
+SHUTDOWN_GRACE_SECONDS = 10.0
+
+
+def spawn_worker(worker_id: str, interval: float) -> subprocess.Popen[bytes]:
+    """Start one django-tasks ``db_worker`` process with the current settings."""
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "django",
+            "db_worker",
+            "--settings",
+            settings.SETTINGS_MODULE,
+            "--interval",
+            str(interval),
+            "--worker-id",
+            worker_id,
+        ]
+    )
+
+
+def stop_workers(processes: Iterable[subprocess.Popen[bytes]]) -> None:
+    """Terminate ``processes``, killing any still alive after the shutdown grace period."""
+    processes = list(processes)
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.monotonic() + SHUTDOWN_GRACE_SECONDS
+    for process in processes:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class Command(BaseCommand):
+    help = "Supervise django-tasks database workers that execute inspector task runs."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.INSPECTOR_TASK_WORKERS,
+            help="Number of worker processes (each runs one task at a time).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds each worker waits between queue polls when idle.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        workers = max(1, options["workers"])
+        self.interval = options["interval"]
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        processes = {index: self._spawn(index) for index in range(workers)}
+        self.stdout.write(f"Started {workers} inspector task worker(s).")
+        try:
+            while not self.stopping:
+                for index, process in list(processes.items()):
+                    if process.poll() is None:
+                        continue
+                    self.stderr.write(
+                        f"Worker {index} exited with code {process.returncode}; restarting."
+                    )
+                    time.sleep(RESTART_BACKOFF_SECONDS)
+                    processes[index] = self._spawn(index)
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._shutdown(processes.values())
+
+    def _spawn(self, index: int) -> subprocess.Popen[bytes]:
+        return spawn_worker(f"inspector-{index}", self.interval)
+
+    def _request_stop(self, signum: int, frame: Any) -> None:
+        self.stopping = True
+
+    def _shutdown(self, processes: Any) -> None:
+        stop_workers(processes)
+        self.stdout.write("Inspector task workers stopped.")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from djdesk.inspector.batches import create_task_batch, task_batch_summary
+from djdesk.inspector.models import TaskPreset, Workspace
+
+from .run_inspector_workers import spawn_worker, stop_workers
+
+POLL_SECONDS = 0.5
+
+
+class Command(BaseCommand):
+    help = "Run one task preset across many workspaces and print an aggregated summary."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("preset", help="Task preset key, e.g. ``check``.")
+        parser.add_argument(
+            "--workspace",
+            action="append",
+            dest="workspaces",
+            default=[],
+            help="Workspace slug (repeatable).",
+        )
+        parser.add_argument("--all", action="store_true", help="Run in every workspace.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help=(
+                "Start this many temporary worker processes for the batch. With 0 the runs "
+                "wait for an already running run_inspector_workers pool."
+            ),
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Seconds to wait for the batch (default: task timeout × number of runs).",
+        )
+        parser.add_argument("--force-refresh", action="store_true", help="Bypass cached results.")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            preset = TaskPreset.objects.get(key=options["preset"])
+        except TaskPreset.DoesNotExist as exc:
+            raise CommandError(f"Unknown task preset {options['preset']!r}.") from exc
+        if options["all"]:
+            workspaces = list(Workspace.objects.order_by("slug"))
+        else:
+            workspaces = list(Workspace.objects.filter(slug__in=options["workspaces"]))
+            missing = set(options["workspaces"]) - {workspace.slug for workspace in workspaces}
+            if missing:
+                raise CommandError(f"Unknown workspaces: {', '.join(sorted(missing))}.")
+        if not workspaces:
+            raise CommandError("Select workspaces with --workspace or --all.")
+
+        workers = [
+            spawn_worker(f"inspector-batch-{index}", POLL_SECONDS)
+            for index in range(max(0, options["workers"]))
+        ]
+        try:
+            batch_id = create_task_batch(
+                preset,
+                workspaces,
+                requested_by="inspector-cli",
+                force_refresh=options["force_refresh"],
+            )
+            timeout = options["timeout"] or settings.INSPECTOR_TASK_TIMEOUT * len(workspaces)
+            summary = self._wait(batch_id, timeout)
+        finally:
+            stop_workers(workers)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self._report(summary)
+        if not summary["done"]:
+            raise CommandError(
+                f"Batch {batch_id} still has {summary['total'] - summary['finished']} "
+                f"unfinished run(s) after {timeout:g}s."
+            )
+        if summary["failures"]:
+            raise CommandError(f"{len(summary['failures'])} run(s) failed.")
+
+    def _wait(self, batch_id: str, timeout: float) -> dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            summary = task_batch_summary(batch_id)
+            assert summary is not None
+            if summary["done"] or time.monotonic() >= deadline:
+                return summary
+            time.sleep(POLL_SECONDS)
+
+    def _report(self, summary: dict[str, Any]) -> None:
+        for row in summary["runs"]:
+            duration = row["duration_seconds"]
+            self.stdout.write(
+                f"{row['workspace']:<30} {row['status']:<10} "
+                f"exit={row['exit_code'] if row['exit_code'] is not None else '-':<4} "
+                f"{f'{duration:.2f}s' if duration is not None else '-'}"
+            )
+        durations = summary["duration_seconds"]
+        statuses = ", ".join(
+            f"{count} {status}" for status, count in sorted(summary["statuses"].items())
+        )
+        self.stdout.write(
+            f"Batch {summary['batch']} ({summary['preset']}): {summary['total']} run(s), "
+            f"{statuses}; {durations['total']:.2f}s total"
+        )
+        for failure in summary["failures"]:
+            self.stderr.write(f"{failure['workspace']}: {failure['error']}")
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import ast
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+
+from .command_runner import CommandExecutionError, _resolve_workspace_path
+from .migration_graph import plan, record_migration_graph
+from .models import ScanJob
+from .static_schema import app_config, dotted_name, literal, parse_all, project_apps
+from .warm_worker import FINGERPRINT_SKIP_DIRS
+from .workspace_db import applied_migrations, connect_readonly, workspace_database
+
+# Parse issues kept on the scan.
+ISSUE_LIMIT = 20
+DEPENDENCY_LISTS = ("dependencies", "replaces", "run_before")
+
+
+def parse_migration(path: str) -> dict[str, Any]:
+    """Dependencies, replaced migrations, and operation names of one migration module."""
+    try:
+        tree = ast.parse(Path(path).read_bytes(), filename=path)
+    except (OSError, SyntaxError, ValueError) as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+    migration = next(
+        (node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "Migration"),
+        None,
+    )
+    if migration is None:
+        return {"error": "no Migration class"}
+    result: dict[str, Any] = {name: [] for name in DEPENDENCY_LISTS}
+    result.update(initial=False, operations=[], issues=[])
+    for statement in migration.body:
+        if not (
+            isinstance(statement, ast.Assign)
+            and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name)
+        ):
+            continue
+        name, value = statement.targets[0].id, statement.value
+        if name in DEPENDENCY_LISTS:
+            if not isinstance(value, ast.List | ast.Tuple):
+                result["issues"].append(f"{name} is not a literal list")
+                continue
+            for item in value.elts:
+                pair = literal(item, {})
+                if (
+                    isinstance(pair, list)
+                    and len(pair) == 2
+                    and all(isinstance(p, str) for p in pair)
+                ):
+                    result[name].append(pair)
+                elif (
+                    isinstance(item, ast.Call)
+                    and (dotted_name(item.func) or "").endswith("swappable_dependency")
+                    and item.args
+                ):
+                    result[name].append(["__setting__", dotted_name(item.args[0]) or "?"])
+                else:
+                    result["issues"].append(f"{name} entry cannot be read statically")
+        elif name == "initial":
+            result["initial"] = literal(value, {}) is True
+        elif name == "operations" and isinstance(value, ast.List | ast.Tuple):
+            result["operations"] = [
+                (dotted_name(op.func) or "?").rpartition(".")[2]
+                if isinstance(op, ast.Call)
+                else "?"
+                for op in value.elts
+            ]
+    return result
+
+
+def migration_dirs(workdir: Path) -> tuple[dict[str, Path], Any]:
+    """
+    ``({app label: migrations package}, AUTH_USER_MODEL)`` for the workspace.
+
+    Apps come from the settings when ``INSTALLED_APPS`` can be read statically; otherwise
+    every ``migrations`` package in the workspace is used, labelled by its app's config.
+    """
+
+    project = project_apps(workdir)
+    dirs = {
+        label: directory / "migrations"
+        for label, directory in project.apps.items()
+        if (directory / "migrations" / "__init__.py").is_file()
+    }
+    if project.apps:
+        return dirs, project.user_model
+    for root, subdirs, names in os.walk(workdir):
+        subdirs[:] = [
+            d for d in subdirs if not d.startswith(".") and d not in FINGERPRINT_SKIP_DIRS
+        ]
+        if Path(root).name == "migrations" and "__init__.py" in names:
+            subdirs[:] = []
+            app_dir = Path(root).parent
+            label = (app_config(app_dir / "apps.py") or {}).get("label")
+            dirs[label if isinstance(label, str) else app_dir.name] = Path(root)
+    return dirs, project.user_model
+
+
+def migration_files(directory: Path) -> list[Path]:
+    # Django's loader skips modules whose name starts with ``_`` or ``~``.
+    return sorted(
+        path
+        for path in directory.iterdir()
+        if path.suffix == ".py" and not path.name.startswith(("_", "~"))
+    )
+
+
+def resolve_graph(migrations: list[dict[str, Any]], user_model: Any) -> dict[str, dict[str, Any]]:
+    """
+    Migration nodes keyed ``app.name`` with resolved dependency keys.
+
+    ``__first__``/``__latest__`` resolve like Django's loader does, to the app's first root
+    and leaf node: migrations without a parent, or without a child, in their own app. A
+    swappable dependency points at the first migration of ``AUTH_USER_MODEL``'s app.
+    Dependencies on apps outside the workspace stay as keys without a node.
+    """
+
+    names: dict[str, set[str]] = defaultdict(set)
+    for migration in migrations:
+        names[migration["app"]].add(migration["name"])
+    parents: dict[str, set[str]] = defaultdict(set)
+    children: dict[str, set[str]] = defaultdict(set)
+    for migration in migrations:
+        app, name = migration["app"], migration["name"]
+        edges = [(dep, name) for dep_app, dep in migration["dependencies"] if dep_app == app]
+        edges += [(name, later) for later_app, later in migration["run_before"] if later_app == app]
+        for parent, child in edges:
+            if parent in names[app] and child in names[app]:
+                parents[f"{app}.{child}"].add(parent)
+                children[f"{app}.{parent}"].add(child)
+    roots = {
+        app: sorted(name for name in app_names if not parents[f"{app}.{name}"])
+        for app, app_names in names.items()
+    }
+    leaves = {
+        app: sorted(name for name in app_names if not children[f"{app}.{name}"])
+        for app, app_names in names.items()
+    }
+
+    def key(pair: list[str]) -> str:
+        app, name = pair
+        if app == "__setting__":
+            app = user_model.partition(".")[0] if isinstance(user_model, str) else "auth"
+            name = "__first__"
+        if name == "__first__" and roots.get(app):
+            name = roots[app][0]
+        elif name == "__latest__" and leaves.get(app):
+            name = leaves[app][0]
+        return f"{app}.{name}"
+
+    nodes = {
+        f"{m['app']}.{m['name']}": {
+            "app": m["app"],
+            "name": m["name"],
+            "dependencies": [key(pair) for pair in m["dependencies"]],
+            "replaces": [key(pair) for pair in m["replaces"]],
+            "initial": m["initial"],
+            "operations": len(m["operations"]),
+        }
+        for m in migrations
+    }
+    for migration in migrations:
+        for pair in migration["run_before"]:
+            if (later := nodes.get(key(pair))) is not None:
+                later["dependencies"].append(f"{migration['app']}.{migration['name']}")
+    return nodes
+
+
+def apply_squashes(nodes: dict[str, dict[str, Any]], applied: set[str]) -> None:
+    """
+    Collapse squashed migrations the way Django's loader does, in place.
+
+    A squash is used, and its replaced migrations dropped, when all or none of them are
+    applied; otherwise the replaced migrations are kept and the squash is dropped.
+    """
+
+    for key in [key for key, node in nodes.items() if node["replaces"]]:
+        if key not in nodes:
+            continue
+        replaced = nodes[key]["replaces"]
+        if key in applied:
+            applied.update(replaced)
+        done = sum(1 for name in replaced if name in applied)
+        if done and done < len(replaced):
+            del nodes[key]
+            continue
+        if done:
+            applied.add(key)
+        for name in replaced:
+            nodes.pop(name, None)
+        for other, node in nodes.items():
+            repointed = (key if dep in replaced else dep for dep in node["dependencies"])
+            node["dependencies"] = [dep for dep in dict.fromkeys(repointed) if dep != other]
+
+
+def _cached_files(job: ScanJob) -> dict[str, dict[str, Any]]:
+    """Parsed migration files of the workspace's latest migration scan, by relative path."""
+    if job.details.get("force_refresh"):
+        return {}
+    last = (
+        ScanJob.objects.filter(
+            workspace_id=job.workspace_id,
+            kind=ScanJob.Kind.MIGRATIONS,
+            details__has_key="migrations",
+        )
+        .order_by("-pk")
+        .first()
+    )
+    return last.details["migrations"]["files"] if last is not None else {}
+
+
+def diff_migrations(job: ScanJob) -> dict[str, Any]:
+    """
+    Compute the workspace's unapplied migrations without starting Django.
+
+    Every ``migrations/*.py`` file of the workspace's apps is parsed with ``ast`` (in a
+    process pool for larger projects) and cached on the scan with its mtime and size, so a
+    rescan only parses files that changed. Applied migrations are read from the
+    ``django_migrations`` table of the local SQLite database over a read-only connection.
+    Without a database every migration counts as unapplied.
+    """
+
+    job.status = ScanJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.completed_at = None
+    job.progress = 5
+    job.summary = "Diffing unapplied migrations"
+    job.save(update_fields=["status", "started_at", "completed_at", "progress", "summary"])
+    start = time.monotonic()
+
+    try:
+        workdir = _resolve_workspace_path(job.workspace.project_path)
+    except CommandExecutionError as exc:
+        return _fail(job, f"Migration diff failed: {exc}")
+    dirs, user_model = migration_dirs(workdir)
+    cached = _cached_files(job)
+    files: dict[str, dict[str, Any]] = {}
+    stale = []
+    for app, directory in dirs.items():
+        for path in migration_files(directory):
+            relative = str(path.relative_to(workdir))
+            stat = path.stat()
+            entry = cached.get(relative)
+            if (
+                entry is not None
+                and entry["app"] == app
+                and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size)
+            ):
+                files[relative] = entry
+            else:
+                stale.append((relative, app, path, stat))
+    parsed = parse_all(
+        [str(path) for _, _, path, _ in stale],
+        settings.INSPECTOR_SCHEMA_STATIC_WORKERS,
+        parse_migration,
+    )
+    for (relative, app, path, stat), result in zip(stale, parsed, strict=True):
+        files[relative] = {
+            "app": app,
+            "name": path.stem,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            **result,
+        }
+
+    database = workspace_database(workdir, job.details.get("database"))
+    applied_rows: set[tuple[str, str]] = set()
+    if database is not None:
+        try:
+            with closing(connect_readonly(database)) as connection:
+                applied_rows = applied_migrations(connection)
+        except sqlite3.Error as exc:
+            return _fail(job, f"Unable to read django_migrations: {exc}")
+
+    issues = [
+        f"{relative}: {issue}"
+        for relative, entry in files.items()
+        for issue in ([entry["error"]] if "error" in entry else entry["issues"])
+    ]
+    nodes = resolve_graph([entry for entry in files.values() if "error" not in entry], user_model)
+    applied = {f"{app}.{name}" for app, name in applied_rows}
+    apply_squashes(nodes, applied)
+    pending = plan(nodes, {key for key in nodes if key not in applied})
+    pending_set = set(pending)
+
+    apps: dict[str, dict[str, Any]] = {
+        label: {"migrations": 0, "applied": 0, "pending": []} for label in dirs
+    }
+    for key, node in nodes.items():
+        apps[node["app"]]["migrations"] += 1
+        apps[node["app"]]["applied"] += key in applied
+    for key in pending:
+        apps[nodes[key]["app"]]["pending"].append(nodes[key]["name"])
+
+    graph = record_migration_graph(job.workspace_id, nodes, pending)
+    stats = {
+        "apps": len(apps),
+        "migrations": len(nodes),
+        "pending": len(pending),
+        "parsed_files": len(stale),
+        "cached_files": len(files) - len(stale),
+        "critical_path": graph["critical_path"]["length"],
+        "conflicts": len(graph["conflicts"]),
+        "seconds": round(time.monotonic() - start, 3),
+    }
+    job.details = {
+        **job.details,
+        "migrations": {
+            "database": str(database) if database else None,
+            "files": files,
+            "apps": apps,
+            "plan": pending,
+            # In-plan dependencies per pending migration; ``sql_plan`` keys SQL by them.
+            "plan_dependencies": {
+                key: [dep for dep in nodes[key]["dependencies"] if dep in pending_set]
+                for key in pending
+            },
+            "issues": issues[:ISSUE_LIMIT],
+            "stats": stats,
+        },
+    }
+    job.status = ScanJob.Status.COMPLETED
+    job.progress = 100
+    job.summary = (
+        f"{len(pending)} of {len(nodes)} migrations unapplied in {len(apps)} apps · "
+        f"{len(stale)} files parsed"
+    )
+    if database is None:
+        job.summary += " · no local database"
+    job.completed_at = timezone.now()
+    job.save(update_fields=["details", "status", "progress", "summary", "completed_at"])
+    return {"id": job.pk, "status": job.status, "summary": job.summary}
+
+
+def _fail(job: ScanJob, summary: str) -> dict[str, Any]:
+    job.status = ScanJob.Status.FAILED
+    job.summary = summary[:255]
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "summary", "completed_at"])
+    return {"id": job.pk, "status": job.status, "summary": job.summary}
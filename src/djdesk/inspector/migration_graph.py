@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Workspace
+from .output_parsers import card_delta
+
+# Apps listed by name on an insight card.
+CAPTION_APPS = 4
+
+
+def plan(nodes: dict[str, dict[str, Any]], keys: set[str]) -> list[str]:
+    """``keys`` in an order that applies dependencies first (iterative, chains can be long)."""
+    order: list[str] = []
+    seen: set[str] = set()
+    for root in sorted(keys):
+        stack = [(root, False)]
+        while stack:
+            key, expanded = stack.pop()
+            if expanded:
+                order.append(key)
+                continue
+            if key in seen or key not in nodes:
+                continue
+            seen.add(key)
+            stack.append((key, True))
+            stack.extend((dep, False) for dep in reversed(nodes[key]["dependencies"]))
+    return [key for key in order if key in keys]
+
+
+def _chains(
+    nodes: dict[str, dict[str, Any]], order: list[str], *, same_app: bool
+) -> dict[str, tuple[int, str | None]]:
+    """``(length, previous key)`` of the longest dependency chain ending at each node."""
+    chains: dict[str, tuple[int, str | None]] = {}
+    for key in order:
+        best: tuple[int, str | None] = (1, None)
+        for dep in nodes[key]["dependencies"]:
+            if dep in chains and (not same_app or nodes[dep]["app"] == nodes[key]["app"]):
+                if chains[dep][0] + 1 > best[0]:
+                    best = (chains[dep][0] + 1, dep)
+        chains[key] = best
+    return chains
+
+
+def analyze(nodes: dict[str, dict[str, Any]], pending: list[str]) -> dict[str, Any]:
+    """
+    Precomputed answers about the migration DAG of one workspace.
+
+    * ``critical_path``: the longest dependency chain across all apps, which bounds how
+      many migrations a fresh database applies one after another;
+    * ``apps``: per app, migration and pending counts, leaf nodes, and the longest chain
+      inside the app;
+    * ``conflicts``: apps with more than one leaf, which ``makemigrations --merge`` fixes;
+    * ``squash_candidates``: apps whose own chain reaches
+      ``INSPECTOR_MIGRATION_SQUASH_THRESHOLD``, longest first.
+    """
+
+    order = plan(nodes, set(nodes))
+    chains = _chains(nodes, order, same_app=False)
+    path: list[str] = []
+    if chains:
+        key: str | None = max(chains, key=lambda k: (chains[k][0], k))
+        while key is not None:
+            path.append(key)
+            key = chains[key][1]
+        path.reverse()
+
+    app_chains = _chains(nodes, order, same_app=True)
+    has_children = {
+        dep
+        for key, node in nodes.items()
+        for dep in node["dependencies"]
+        if dep in nodes and nodes[dep]["app"] == node["app"]
+    }
+    pending_set = set(pending)
+    apps: dict[str, dict[str, Any]] = {}
+    for key in order:
+        node = nodes[key]
+        app = apps.setdefault(
+            node["app"], {"migrations": 0, "pending": 0, "leaves": [], "chain": 0, "operations": 0}
+        )
+        app["migrations"] += 1
+        app["pending"] += key in pending_set
+        app["operations"] += node["operations"]
+        app["chain"] = max(app["chain"], app_chains[key][0])
+        if key not in has_children:
+            app["leaves"].append(node["name"])
+
+    threshold = settings.INSPECTOR_MIGRATION_SQUASH_THRESHOLD
+    return {
+        "migrations": len(nodes),
+        "pending": len(pending),
+        "critical_path": {"length": len(path), "path": path},
+        "apps": apps,
+        "conflicts": {
+            label: app["leaves"] for label, app in apps.items() if len(app["leaves"]) > 1
+        },
+        "squash_candidates": sorted(
+            (label for label, app in apps.items() if app["chain"] >= threshold),
+            key=lambda label: (-apps[label]["chain"], label),
+        ),
+        "squash_threshold": threshold,
+    }
+
+
+def migration_insights(
+    graph: dict[str, Any], previous: dict[str, dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Dashboard insight cards for ``analyze`` output; ``previous`` maps titles to old cards.
+
+    The pending count only covers the workspace's own apps, so it gets its own card next to
+    the "Pending migrations" one ``showmigrations`` refreshes for every installed app.
+    """
+
+    apps = graph["apps"]
+    pending_apps = [label for label, app in apps.items() if app["pending"]]
+    conflicts = graph["conflicts"]
+    candidates = graph["squash_candidates"]
+    path = graph["critical_path"]
+    return [
+        {
+            "title": "Pending workspace migrations",
+            "value": str(graph["pending"]),
+            "delta": card_delta(previous.get("Pending workspace migrations"), graph["pending"]),
+            "severity": "warning" if graph["pending"] else "success",
+            "caption": " · ".join(pending_apps[:CAPTION_APPS]) or "All migrations applied",
+            "icon": "git-branch",
+            "source": "migrations",
+        },
+        {
+            "title": "Migration conflicts",
+            "value": str(len(conflicts)),
+            "delta": card_delta(previous.get("Migration conflicts"), len(conflicts)),
+            "severity": "danger" if conflicts else "success",
+            "caption": " · ".join(
+                f"{label} ({len(leaves)} leaves)"
+                for label, leaves in list(conflicts.items())[:CAPTION_APPS]
+            )
+            or "One leaf per app",
+            "icon": "git-merge",
+            "source": "migrations",
+        },
+        {
+            "title": "Longest migration chain",
+            "value": str(path["length"]),
+            "delta": card_delta(previous.get("Longest migration chain"), path["length"]),
+            "severity": "info",
+            "caption": f"{path['path'][0]} → {path['path'][-1]}"
+            if path["path"]
+            else "No migrations",
+            "icon": "route",
+            "source": "migrations",
+        },
+        {
+            "title": "Squash candidates",
+            "value": str(len(candidates)),
+            "delta": card_delta(previous.get("Squash candidates"), len(candidates)),
+            "severity": "info" if candidates else "success",
+            "caption": " · ".join(
+                f"{label} ({apps[label]['chain']})" for label in candidates[:CAPTION_APPS]
+            )
+            or f"No app chain reaches {graph['squash_threshold']} migrations",
+            "icon": "layers",
+            "source": "migrations",
+        },
+    ]
+
+
+def _app_overview(
+    current: list[dict[str, Any]], graph: dict[str, Any], schema: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """``apps`` entries with migration counts; apps without migrations are kept as they are."""
+    entries = {entry.get("label"): dict(entry) for entry in current}
+    models: dict[str, int] = {}
+    for node in schema.get("nodes", []):
+        models[node.get("badge")] = models.get(node.get("badge"), 0) + 1
+    for label, app in graph["apps"].items():
+        entry = entries.setdefault(label, {"label": label, "models": models.get(label, 0)})
+        entry["pending_migrations"] = app["pending"]
+        entry["migrations"] = app["migrations"]
+        entry["status"] = (
+            "danger" if label in graph["conflicts"] else "warning" if app["pending"] else "success"
+        )
+    return list(entries.values())
+
+
+def record_migration_graph(
+    workspace_id: int, nodes: dict[str, dict[str, Any]], pending: list[str]
+) -> dict[str, Any]:
+    """
+    Store ``analyze`` output as ``Workspace.metadata["migration_graph"]``.
+
+    The analysis runs once per migration scan; the dashboard, the status payload, and
+    the migrations endpoint only read the stored result. ``apps[].pending_migrations``
+    and the migration insight cards are refreshed from it in the same update.
+    """
+
+    graph = analyze(nodes, pending)
+    with transaction.atomic():
+        workspace = Workspace.objects.select_for_update().get(pk=workspace_id)
+        metadata = workspace.metadata or {}
+        previous = {insight.get("title"): insight for insight in metadata.get("insights", [])}
+        fresh = migration_insights(graph, previous)
+        titles = {insight["title"] for insight in fresh}
+        # Cards this scan no longer produces (renamed titles) are dropped with the rest.
+        kept = [
+            insight
+            for insight in previous.values()
+            if insight.get("title") not in titles and insight.get("source") != "migrations"
+        ]
+        metadata["insights"] = fresh + kept
+        metadata["apps"] = _app_overview(metadata.get("apps", []), graph, workspace.schema_graph)
+        metadata["migration_graph"] = graph
+        workspace.metadata = metadata
+        workspace.save(update_fields=["metadata"])
+    return graph
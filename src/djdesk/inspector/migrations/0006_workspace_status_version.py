@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inspector", "0005_alter_doclink_pane_target"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workspace",
+            name="status_version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
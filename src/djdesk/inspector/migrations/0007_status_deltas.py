@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inspector", "0006_workspace_status_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scanjob",
+            name="status_version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="workspace",
+            name="metadata_version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="workspace",
+            name="status_reset_version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="workspacetaskrun",
+            name="status_version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="scanjob",
+            index=models.Index(
+                fields=["workspace", "status_version"], name="inspector_s_workspa_210510_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workspacetaskrun",
+            index=models.Index(
+                fields=["workspace", "status_version"], name="inspector_w_workspa_0c4e67_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_logs_into_chunks(apps, schema_editor) -> None:
+    WorkspaceTaskRun = apps.get_model("inspector", "WorkspaceTaskRun")
+    TaskLogChunk = apps.get_model("inspector", "TaskLogChunk")
+
+    chunks = [
+        TaskLogChunk(
+            run_id=run_id,
+            sequence=1,
+            lines=log,
+            line_count=log.count("\n") + 1,
+        )
+        for run_id, log in WorkspaceTaskRun.objects.exclude(log="").values_list("pk", "log")
+    ]
+    TaskLogChunk.objects.bulk_create(chunks, batch_size=500)
+
+
+def copy_chunks_into_logs(apps, schema_editor) -> None:
+    WorkspaceTaskRun = apps.get_model("inspector", "WorkspaceTaskRun")
+    TaskLogChunk = apps.get_model("inspector", "TaskLogChunk")
+
+    for run in WorkspaceTaskRun.objects.all():
+        lines = TaskLogChunk.objects.filter(run_id=run.pk).order_by("sequence")
+        run.log = "\n".join(lines.values_list("lines", flat=True))
+        run.save(update_fields=["log"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inspector", "0007_status_deltas"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskLogChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("sequence", models.PositiveIntegerField()),
+                ("lines", models.TextField()),
+                ("line_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="log_chunks",
+                        to="inspector.workspacetaskrun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["run", "sequence"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("run", "sequence"),
+                        name="inspector_tasklogchunk_unique_sequence",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_logs_into_chunks, copy_chunks_into_logs),
+        migrations.RemoveField(
+            model_name="workspacetaskrun",
+            name="log",
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:20
+
+from django.db import migrations, models
+
+LOG_TAIL_LINES = 5
+
+
+def backfill_log_summaries(apps, schema_editor) -> None:
+    WorkspaceTaskRun = apps.get_model("inspector", "WorkspaceTaskRun")
+    TaskLogChunk = apps.get_model("inspector", "TaskLogChunk")
+
+    for run in WorkspaceTaskRun.objects.all():
+        chunks = TaskLogChunk.objects.filter(run_id=run.pk).order_by("sequence")
+        lines: list[str] = []
+        count = 0
+        for chunk in chunks:
+            chunk_lines = chunk.lines.split("\n")
+            count += len(chunk_lines)
+            lines = [*lines, *chunk_lines][-LOG_TAIL_LINES:]
+        run.log_line_count = count
+        run.log_tail = lines
+        run.save(update_fields=["log_line_count", "log_tail"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inspector", "0008_task_log_chunks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workspacetaskrun",
+            name="log_line_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="workspacetaskrun",
+            name="log_tail",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_log_summaries, migrations.RunPython.noop),
+    ]
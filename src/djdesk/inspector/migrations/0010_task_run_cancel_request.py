@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inspector", "0009_task_run_log_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workspacetaskrun",
+            name="cancel_requested_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
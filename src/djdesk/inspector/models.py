@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Any
 
@@ -8,11 +9,13 @@ from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from django.utils.text import slugify
 
+from . import realtime
 from .command_runner import (
     CommandExecutionError,
     UnsafeCommandError,
     validate_safe_command,
 )
+from .log_flush import LogFlushPolicy
 
 
 class Workspace(models.Model):
@@ -27,6 +30,9 @@ class Workspace(models.Model):
     docs_url = models.URLField(blank=True)
     metadata = models.JSONField(default=dict, blank=True)
     manage_py_detected = models.BooleanField(default=False)
+    status_version = models.PositiveBigIntegerField(default=0, editable=False)
+    metadata_version = models.PositiveBigIntegerField(default=0, editable=False)
+    status_reset_version = models.PositiveBigIntegerField(default=0, editable=False)
     last_scan_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -47,6 +53,20 @@ class Workspace(models.Model):
         return self.name
 
     def save(self, *args: Any, **kwargs: Any) -> None:
+        if not self._state.adding:
+            # Metadata edits invalidate cached status payloads just like scans/tasks do.
+            self.status_version = models.F("status_version") + 1
+            self.metadata_version = models.F("status_version") + 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                # ``bump_status_version(reset=True)`` may have moved the reset marker since
+                # this instance was loaded; writing the stale value back would undo it.
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != "status_reset_version"
+                ]
+            kwargs["update_fields"] = {*update_fields, "status_version", "metadata_version"}
         attempts = 0
         while True:
             if not self.slug:
@@ -54,6 +74,14 @@ class Workspace(models.Model):
             try:
                 with transaction.atomic(using=kwargs.get("using")):
                     super().save(*args, **kwargs)
+                if not isinstance(self.status_version, int):
+                    self.refresh_from_db(
+                        fields=["status_version", "metadata_version", "status_reset_version"]
+                    )
+                    transaction.on_commit(
+                        lambda: realtime.notify_status_changed(self.pk),
+                        using=kwargs.get("using"),
+                    )
                 return
             except IntegrityError as exc:
                 if not self._is_slug_integrity_error(exc):
@@ -78,6 +106,32 @@ class Workspace(models.Model):
         if exists:
             raise ValidationError({"project_path": "A workspace already inspects this folder."})
 
+    @classmethod
+    def bump_status_version(
+        cls,
+        workspace_id: int | None = None,
+        *,
+        reset: bool = False,
+    ) -> int | None:
+        """
+        Invalidate the status ETag of one workspace (or all when ``workspace_id`` is None).
+
+        Returns the new version for single-workspace bumps. ``reset`` marks changes that
+        cannot be expressed as a delta (deletions, doc links, Data Lab exports) so clients
+        holding an older cursor receive the full payload again.
+        """
+        queryset = cls.objects.all()
+        if workspace_id is not None:
+            queryset = queryset.filter(pk=workspace_id)
+        changes: dict[str, Any] = {"status_version": models.F("status_version") + 1}
+        if reset:
+            changes["status_reset_version"] = models.F("status_version") + 1
+        queryset.update(**changes)
+        transaction.on_commit(lambda: realtime.notify_status_changed(workspace_id))
+        if workspace_id is None:
+            return None
+        return queryset.values_list("status_version", flat=True).first()
+
     def _generate_unique_slug(self) -> str:
         base = slugify(self.name) or "workspace"
         candidate = base
@@ -107,12 +161,35 @@ class Workspace(models.Model):
     def schema_graph(self) -> dict[str, Any]:
         return self.metadata.get("schema", {})
 
+    @property
+    def migration_graph(self) -> dict[str, Any]:
+        return self.metadata.get("migration_graph", {})
+
     @property
     def log_excerpt(self) -> list[dict[str, Any]]:
         return list(self.metadata.get("log_excerpt", []))
 
 
-class ScanJob(models.Model):
+class StatusVersionedModel(models.Model):
+    """Stamps rows with their workspace's ``status_version`` so status deltas can be served."""
+
+    status_version = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        with transaction.atomic(using=kwargs.get("using")):
+            # Bump + write in one transaction so readers never see the new cursor
+            # before the row carrying it.
+            self.status_version = Workspace.bump_status_version(self.workspace_id) or 0
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "status_version"}
+            super().save(*args, **kwargs)
+
+
+class ScanJob(StatusVersionedModel):
     """Background inspection job that collects schema/log metadata."""
 
     class Kind(models.TextChoices):
@@ -148,6 +225,9 @@ class ScanJob(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["workspace", "status_version"]),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - helper
         return f"{self.get_kind_display()} ({self.get_status_display()})"
@@ -193,10 +273,47 @@ class TaskPreset(models.Model):
             raise ValidationError({"command": str(exc)}) from exc
 
 
-class WorkspaceTaskRun(models.Model):
+class TaskPipelineRun(models.Model):
+    """One execution of a pipeline (``INSPECTOR_TASK_PIPELINES``); its steps are child runs."""
+
+    class Status(models.TextChoices):
+        RUNNING = ("running", "Running")
+        SUCCEEDED = ("succeeded", "Succeeded")
+        FAILED = ("failed", "Failed")
+
+    workspace = models.ForeignKey(
+        Workspace,
+        related_name="pipeline_runs",
+        on_delete=models.CASCADE,
+    )
+    key = models.SlugField(max_length=64)
+    label = models.CharField(max_length=140)
+    requested_by = models.CharField(max_length=120, default="system")
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.RUNNING,
+    )
+    # Per-step state ("pending", "started", "skipped") keyed by step key.
+    steps = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover - helper
+        return f"{self.label} ({self.get_status_display()})"
+
+
+class WorkspaceTaskRun(StatusVersionedModel):
     """Instance of a `django-tasks` command associated with a workspace."""
 
-    LOG_BATCH_SIZE = 5
+    # Base line-count trigger for log flushes; see ``LogFlushPolicy`` for time/size triggers.
+    LOG_BATCH_SIZE = 50
+    LOG_TAIL_LINES = 5
+    # Minimum seconds between database checks for a pending cancel request.
+    CANCEL_POLL_SECONDS = 0.5
 
     class Status(models.TextChoices):
         REQUESTED = ("requested", "Requested")
@@ -222,30 +339,129 @@ class WorkspaceTaskRun(models.Model):
         default=Status.REQUESTED,
     )
     progress = models.PositiveSmallIntegerField(default=0)
-    log = models.TextField(blank=True)
+    log_line_count = models.PositiveIntegerField(default=0)
+    log_tail = models.JSONField(default=list, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
     result_id = models.CharField(max_length=64, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    cancel_requested_at = models.DateTimeField(null=True, blank=True)
+    pipeline = models.ForeignKey(
+        TaskPipelineRun,
+        related_name="runs",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["workspace", "status_version"]),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - helper
         return f"{self.preset.label} ({self.get_status_display()})"
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        super().save(*args, **kwargs)
+        transaction.on_commit(self._publish_event, using=kwargs.get("using"))
+
+    def _publish_event(self) -> None:
+        # The chunk ``flush_state`` just wrote rides along: one event per flush, not per line.
+        seq, lines = getattr(self, "_unpublished_chunk", None) or (None, None)
+        self._unpublished_chunk = None
+        realtime.publish_task_event(
+            workspace_id=self.workspace_id,
+            run_id=self.pk,
+            status=self.status,
+            progress=self.progress,
+            log_line=lines,
+            seq=seq,
+        )
+
+    @property
+    def command_line(self) -> str:
+        """The command to execute: the preset's, or one a pipeline step derived from it."""
+        return ((self.metadata or {}).get("command_line") or self.preset.command or "").strip()
+
     def mark_running(self) -> None:
-        self.status = self.Status.RUNNING
-        self.started_at = timezone.now()
-        self.save(update_fields=["status", "started_at"])
+        self.stage(status=self.Status.RUNNING, started_at=timezone.now())
+        self.flush_state()
 
     def mark_finished(self, *, success: bool) -> None:
-        self.flush_log_buffer()
-        self.status = self.Status.SUCCEEDED if success else self.Status.FAILED
-        self.completed_at = timezone.now()
-        self.progress = 100
-        self.save(update_fields=["status", "completed_at", "progress"])
+        metadata = self.metadata or {}
+        metadata["log_flush"] = self.log_policy.snapshot()
+        self.stage(
+            status=self.Status.SUCCEEDED if success else self.Status.FAILED,
+            completed_at=timezone.now(),
+            progress=100,
+            metadata=metadata,
+        )
+        self.flush_state()
+
+    def mark_cancelled(self) -> None:
+        metadata = self.metadata or {}
+        metadata["log_flush"] = self.log_policy.snapshot()
+        self.stage(status=self.Status.CANCELLED, completed_at=timezone.now(), metadata=metadata)
+        self.flush_state()
+
+    def request_cancel(self) -> bool:
+        """
+        Cancel a queued run at once, or flag a running one for its worker to stop.
+
+        Returns ``False`` when the run already finished.
+        """
+
+        with transaction.atomic():
+            self.refresh_from_db(fields=["status", "cancel_requested_at"])
+            if self.status == self.Status.REQUESTED:
+                self.append_log("Cancelled before a worker picked it up.")
+                self.stage(cancel_requested_at=timezone.now())
+                self.mark_cancelled()
+                return True
+            if self.status == self.Status.RUNNING:
+                if self.cancel_requested_at is None:
+                    self.cancel_requested_at = timezone.now()
+                    self.save(update_fields=["cancel_requested_at"])
+                return True
+        return False
+
+    def cancel_requested(self) -> bool:
+        """Worker-side check for a cancel request, hitting the database at most every 0.5s."""
+        if self.cancel_requested_at is not None:
+            return True
+        now = time.monotonic()
+        if now - getattr(self, "_cancel_checked_at", 0.0) < self.CANCEL_POLL_SECONDS:
+            return False
+        self._cancel_checked_at = now
+        requested_at = (
+            WorkspaceTaskRun.objects.filter(pk=self.pk)
+            .values_list("cancel_requested_at", flat=True)
+            .first()
+        )
+        self.cancel_requested_at = requested_at
+        return requested_at is not None
+
+    @property
+    def log_policy(self) -> LogFlushPolicy:
+        policy = getattr(self, "_log_policy", None)
+        if policy is None:
+            policy = self._log_policy = LogFlushPolicy(base_lines=self.LOG_BATCH_SIZE)
+        return policy
+
+    def stage(self, **changes: Any) -> None:
+        """Set fields now and write them with the next ``flush_state`` (write-behind)."""
+        for field, value in changes.items():
+            setattr(self, field, value)
+        self._staged_fields = {*getattr(self, "_staged_fields", ()), *changes}
+        self.log_policy.note()
+
+    @property
+    def logged_line_count(self) -> int:
+        """Lines logged so far, including ones still waiting in the write buffer."""
+        return self.log_line_count + len(getattr(self, "_log_buffer", ()))
 
     def append_log(self, message: str) -> None:
         stamp = timezone.now().strftime("%H:%M:%S")
@@ -255,20 +471,95 @@ class WorkspaceTaskRun(models.Model):
             buffer = []
             self._log_buffer = buffer
         buffer.append(new_line)
-        if len(buffer) >= self.LOG_BATCH_SIZE:
-            self.flush_log_buffer()
-
-    def flush_log_buffer(self) -> None:
-        buffer = getattr(self, "_log_buffer", None)
-        if not buffer:
+        self.log_policy.note(lines=1, size=len(new_line) + 1)
+        self.flush_if_due()
+
+    def replay_log(self, lines: list[str]) -> None:
+        """Buffer already-stamped ``lines`` (e.g. cached command output) for the next flush."""
+        self._log_buffer = [*getattr(self, "_log_buffer", []), *lines]
+        self.log_policy.note(lines=len(lines), size=sum(len(line) + 1 for line in lines))
+
+    def flush_if_due(self) -> None:
+        """Flush when the log policy's time, size, or line trigger has fired."""
+        reason = self.log_policy.due()
+        if reason is not None:
+            self.flush_state(reason=reason)
+
+    def flush_state(self, *, reason: str = "forced") -> None:
+        """Write buffered log lines and staged fields in a single transaction."""
+        buffer = getattr(self, "_log_buffer", None) or []
+        staged = getattr(self, "_staged_fields", None) or set()
+        if not buffer and not staged:
             return
-        chunk = "\n".join(buffer)
         self._log_buffer = []
-        if self.log:
-            self.log = f"{self.log}\n{chunk}"
-        else:
-            self.log = chunk
-        self.save(update_fields=["log"])
+        self._staged_fields = set()
+        self.log_policy.flushed(reason)
+        with transaction.atomic():
+            if buffer:
+                chunk = TaskLogChunk.objects.create(
+                    run=self,
+                    sequence=self._next_log_sequence(),
+                    lines="\n".join(buffer),
+                    line_count=len(buffer),
+                )
+                self._unpublished_chunk = (chunk.sequence, chunk.lines)
+                # Keep a constant-size summary on the run so status payloads never read chunks.
+                self.log_line_count += len(buffer)
+                self.log_tail = [*self.log_tail, *buffer][-self.LOG_TAIL_LINES :]
+                staged |= {"log_line_count", "log_tail"}
+            self.save(update_fields=sorted(staged))
+
+    def flush_log_buffer(self) -> None:
+        """Persist pending log lines now (staged fields ride along in the same write)."""
+        self.flush_state()
+
+    def _next_log_sequence(self) -> int:
+        sequence = getattr(self, "_log_sequence", None)
+        if sequence is None:
+            sequence = self.log_chunks.aggregate(models.Max("sequence"))["sequence__max"] or 0
+        self._log_sequence = sequence + 1
+        return self._log_sequence
+
+    def read_log(self, *, after_seq: int = 0) -> tuple[str, int]:
+        """Return persisted log text after chunk ``after_seq`` plus the last sequence read."""
+        chunks = list(
+            self.log_chunks.filter(sequence__gt=after_seq).values_list("sequence", "lines")
+        )
+        if not chunks:
+            return "", after_seq
+        return "\n".join(lines for _, lines in chunks), chunks[-1][0]
+
+    @property
+    def log(self) -> str:
+        """Full persisted log output (reads every chunk; prefer ``read_log`` for tails)."""
+        text, _ = self.read_log()
+        return text
+
+
+class TaskLogChunk(models.Model):
+    """Append-only batch of log lines written by a task run."""
+
+    run = models.ForeignKey(
+        WorkspaceTaskRun,
+        related_name="log_chunks",
+        on_delete=models.CASCADE,
+    )
+    sequence = models.PositiveIntegerField()
+    lines = models.TextField()
+    line_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run", "sequence"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "sequence"],
+                name="inspector_tasklogchunk_unique_sequence",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - helper
+        return f"{self.run_id}#{self.sequence}"
 
 
 class DocLink(models.Model):
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Longest settings value kept in parsed diffsettings output.
+VALUE_LIMIT = 500
+
+
+class OutputParser(ABC):
+    """
+    Incremental parser fed each output line of a command while it runs.
+
+    Subclasses keep whatever running state they need in ``feed`` and return a JSON-able
+    summary from ``result``; it is stored under ``metadata.command.parsed[kind]``. Both
+    are abstract, so an incomplete parser fails when it is created, not mid-run.
+    """
+
+    kind = ""
+
+    def __init__(self) -> None:
+        self.failed = False
+
+    @abstractmethod
+    def feed(self, line: str) -> None: ...
+
+    @abstractmethod
+    def result(self) -> dict[str, Any]: ...
+
+
+class ShowMigrationsParser(OutputParser):
+    """Applied and unapplied migrations per app from ``showmigrations`` list or plan output."""
+
+    kind = "showmigrations"
+    APP = re.compile(r"^(?P<app>[A-Za-z_]\w*)$")
+    ENTRY = re.compile(r"^\s+\[(?P<mark>[ X-])\] (?P<name>\S+)")
+    NO_MIGRATIONS = re.compile(r"^\s+\(no migrations\)$")
+    PLAN_ENTRY = re.compile(r"^\[(?P<mark>[ X-])\]\s+(?P<app>[\w]+)\.(?P<name>\S+)")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.apps: dict[str, dict[str, list[str]]] = {}
+        self.app: str | None = None
+
+    def feed(self, line: str) -> None:
+        if not line.strip():
+            return
+        if plan := self.PLAN_ENTRY.match(line):
+            self._add(plan["app"], plan["mark"], plan["name"])
+        elif not line[0].isspace():
+            # An app label only counts once a migration entry follows it, so stray
+            # unindented lines (tracebacks, warnings) never become apps.
+            heading = self.APP.match(line.rstrip())
+            self.app = heading["app"] if heading else None
+        elif self.app is None:
+            return
+        elif match := self.ENTRY.match(line):
+            self._add(self.app, match["mark"], match["name"])
+        elif self.NO_MIGRATIONS.match(line.rstrip()):
+            self.apps.setdefault(self.app, {"applied": [], "unapplied": []})
+
+    def _add(self, app: str, mark: str, name: str) -> None:
+        bucket = "applied" if mark == "X" else "unapplied"
+        self.apps.setdefault(app, {"applied": [], "unapplied": []})[bucket].append(name)
+
+    def result(self) -> dict[str, Any]:
+        return {
+            "apps": self.apps,
+            "applied": sum(len(app["applied"]) for app in self.apps.values()),
+            "unapplied": sum(len(app["unapplied"]) for app in self.apps.values()),
+        }
+
+
+class CheckParser(OutputParser):
+    """System check messages with their level, ID, object, and hint."""
+
+    kind = "check"
+    LEVELS = {
+        "CRITICALS:": "critical",
+        "ERRORS:": "error",
+        "WARNINGS:": "warning",
+        "INFOS:": "info",
+        "DEBUGS:": "debug",
+    }
+    MESSAGE = re.compile(r"^(?P<object>.+?): \((?P<id>[\w.]+)\) (?P<message>.*)$")
+    SUMMARY = re.compile(r"System check identified .*\((?P<silenced>\d+) silenced\)")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.level: str | None = None
+        self.messages: list[dict[str, Any]] = []
+        self.silenced = 0
+        self.completed = False
+
+    def feed(self, line: str) -> None:
+        stripped = line.strip()
+        if stripped in self.LEVELS:
+            self.level = self.LEVELS[stripped]
+        elif summary := self.SUMMARY.search(stripped):
+            self.silenced = int(summary["silenced"])
+            self.completed = True
+        elif stripped.startswith("HINT:") and self.messages:
+            self.messages[-1]["hint"] = stripped.removeprefix("HINT:").strip()
+        elif self.level and (match := self.MESSAGE.match(stripped)):
+            self.messages.append({"level": self.level, **match.groupdict(), "hint": None})
+
+    def result(self) -> dict[str, Any]:
+        counts = Counter(message["level"] for message in self.messages)
+        return {
+            "messages": self.messages,
+            "counts": dict(counts),
+            "silenced": self.silenced,
+            "passed": not (counts["error"] or counts["critical"]),
+            "completed": self.completed,
+        }
+
+
+class DiffSettingsParser(OutputParser):
+    """Settings that differ from Django's defaults, in ``hash`` or ``unified`` output."""
+
+    kind = "diffsettings"
+    HASH = re.compile(
+        r"^(?P<default>###)?(?P<key>[A-Z][A-Z0-9_]*) = (?P<value>.*?)(?P<custom>\s+###)?$"
+    )
+    UNIFIED = re.compile(r"^(?P<sign>[+-]) (?P<key>[A-Z][A-Z0-9_]*) = (?P<value>.*)$")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.settings: dict[str, str] = {}
+        self.defaults: dict[str, str] = {}
+        self.custom: list[str] = []
+
+    def feed(self, line: str) -> None:
+        if match := self.UNIFIED.match(line):
+            target = self.settings if match["sign"] == "+" else self.defaults
+            target[match["key"]] = match["value"][:VALUE_LIMIT]
+        elif (match := self.HASH.match(line)) and not match["default"]:
+            # ``###`` prefix: equal to the default (only shown with --all).
+            self.settings[match["key"]] = match["value"][:VALUE_LIMIT]
+            if match["custom"]:
+                self.custom.append(match["key"])
+
+    def result(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "settings": self.settings,
+            "custom": self.custom,
+            "count": len(self.settings),
+        }
+        if self.defaults:
+            result["defaults"] = self.defaults
+        return result
+
+
+def parsers_for(safe_prefix: str) -> list[OutputParser]:
+    """Fresh parser instances registered for ``safe_prefix`` in ``INSPECTOR_OUTPUT_PARSERS``."""
+    paths = settings.INSPECTOR_OUTPUT_PARSERS.get(safe_prefix, ())
+    if isinstance(paths, str):
+        paths = (paths,)
+    return [import_string(path)() for path in paths]
+
+
+def feed(parsers: Iterable[OutputParser], line: str) -> None:
+    """Feed ``line`` to every parser; a parser that raises is disabled, the command goes on."""
+    for parser in parsers:
+        if parser.failed:
+            continue
+        try:
+            parser.feed(line)
+        except Exception:
+            parser.failed = True
+            logger.exception("Output parser %s failed; disabling it.", type(parser).__name__)
+
+
+def results(parsers: Sequence[OutputParser]) -> dict[str, Any] | None:
+    """Collected ``result()`` of the parsers that did not fail, keyed by ``kind``."""
+    parsed = {parser.kind: parser.result() for parser in parsers if not parser.failed}
+    return parsed or None
+
+
+def trusted_results(parsed: dict[str, Any], exit_code: int) -> dict[str, Any]:
+    """
+    Parsed results that describe the project rather than a failed command.
+
+    Everything counts after a clean exit. After a non-zero exit only ``check`` results
+    count, and only if ``check`` printed its summary, since it exits non-zero exactly when
+    it found errors; any other output is a crash (e.g. a settings import error).
+    """
+
+    if exit_code == 0:
+        return parsed
+    check = parsed.get("check")
+    return {"check": check} if check and check.get("completed") else {}
+
+
+def card_delta(previous: dict[str, Any] | None, value: int) -> str:
+    """``delta`` text of an insight card whose ``value`` was ``previous["value"]`` before."""
+    try:
+        change = value - int(previous["value"]) if previous else None
+    except (KeyError, TypeError, ValueError):
+        change = None
+    if change is None:
+        return "first run"
+    return f"{change:+d} vs last run" if change else "unchanged"
+
+
+def parsed_insights(
+    parsed: dict[str, Any], previous: dict[str, dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Dashboard insight cards for parsed results; ``previous`` maps titles to old cards."""
+    insights = []
+    if migrations := parsed.get("showmigrations"):
+        pending = migrations["unapplied"]
+        apps = [label for label, app in migrations["apps"].items() if app["unapplied"]]
+        insights.append(
+            {
+                "title": "Pending migrations",
+                "value": str(pending),
+                "delta": card_delta(previous.get("Pending migrations"), pending),
+                "severity": "warning" if pending else "success",
+                "caption": " · ".join(apps[:4]) or "All migrations applied",
+                "icon": "git-branch",
+                "source": "showmigrations",
+            }
+        )
+    if check := parsed.get("check"):
+        issues = len(check["messages"])
+        counts = check["counts"]
+        severity = "success"
+        if counts.get("warning"):
+            severity = "warning"
+        if not check["passed"]:
+            severity = "danger"
+        insights.append(
+            {
+                "title": "System check issues",
+                "value": str(issues),
+                "delta": card_delta(previous.get("System check issues"), issues),
+                "severity": severity,
+                "caption": ", ".join(f"{count} {level}" for level, count in sorted(counts.items()))
+                or "No issues",
+                "icon": "shield-check",
+                "source": "check",
+            }
+        )
+    if diff := parsed.get("diffsettings"):
+        insights.append(
+            {
+                "title": "Changed settings",
+                "value": str(diff["count"]),
+                "delta": card_delta(previous.get("Changed settings"), diff["count"]),
+                "severity": "info",
+                "caption": ", ".join(list(diff["settings"])[:4]) or "Django defaults",
+                "icon": "sliders",
+                "source": "diffsettings",
+            }
+        )
+    return insights
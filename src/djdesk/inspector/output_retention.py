@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import gzip
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+
+def spill_path_for(run_id: int) -> Path:
+    """Location of the compressed full output of task run ``run_id``."""
+    return Path(settings.INSPECTOR_TASK_OUTPUT_ROOT) / f"task-run-{run_id}.log.gz"
+
+
+class HeadTailLog:
+    """
+    ``log_callback`` wrapper that keeps only the first ``head`` and last ``tail`` lines.
+
+    Head lines are forwarded as they arrive; later lines are held in a fixed-size ring buffer
+    and forwarded after a truncation marker by ``close()``. While the command runs, ``tick()``
+    forwards a progress marker with the latest buffered line at most every
+    ``progress_interval`` seconds. Every line is also streamed into a gzip spill file, which
+    is removed again if nothing was truncated. Memory use and the number of forwarded lines
+    are bounded no matter how much the command prints.
+    """
+
+    def __init__(
+        self,
+        forward: Callable[[str], None],
+        *,
+        head: int,
+        tail: int,
+        spill_path: Path,
+        progress_interval: float = 5.0,
+    ) -> None:
+        self.forward = forward
+        self.head = head
+        self.progress_interval = progress_interval
+        self.progress_at = time.monotonic()
+        self.progress_lines = 0
+        self.ring: deque[str] = deque(maxlen=tail)
+        self.spill_path = spill_path
+        spill_path.parent.mkdir(parents=True, exist_ok=True)
+        self.spill = gzip.open(spill_path, "wt", encoding="utf-8", compresslevel=6)
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.forwarded_bytes = 0
+
+    def __call__(self, line: str) -> None:
+        self.spill.write(line + "\n")
+        size = len(line.encode("utf-8", errors="replace")) + 1
+        self.total_lines += 1
+        self.total_bytes += size
+        if self.total_lines <= self.head:
+            self.forwarded_bytes += size
+            self.forward(line)
+        else:
+            self.ring.append(line)
+
+    def tick(self) -> None:
+        """Report lines buffered since the last marker; call from the runner's heartbeat."""
+        buffered = self.total_lines - self.head
+        if buffered <= self.progress_lines:
+            return
+        now = time.monotonic()
+        if now - self.progress_at < self.progress_interval:
+            return
+        self.progress_at, self.progress_lines = now, buffered
+        self.forward(
+            f"… {buffered} lines buffered after the first {self.head}; latest: {self.ring[-1]}"
+        )
+
+    def close(self) -> dict[str, Any]:
+        """Flush the tail (after a marker if lines were dropped) and describe what was kept."""
+        self.spill.close()
+        omitted_lines = self.total_lines - self.head - len(self.ring)
+        tail_bytes = sum(len(line.encode("utf-8", errors="replace")) + 1 for line in self.ring)
+        omitted_bytes = self.total_bytes - self.forwarded_bytes - tail_bytes
+        summary: dict[str, Any] = {
+            "truncated": omitted_lines > 0,
+            "total_lines": self.total_lines,
+            "total_bytes": self.total_bytes,
+        }
+        if omitted_lines > 0:
+            self.forward(
+                f"… {omitted_lines} lines ({omitted_bytes} bytes) omitted; "
+                f"full output saved to {self.spill_path}"
+            )
+            summary.update(
+                head_lines=self.head,
+                tail_lines=len(self.ring),
+                omitted_lines=omitted_lines,
+                omitted_bytes=omitted_bytes,
+                spill_path=str(self.spill_path),
+            )
+        else:
+            self.spill_path.unlink(missing_ok=True)
+        for line in self.ring:
+            self.forward(line)
+        self.ring.clear()
+        return summary
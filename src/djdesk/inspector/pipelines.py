@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from graphlib import CycleError, TopologicalSorter
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .command_runner import validate_safe_command
+from .models import TaskPipelineRun, TaskPreset, Workspace, WorkspaceTaskRun
+
+FINISHED_RUN_STATUSES = {
+    WorkspaceTaskRun.Status.SUCCEEDED,
+    WorkspaceTaskRun.Status.FAILED,
+    WorkspaceTaskRun.Status.CANCELLED,
+}
+TERMINAL_STEP_STATES = {"succeeded", "failed", "skipped"}
+
+
+class PipelineError(ValueError):
+    """Raised for unknown pipelines and invalid pipeline definitions."""
+
+
+def pending_migrations(sources: list[WorkspaceTaskRun]) -> list[list[str]]:
+    """``[app_label, migration]`` pairs listed as unapplied by ``showmigrations`` runs."""
+    items = []
+    for run in sources:
+        parsed = (run.metadata or {}).get("command", {}).get("parsed") or {}
+        apps = parsed.get("showmigrations", {}).get("apps", {})
+        for app, migrations in apps.items():
+            items.extend([app, name] for name in migrations["unapplied"])
+    return items
+
+
+# ``for_each`` sources: turn the runs of a step's dependencies into argument lists.
+FOR_EACH: dict[str, Callable[[list[WorkspaceTaskRun]], list[list[str]]]] = {
+    "pending_migrations": pending_migrations,
+}
+
+
+def pipeline_definition(key: str) -> dict[str, Any]:
+    """Return the validated ``INSPECTOR_TASK_PIPELINES`` entry for ``key``."""
+    try:
+        definition = settings.INSPECTOR_TASK_PIPELINES[key]
+    except KeyError as exc:
+        raise PipelineError(f"Unknown pipeline {key!r}.") from exc
+    graph = {step["key"]: set(step.get("after", ())) for step in definition["steps"]}
+    unknown = set().union(*graph.values()) - graph.keys()
+    if unknown:
+        raise PipelineError(f"Pipeline {key!r} depends on unknown steps: {sorted(unknown)}.")
+    for step in definition["steps"]:
+        if step.get("for_each") and step["for_each"] not in FOR_EACH:
+            raise PipelineError(f"Step {step['key']!r} has an unknown for_each source.")
+    try:
+        tuple(TopologicalSorter(graph).static_order())
+    except CycleError as exc:
+        raise PipelineError(f"Pipeline {key!r} has a dependency cycle: {exc.args[1]}.") from exc
+    return definition
+
+
+def create_pipeline_run(
+    workspace: Workspace, key: str, *, requested_by: str = "inspector"
+) -> TaskPipelineRun:
+    """Record a new pipeline run; ``advance_pipeline`` creates its first child runs."""
+    definition = pipeline_definition(key)
+    wanted = {step["preset"] for step in definition["steps"]}
+    found = set(TaskPreset.objects.filter(key__in=wanted).values_list("key", flat=True))
+    if wanted - found:
+        raise PipelineError(f"Pipeline {key!r} uses unknown presets: {sorted(wanted - found)}.")
+    return TaskPipelineRun.objects.create(
+        workspace=workspace,
+        key=key,
+        label=definition["label"],
+        requested_by=requested_by,
+        steps={step["key"]: "pending" for step in definition["steps"]},
+    )
+
+
+def step_states(pipeline: TaskPipelineRun, runs: list[WorkspaceTaskRun]) -> dict[str, str]:
+    """Derive each step's state: pending, running, succeeded, failed, or skipped."""
+    statuses: dict[str, list[str]] = {}
+    for run in runs:
+        statuses.setdefault(run.metadata.get("pipeline_step"), []).append(run.status)
+    states = {}
+    for key, recorded in pipeline.steps.items():
+        if recorded != "started":
+            states[key] = recorded
+            continue
+        step_statuses = statuses.get(key, [])
+        if any(status not in FINISHED_RUN_STATUSES for status in step_statuses):
+            states[key] = "running"
+        elif all(status == WorkspaceTaskRun.Status.SUCCEEDED for status in step_statuses):
+            states[key] = "succeeded"  # includes a for_each step that had nothing to do
+        else:
+            states[key] = "failed"
+    return states
+
+
+def _step_runs(
+    pipeline: TaskPipelineRun, step: dict[str, Any], sources: list[WorkspaceTaskRun]
+) -> list[WorkspaceTaskRun]:
+    preset = TaskPreset.objects.get(key=step["preset"])
+    metadata = {"pipeline_step": step["key"], "notes": f"{pipeline.label} › {step['key']}"}
+    if not step.get("for_each"):
+        commands = [None]
+    else:
+        prefix = validate_safe_command(preset.command)
+        commands = [" ".join([prefix, *args]) for args in FOR_EACH[step["for_each"]](sources)]
+    return [
+        WorkspaceTaskRun.objects.create(
+            workspace_id=pipeline.workspace_id,
+            preset=preset,
+            pipeline=pipeline,
+            requested_by=pipeline.requested_by,
+            metadata={**metadata, "command_line": command} if command else metadata,
+        )
+        for command in commands
+    ]
+
+
+def advance_pipeline(pipeline_id: int) -> list[WorkspaceTaskRun]:
+    """
+    Start every step whose dependencies succeeded and skip those that can no longer run.
+
+    Returns the new child runs, which the caller queues once this transaction committed.
+    Independent steps therefore run in parallel on the worker pool, and a dependent step
+    starts as soon as its last input finishes. The pipeline closes when no step is left.
+    """
+
+    created: list[WorkspaceTaskRun] = []
+    with transaction.atomic():
+        pipeline = TaskPipelineRun.objects.select_for_update().get(pk=pipeline_id)
+        if pipeline.status != TaskPipelineRun.Status.RUNNING:
+            return []
+        definition = pipeline_definition(pipeline.key)
+        runs = list(pipeline.runs.select_related("preset"))
+        states = step_states(pipeline, runs)
+        progressed = True
+        while progressed:  # skipping or finishing a step can unblock the next one
+            progressed = False
+            for step in definition["steps"]:
+                if states[step["key"]] != "pending":
+                    continue
+                after = step.get("after", ())
+                inputs = [states[key] for key in after]
+                if any(state in {"failed", "skipped"} for state in inputs):
+                    pipeline.steps[step["key"]] = states[step["key"]] = "skipped"
+                elif all(state == "succeeded" for state in inputs):
+                    sources = [run for run in runs if run.metadata.get("pipeline_step") in after]
+                    new_runs = _step_runs(pipeline, step, sources)
+                    created.extend(new_runs)
+                    pipeline.steps[step["key"]] = "started"
+                    states[step["key"]] = "running" if new_runs else "succeeded"
+                else:
+                    continue
+                progressed = True
+
+        if all(state in TERMINAL_STEP_STATES for state in states.values()):
+            succeeded = all(state == "succeeded" for state in states.values())
+            pipeline.status = (
+                TaskPipelineRun.Status.SUCCEEDED if succeeded else TaskPipelineRun.Status.FAILED
+            )
+            pipeline.completed_at = timezone.now()
+        pipeline.save()
+    return created
+
+
+def pipeline_payload(pipeline: TaskPipelineRun) -> dict[str, Any]:
+    """Serialize a pipeline run with its step states and child runs."""
+    runs = list(pipeline.runs.select_related("preset").order_by("pk"))
+    states = step_states(pipeline, runs)
+    durations = [
+        run.metadata.get("command", {}).get("duration_seconds") or 0
+        for run in runs
+        if run.status in FINISHED_RUN_STATUSES
+    ]
+    end = pipeline.completed_at or timezone.now()
+    return {
+        "id": pipeline.pk,
+        "key": pipeline.key,
+        "label": pipeline.label,
+        "workspace": pipeline.workspace.slug,
+        "status": pipeline.status,
+        "steps": [
+            {
+                "key": key,
+                "state": state,
+                "runs": [
+                    {
+                        "id": run.pk,
+                        "command": run.command_line,
+                        "status": run.status,
+                        "exit_code": run.metadata.get("command", {}).get("exit_code"),
+                    }
+                    for run in runs
+                    if run.metadata.get("pipeline_step") == key
+                ],
+            }
+            for key, state in states.items()
+        ],
+        # Wall time against the summed run durations shows what parallel steps saved.
+        "wall_seconds": round((end - pipeline.created_at).total_seconds(), 3),
+        "run_seconds": round(sum(durations), 3),
+    }
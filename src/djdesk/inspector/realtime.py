@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ALL_WORKSPACES_GROUP = "workspace-status"
+
+
+def workspace_status_group(workspace_id: int) -> str:
+    """Channel group notified whenever ``workspace_id``'s status version bumps."""
+    return f"workspace-status-{workspace_id}"
+
+
+def task_runs_group(workspace_id: int) -> str:
+    """Channel group receiving task run events (status and log chunks) for ``workspace_id``."""
+    return f"task-runs-{workspace_id}"
+
+
+def _group_send(group: str, message: dict[str, Any]) -> None:
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        async_to_sync(layer.group_send)(group, message)
+    except Exception:  # pragma: no cover - pushing is best effort, polling still works
+        logger.exception("Unable to publish realtime event to %s", group)
+
+
+def notify_status_changed(workspace_id: int | None) -> None:
+    """Wake WebSocket consumers so they push a status delta to the renderer."""
+    group = ALL_WORKSPACES_GROUP if workspace_id is None else workspace_status_group(workspace_id)
+    _group_send(group, {"type": "status.changed"})
+
+
+def publish_task_event(
+    *,
+    workspace_id: int,
+    run_id: int,
+    status: str,
+    progress: int,
+    log_line: str | None = None,
+    seq: int | None = None,
+) -> None:
+    """Send a task progress delta (optionally carrying a log chunk) to drawer listeners."""
+    event = task_event(run_id=run_id, status=status, progress=progress, log_line=log_line, seq=seq)
+    _group_send(task_runs_group(workspace_id), {"type": "task.event", "event": event})
+
+
+def task_event(
+    *,
+    run_id: int,
+    status: str,
+    progress: int,
+    log_line: str | None = None,
+    seq: int | None = None,
+) -> dict[str, Any]:
+    """
+    Payload of one task stream message.
+
+    ``seq`` is set when ``log_line`` carries a persisted log chunk, so the drawer can skip
+    chunks it already read over HTTP.
+    """
+
+    event: dict[str, Any] = {
+        "id": run_id,
+        "status": status,
+        "progress": progress,
+        "log_line": log_line,
+        "timestamp": timezone.now().isoformat(),
+    }
+    if seq is not None:
+        event["seq"] = seq
+    return event
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+
+from .command_runner import CommandResult
+from .models import WorkspaceTaskRun
+from .warm_worker import FINGERPRINT_SKIP_DIRS
+
+# Files whose changes can alter the output of the cacheable introspection commands.
+FINGERPRINT_FILENAMES = {
+    "manage.py",
+    "settings.py",
+    "models.py",
+    "urls.py",
+    "apps.py",
+    "admin.py",
+    "checks.py",
+    ".env",
+}
+FINGERPRINT_PACKAGES = {"settings", "models", "migrations"}
+
+
+def is_cacheable(safe_prefix: str) -> bool:
+    return safe_prefix in settings.INSPECTOR_CACHEABLE_COMMANDS
+
+
+def workspace_fingerprint(workdir: Path) -> str:
+    """
+    Hash the path, mtime, and size of settings, models, migrations, and local databases.
+
+    Only ``stat`` is used, so fingerprinting a large project costs one directory walk.
+    """
+
+    entries: list[str] = []
+    for root, dirs, files in os.walk(workdir):
+        dirs[:] = sorted(
+            d for d in dirs if not d.startswith(".") and d not in FINGERPRINT_SKIP_DIRS
+        )
+        in_package = Path(root).name in FINGERPRINT_PACKAGES
+        top_level = Path(root) == workdir
+        for name in sorted(files):
+            watched = (
+                name in FINGERPRINT_FILENAMES
+                or (in_package and name.endswith(".py"))
+                # Applied migrations live in the project database (showmigrations).
+                or (top_level and ".sqlite" in name)
+            )
+            if not watched:
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            relative = os.path.relpath(path, workdir)
+            entries.append(f"{relative}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha256("\n".join(entries).encode()).hexdigest()
+
+
+def find_cached_run(
+    run: WorkspaceTaskRun, command: str, fingerprint: str
+) -> WorkspaceTaskRun | None:
+    """Return the latest successful run of ``command`` recorded with ``fingerprint``."""
+    return (
+        WorkspaceTaskRun.objects.filter(
+            workspace_id=run.workspace_id,
+            status=WorkspaceTaskRun.Status.SUCCEEDED,
+            metadata__command__raw=command,
+            metadata__command__fingerprint=fingerprint,
+            metadata__command__log_lines__isnull=False,
+        )
+        .exclude(pk=run.pk)
+        .order_by("-completed_at")
+        .first()
+    )
+
+
+def cached_output(source: WorkspaceTaskRun) -> tuple[CommandResult, list[str]]:
+    """Rebuild the ``CommandResult`` and command output lines recorded on ``source``."""
+    meta = source.metadata["command"]
+    start, end = meta["log_lines"]
+    lines = source.log.split("\n")[start:end]
+    result = CommandResult(
+        exit_code=meta["exit_code"],
+        duration=meta["duration_seconds"],
+        output_lines=meta["output_lines"],
+        safe_prefix=meta["safe_prefix"],
+        timed_out=meta["timed_out"],
+        warm=meta.get("warm_worker", False),
+        parsed=meta.get("parsed"),
+    )
+    return result, lines
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    path(
+        "ws/workspaces/<slug:slug>/",
+        consumers.WorkspaceStatusConsumer.as_asgi(),
+        name="workspace-status-stream",
+    ),
+    path(
+        "ws/task-runs/<slug:workspace>/",
+        consumers.TaskRunStreamConsumer.as_asgi(),
+        name="task-run-stream",
+    ),
+]
@@ -0,0 +1,62 @@
+"""
+Run a command and report the resources it used.
+
+Started by ``djdesk.inspector.command_runner`` as ``python rusage_launcher.py <fd> <argv…>``.
+The command inherits stdin/stdout/stderr and the process group; once it exits, its
+``os.wait4`` rusage is written as one JSON object to file descriptor ``<fd>`` and the
+launcher exits the same way the command did. asyncio reaps its own children without
+exposing their rusage, hence this small indirection.
+
+This file must not import anything from djdesk; it only needs the standard library.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import sys
+
+RUSAGE_FIELDS = (
+    "ru_utime",
+    "ru_stime",
+    "ru_maxrss",
+    "ru_inblock",
+    "ru_oublock",
+    "ru_nvcsw",
+    "ru_nivcsw",
+)
+
+
+def main() -> None:
+    report_fd = int(sys.argv[1])
+    argv = sys.argv[2:]
+    # The command must not hold the report pipe open after the launcher is gone.
+    os.set_inheritable(report_fd, False)
+    try:
+        pid = os.posix_spawnp(argv[0], argv, os.environ)
+    except OSError as exc:
+        print(f"Unable to start command: {exc}", file=sys.stderr)
+        raise SystemExit(127) from None
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: os.kill(pid, signum))
+    while True:
+        try:
+            _, status, usage = os.wait4(pid, 0)
+            break
+        except InterruptedError:
+            continue
+
+    with os.fdopen(report_fd, "w") as report:
+        json.dump({field: getattr(usage, field) for field in RUSAGE_FIELDS}, report)
+
+    if os.WIFSIGNALED(status):
+        signum = os.WTERMSIG(status)
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+    raise SystemExit(os.waitstatus_to_exitcode(status))
+
+
+if __name__ == "__main__":
+    main()
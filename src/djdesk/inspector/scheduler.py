@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TaskPreset, WorkspaceTaskRun
+
+# Runs still RUNNING this long after their timeout are treated as abandoned (crashed worker)
+# and no longer count against the caps.
+STALE_RUN_GRACE_SECONDS = 60
+
+
+def task_priority(preset: TaskPreset) -> int:
+    """Queue priority for ``preset``'s category; negative priorities mark bulk work."""
+    return settings.INSPECTOR_TASK_PRIORITIES.get(preset.category, 0)
+
+
+def record_enqueue(run: WorkspaceTaskRun, priority: int) -> dict[str, Any]:
+    """Store queue position details on ``run`` before it is handed to the backend."""
+    waiting = WorkspaceTaskRun.objects.filter(status=WorkspaceTaskRun.Status.REQUESTED).exclude(
+        pk=run.pk
+    )
+    scheduler = {
+        "priority": priority,
+        "queued_at": timezone.now().isoformat(),
+        "queue_depth": waiting.count(),
+        "deferrals": 0,
+    }
+    run.metadata = {**(run.metadata or {}), "scheduler": scheduler}
+    run.save(update_fields=["metadata"])
+    return scheduler
+
+
+def _running(**filters: Any) -> int:
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.INSPECTOR_TASK_TIMEOUT + STALE_RUN_GRACE_SECONDS
+    )
+    return WorkspaceTaskRun.objects.filter(
+        status=WorkspaceTaskRun.Status.RUNNING, started_at__gte=cutoff, **filters
+    ).count()
+
+
+def _admission_blocker(run: WorkspaceTaskRun, priority: int) -> str | None:
+    global_cap = settings.INSPECTOR_MAX_CONCURRENT_RUNS
+    running = _running()
+    if running >= global_cap:
+        return "global"
+    # Bulk work never takes the slots reserved for interactive diagnostics.
+    if priority < 0 and running >= global_cap - settings.INSPECTOR_INTERACTIVE_RESERVED_SLOTS:
+        return "bulk"
+    if _running(workspace_id=run.workspace_id) >= settings.INSPECTOR_MAX_RUNS_PER_WORKSPACE:
+        return "workspace"
+    return None
+
+
+def try_admit(run: WorkspaceTaskRun, *, enforce_caps: bool = True) -> bool:
+    """
+    Mark ``run`` as running if the global, bulk, and per-workspace caps allow it.
+
+    Returns ``False`` when a cap blocks the run or it is no longer queued (cancelled).
+
+    The check and the status change share one transaction; SQLite's ``IMMEDIATE`` mode
+    serializes it across worker processes so caps cannot be overshot by a race. Backends
+    that cannot defer work (``ImmediateBackend``) pass ``enforce_caps=False``.
+
+    A blocked run only gets its ``metadata.scheduler`` updated in place. It does not bump
+    the workspace's status version, so queued runs do not keep dashboards refreshing.
+    """
+
+    scheduler = (run.metadata or {}).get("scheduler", {})
+    priority = scheduler.get("priority", task_priority(run.preset))
+    with transaction.atomic():
+        run.refresh_from_db(fields=["status"])
+        if run.status != WorkspaceTaskRun.Status.REQUESTED:
+            return False  # cancelled while queued
+        blocker = _admission_blocker(run, priority) if enforce_caps else None
+        if blocker is None:
+            run.status = WorkspaceTaskRun.Status.RUNNING
+            run.started_at = timezone.now()
+            wait = (run.started_at - run.created_at).total_seconds()
+            scheduler = {**scheduler, "wait_seconds": round(wait, 3), "blocked_by": None}
+        else:
+            scheduler = {
+                **scheduler,
+                "deferrals": scheduler.get("deferrals", 0) + 1,
+                "blocked_by": blocker,
+            }
+        run.metadata = {**(run.metadata or {}), "scheduler": scheduler}
+        if blocker is None:
+            run.save(update_fields=["status", "started_at", "metadata"])
+        else:
+            WorkspaceTaskRun.objects.filter(pk=run.pk).update(metadata=run.metadata)
+    return blocker is None
+
+
+def retry_delay(deferrals: int) -> float:
+    """Seconds before a blocked run is tried again, doubling per deferral up to a cap."""
+    delay = settings.INSPECTOR_SCHEDULER_RETRY_SECONDS * 2 ** max(deferrals - 1, 0)
+    return min(delay, settings.INSPECTOR_SCHEDULER_RETRY_MAX_SECONDS)
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+
+from .command_runner import (
+    CommandExecutionError,
+    _resolve_workspace_path,
+    command_env,
+    kill_process_group,
+)
+from .models import ScanJob
+from .static_schema import extract_models
+from .warm_worker import FINGERPRINT_SKIP_DIRS
+
+PROBE_PATH = Path(__file__).with_name("schema_probe.py")
+# Same interpreter the SAFE ``python manage.py …`` commands use.
+PROBE_INTERPRETER = "python"
+# Static-analysis issues kept on the scan when it falls back to the probe.
+ISSUE_LIMIT = 20
+# Model changes live in models and app code; migrations only describe them.
+APP_HASH_SKIP_DIRS = FINGERPRINT_SKIP_DIRS | {"migrations", "tests", "static", "templates"}
+
+
+class SchemaProbeError(CommandExecutionError):
+    """Raised when the target project's models cannot be introspected."""
+
+
+def _hash_files(paths: list[Path], root: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        try:
+            content = path.read_bytes()
+        except OSError:
+            continue
+        digest.update(f"{path.relative_to(root)}\0{len(content)}\0".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def app_hash(path: Path) -> str:
+    """Hash of the Python sources of the app at ``path``, its migrations excluded."""
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in APP_HASH_SKIP_DIRS]
+        files.extend(Path(root) / name for name in names if name.endswith(".py"))
+    return _hash_files(files, path)
+
+
+def project_hash(workdir: Path) -> str:
+    """
+    Hash of ``manage.py``, settings modules, and ``.env`` files.
+
+    Settings decide which apps are installed and can change every model (swapped user
+    model, ``DEFAULT_AUTO_FIELD``), so a change here invalidates the whole cache.
+    """
+
+    files = []
+    for root, dirs, names in os.walk(workdir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in FINGERPRINT_SKIP_DIRS]
+        in_settings = Path(root).name == "settings"
+        files.extend(
+            Path(root) / name
+            for name in names
+            if name in {"manage.py", "settings.py", ".env"}
+            or (in_settings and name.endswith(".py"))
+        )
+    return _hash_files(files, workdir)
+
+
+def run_probe(workdir: Path, *, timeout: float) -> list[dict[str, Any]]:
+    """Run ``schema_probe.py`` in ``workdir`` and return every installed app's models."""
+    try:
+        process = subprocess.Popen(
+            [PROBE_INTERPRETER, str(PROBE_PATH)],
+            cwd=str(workdir),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=command_env(),
+            start_new_session=True,
+        )
+    except OSError as exc:
+        raise SchemaProbeError(f"Unable to start schema probe: {exc}") from exc
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_group(process.pid)
+        process.kill()
+        process.communicate()
+        raise SchemaProbeError(f"Schema probe timed out after {timeout:g}s.") from None
+    try:
+        result = json.loads(stdout.decode("utf-8", errors="replace").strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        lines = stderr.decode("utf-8", errors="replace").strip().splitlines()
+        raise SchemaProbeError(lines[-1] if lines else "Schema probe returned no result.") from None
+    if "error" in result:
+        raise SchemaProbeError(result["error"].strip().splitlines()[-1])
+    return result["apps"]
+
+
+def build_graph(apps: dict[str, dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """
+    ``nodes``/``connections`` for the dashboard from introspected apps.
+
+    Nodes are keyed by model name; a name used in several apps falls back to the full
+    ``app_label.Model`` label so the graph stays unambiguous.
+    """
+
+    models = [model for app in apps.values() for model in app["models"]]
+    seen: dict[str, int] = {}
+    for model in models:
+        seen[model["name"]] = seen.get(model["name"], 0) + 1
+    names = {
+        model["label"]: model["name"] if seen[model["name"]] == 1 else model["label"]
+        for model in models
+    }
+    nodes = []
+    connections = []
+    for model in models:
+        targets = [relation for relation in model["relations"] if relation["target"] in names]
+        nodes.append(
+            {
+                "name": names[model["label"]],
+                "label": model["label"],
+                "badge": model["label"].split(".")[0],
+                "table": model["table"],
+                "fields": model["fields"],
+                "relations": [names[relation["target"]] for relation in targets],
+            }
+        )
+        connections.extend(
+            {
+                "source": names[model["label"]],
+                "target": names[relation["target"]],
+                "field": relation["field"],
+                "kind": relation["kind"],
+            }
+            for relation in targets
+        )
+    return {"nodes": nodes, "connections": connections}
+
+
+def _cached_apps(
+    job: ScanJob, project: str, *, runtime_only: bool = False
+) -> dict[str, dict[str, Any]]:
+    """
+    Per-app probe results of the workspace's latest schema scan with the same settings.
+
+    With ``runtime_only`` they are only returned when that scan used the probe, so a
+    static scan that merged in a few of them never stands in for a full probe result.
+    """
+
+    if job.details.get("force_refresh"):
+        return {}
+    last = (
+        ScanJob.objects.filter(
+            workspace_id=job.workspace_id,
+            kind=ScanJob.Kind.SCHEMA,
+            details__has_key="schema",
+        )
+        .order_by("-pk")
+        .first()
+    )
+    if last is None or last.details["schema"].get("project_hash") != project:
+        return {}
+    if runtime_only and last.details["schema"].get("stats", {}).get("source") == "static":
+        return {}
+    # Statically extracted apps carry no source hash and are never reused by the probe.
+    return {label: app for label, app in last.details["schema"]["apps"].items() if "hash" in app}
+
+
+def _with_external_apps(
+    apps: dict[str, dict[str, Any]], cached: dict[str, dict[str, Any]]
+) -> tuple[dict[str, dict[str, Any]], int]:
+    """
+    Static ``apps`` plus the installed apps outside the workspace, and how many were cached.
+
+    Static analysis does not parse site-packages (``auth``, ``contenttypes``, …). Their
+    probe results are merged in from the cache while their sources are unchanged. Relation
+    targets still missing afterwards become field-less models, so the graph keeps the
+    edge and fixture exports keep the label.
+    """
+
+    merged = dict(apps)
+    for label, app in cached.items():
+        if label not in merged and app_hash(Path(app["path"])) == app["hash"]:
+            merged[label] = app
+    reused = len(merged) - len(apps)
+    known = {model["label"] for app in merged.values() for model in app["models"]}
+    for app in list(merged.values()):
+        for model in app["models"]:
+            for relation in model["relations"]:
+                target = relation["target"]
+                if target in known:
+                    continue
+                known.add(target)
+                app_label, _, name = target.partition(".")
+                external = merged.setdefault(
+                    app_label, {"label": app_label, "path": "", "models": [], "external": True}
+                )
+                external["models"].append(
+                    {
+                        "name": name,
+                        "label": target,
+                        "table": f"{app_label}_{name.lower()}",
+                        "fields": [],
+                        "relations": [],
+                        "proxy": False,
+                    }
+                )
+    return merged, reused
+
+
+def _probe_apps(
+    job: ScanJob, workdir: Path, project: str
+) -> tuple[dict[str, dict[str, Any]], int, float | None]:
+    """
+    ``(apps, introspected app count, probe seconds)`` from the runtime probe or its cache.
+
+    The per-app hashes only decide whether the probe starts. A model's fields depend on
+    other apps too (abstract bases, swapped models, relation targets), and booting the
+    project is the expensive part, so a probe always describes every app.
+    """
+
+    cached = _cached_apps(job, project, runtime_only=True)
+    if cached and all(app_hash(Path(app["path"])) == app["hash"] for app in cached.values()):
+        return cached, 0, None
+    start = time.monotonic()
+    probed = run_probe(workdir, timeout=settings.INSPECTOR_TASK_TIMEOUT)
+    probe_seconds = round(time.monotonic() - start, 3)
+    apps = {app["label"]: {**app, "hash": app_hash(Path(app["path"]))} for app in probed}
+    return apps, len(apps), probe_seconds
+
+
+def ingest_schema(job: ScanJob) -> dict[str, Any]:
+    """
+    Describe the workspace's models and store the graph in ``Workspace.metadata["schema"]``.
+
+    With ``INSPECTOR_SCHEMA_STATIC`` the models are read from source first (see
+    ``static_schema``); the project is only imported when that analysis is incomplete.
+    Apps outside the workspace are then taken from the probe cache (see
+    ``_with_external_apps``).
+    On this runtime path every app is cached on the scan (``details.schema.apps``) with a
+    hash of its sources. A rescan re-hashes the cached apps and starts ``schema_probe.py``
+    only when one of them or the project's settings changed.
+    """
+
+    job.status = ScanJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.completed_at = None
+    job.progress = 5
+    job.summary = "Collecting models and relationships"
+    job.save(update_fields=["status", "started_at", "completed_at", "progress", "summary"])
+
+    try:
+        workdir = _resolve_workspace_path(job.workspace.project_path)
+        project = project_hash(workdir)
+        static = None
+        if settings.INSPECTOR_SCHEMA_STATIC:
+            static = extract_models(workdir, workers=settings.INSPECTOR_SCHEMA_STATIC_WORKERS)
+        if static is not None and static.complete:
+            source, introspected, probe_seconds = "static", 0, None
+            apps, cached_apps = _with_external_apps(static.apps, _cached_apps(job, project))
+        else:
+            source = "runtime"
+            apps, introspected, probe_seconds = _probe_apps(job, workdir, project)
+            cached_apps = len(apps) - introspected
+    except CommandExecutionError as exc:
+        job.status = ScanJob.Status.FAILED
+        job.summary = f"Schema ingest failed: {exc}"[:255]
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "summary", "completed_at"])
+        return {"id": job.pk, "status": job.status, "summary": job.summary}
+
+    graph = build_graph(apps)
+    workspace = job.workspace
+    workspace.metadata = {**(workspace.metadata or {}), "schema": graph}
+    workspace.save(update_fields=["metadata"])
+
+    stats = {
+        "source": source,
+        "apps": len(apps),
+        "models": len(graph["nodes"]),
+        "connections": len(graph["connections"]),
+        "introspected_apps": introspected,
+        "cached_apps": cached_apps,
+        "probe_seconds": probe_seconds,
+    }
+    if static is not None:
+        stats.update(
+            static_files=static.files,
+            static_seconds=static.seconds,
+            static_issues=static.issues[:ISSUE_LIMIT],
+        )
+    job.details = {
+        **job.details,
+        "schema": {"project_hash": project, "apps": apps, "stats": stats},
+    }
+    job.status = ScanJob.Status.COMPLETED
+    job.progress = 100
+    summary = f"{len(graph['nodes'])} models in {len(apps)} apps · "
+    if source == "static":
+        summary += f"parsed {static.files} files in {static.seconds * 1000:.0f} ms"
+    else:
+        summary += f"{introspected} apps introspected"
+    job.summary = summary
+    job.completed_at = timezone.now()
+    job.save(update_fields=["details", "status", "progress", "summary", "completed_at"])
+    return {"id": job.pk, "status": job.status, "summary": job.summary}
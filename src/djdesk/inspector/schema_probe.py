@@ -0,0 +1,99 @@
+"""
+Describe the models of a Django project.
+
+Executed by ``djdesk.inspector.schema_ingest`` with the *inspected* project's interpreter as
+``python schema_probe.py`` inside the workspace directory. Like
+``warm_helper.py`` it runs the project's own ``manage.py`` and intercepts
+``execute_from_command_line``, so settings and ``sys.path`` resolve exactly as for a
+``python manage.py …`` run. It then prints one JSON document to stdout:
+
+* ``{"apps": [{"label": …, "path": …, "models": [...]}, …]}`` for every installed app;
+* ``{"error": "…"}`` when Django cannot be set up.
+
+This file must not import anything from djdesk: the target interpreter only has the
+project's dependencies installed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import runpy
+import sys
+import traceback
+
+RELATION_KINDS = (
+    ("many_to_many", "m2m"),
+    ("one_to_one", "o2o"),
+    ("many_to_one", "fk"),
+)
+
+
+def _describe(model) -> dict:
+    meta = model._meta
+    relations = []
+    for field in [*meta.local_fields, *meta.local_many_to_many]:
+        if not field.is_relation or field.related_model is None:
+            continue
+        kind = next(name for attr, name in RELATION_KINDS if getattr(field, attr))
+        relations.append(
+            {"field": field.name, "target": field.related_model._meta.label, "kind": kind}
+        )
+    return {
+        "name": meta.object_name,
+        "label": meta.label,
+        "table": meta.db_table,
+        "fields": [field.name for field in [*meta.fields, *meta.many_to_many]],
+        "relations": relations,
+        "proxy": meta.proxy,
+    }
+
+
+def _probe(protocol) -> None:
+    def emit(message) -> None:
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    try:
+        import django
+        from django.apps import apps
+
+        django.setup()
+        emit(
+            {
+                "apps": [
+                    {
+                        "label": config.label,
+                        "path": config.path,
+                        "models": [_describe(model) for model in config.get_models()],
+                    }
+                    for config in apps.get_app_configs()
+                ]
+            }
+        )
+    except Exception:
+        emit({"error": traceback.format_exc()})
+        raise SystemExit(1) from None
+
+
+def main() -> None:
+    # Keep the result on a private copy of stdout; anything printed elsewhere goes to stderr.
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    workdir = os.getcwd()
+    sys.path[0] = workdir
+    try:
+        import django.core.management as management
+    except ImportError:
+        protocol.write(json.dumps({"error": "Django is not importable in this workspace."}) + "\n")
+        protocol.flush()
+        raise SystemExit(1) from None
+
+    management.execute_from_command_line = lambda argv=None: _probe(protocol)
+    sys.argv = [os.path.join(workdir, "manage.py")]
+    runpy.run_path(sys.argv[0], run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ from datetime import timezone as datetime_timezone
 from typing import Any
 
 from django.conf import settings
+from django.db.models import Count, FloatField, Max, QuerySet, Sum
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
 from django.urls import reverse
 from django.utils import timezone
 
@@ -17,6 +20,9 @@ from .models import (
     WorkspaceTaskRun,
 )
 
+STATUS_SCAN_LIMIT = 4
+STATUS_TASK_LIMIT = 5
+
 DEFAULT_SCAN_BLUEPRINT = (
     (ScanJob.Kind.SCHEMA, "Collecting models and relationships"),
     (ScanJob.Kind.MIGRATIONS, "Diffing unapplied migrations"),
@@ -68,22 +74,38 @@ def serialize_scan(job: ScanJob) -> dict[str, Any]:
 
 
 def serialize_task_run(run: WorkspaceTaskRun) -> dict[str, Any]:
+    """Summary used by status payloads; the full log is only served by the detail API."""
     return {
         "id": run.pk,
         "preset": run.preset.key,
         "label": run.preset.label,
         "status": run.status,
         "progress": run.progress,
-        "log": run.log,
+        "log_line_count": run.log_line_count,
+        "log_tail": run.log_tail,
         "requested_at": run.created_at.isoformat(),
         "completed_at": run.completed_at.isoformat() if run.completed_at else None,
     }
 
 
-def workspace_status_payload(workspace: Workspace) -> dict[str, Any]:
-    """Return a JSON structure consumed by the dashboard polling logic."""
-    scans = [serialize_scan(job) for job in workspace.scans.all()[:4]]
-    tasks = [serialize_task_run(run) for run in workspace.task_runs.all()[:5]]
+def workspace_status_payload(
+    workspace: Workspace,
+    *,
+    since: int | None = None,
+) -> dict[str, Any]:
+    """
+    Return a JSON structure consumed by the dashboard polling logic.
+
+    Passing the ``cursor`` from a previous response as ``since`` returns only the scans,
+    task runs and metadata sections that changed afterwards. Cursors that predate a
+    reset (deletions, doc link or Data Lab changes) fall back to the full payload.
+    """
+    cursor = workspace.status_version
+    if since is not None and workspace.status_reset_version <= since <= cursor:
+        return workspace_status_delta(workspace, since=since)
+
+    scans = [serialize_scan(job) for job in workspace.scans.all()[:STATUS_SCAN_LIMIT]]
+    tasks = [serialize_task_run(run) for run in _status_task_runs(workspace)[:STATUS_TASK_LIMIT]]
     docs = [
         {
             "title": link.title,
@@ -96,15 +118,45 @@ def workspace_status_payload(workspace: Workspace) -> dict[str, Any]:
     ]
     return {
         "workspace": workspace.slug,
+        "cursor": cursor,
+        "full": True,
+        **_workspace_metadata_sections(workspace),
+        "scans": scans,
+        "tasks": tasks,
+        "docs": docs,
+        "data_lab": workspace_data_lab_payload(workspace),
+    }
+
+
+def workspace_status_delta(workspace: Workspace, *, since: int) -> dict[str, Any]:
+    """Serialize only what changed after ``since`` (see ``workspace_status_payload``)."""
+    scans = workspace.scans.filter(status_version__gt=since)[:STATUS_SCAN_LIMIT]
+    tasks = _status_task_runs(workspace).filter(status_version__gt=since)[:STATUS_TASK_LIMIT]
+    payload: dict[str, Any] = {
+        "workspace": workspace.slug,
+        "cursor": workspace.status_version,
+        "full": False,
+        "limits": {"scans": STATUS_SCAN_LIMIT, "tasks": STATUS_TASK_LIMIT},
+        "scans": [serialize_scan(job) for job in scans],
+        "tasks": [serialize_task_run(run) for run in tasks],
+    }
+    if workspace.metadata_version > since:
+        payload.update(_workspace_metadata_sections(workspace))
+    return payload
+
+
+def _status_task_runs(workspace: Workspace) -> QuerySet[WorkspaceTaskRun]:
+    # Metadata can carry large command results; summaries never need it.
+    return workspace.task_runs.select_related("preset").defer("metadata")
+
+
+def _workspace_metadata_sections(workspace: Workspace) -> dict[str, Any]:
+    return {
         "insights": workspace.insights,
         "apps": workspace.app_overview,
         "activity": workspace.recent_activity,
         "schema": workspace.schema_graph,
         "log_excerpt": workspace.log_excerpt,
-        "scans": scans,
-        "tasks": tasks,
-        "docs": docs,
-        "data_lab": workspace_data_lab_payload(workspace),
     }
 
 
@@ -137,3 +189,89 @@ def workspace_data_lab_payload(workspace: Workspace) -> dict[str, Any]:
 def task_catalog() -> dict[str, TaskPreset]:
     """Convenience helper for quick lookup in templates/tests."""
     return {preset.key: preset for preset in TaskPreset.objects.all()}
+
+
+def _usage_field(name: str) -> Cast:
+    return Cast(KT(f"metadata__command__resources__{name}"), FloatField())
+
+
+def _usage_summary(row: dict[str, Any]) -> dict[str, Any]:
+    runs = row["runs"]
+    return {
+        "runs": runs,
+        "cpu_seconds": {
+            "avg": round(row["cpu_total"] / runs, 3),
+            "max": round(row["cpu_max"], 3),
+            "total": round(row["cpu_total"], 3),
+        },
+        "max_rss_kb": {"avg": int(row["rss_total"] / runs), "max": int(row["rss_max"])},
+        "block_io_ops": int(row["block_io_total"]),
+        "context_switches": int(row["switches_total"]),
+        "duration_seconds": {
+            "avg": round(row["duration_total"] / runs, 3),
+            "total": round(row["duration_total"], 3),
+        },
+        # Average number of cores a run keeps busy; sizes the worker pool.
+        "cpu_per_wall": (
+            round(row["cpu_total"] / row["duration_total"], 3) if row["duration_total"] else None
+        ),
+    }
+
+
+def task_resource_usage(workspace: Workspace | None = None) -> list[dict[str, Any]]:
+    """
+    Aggregate the recorded ``metadata.command.resources`` of finished runs per preset.
+
+    Each preset entry carries totals over all workspaces plus a ``workspaces`` breakdown;
+    presets are ordered by total CPU time, most expensive first. Cache hits and runs killed
+    before reporting have no measurements and are skipped.
+    """
+
+    runs = WorkspaceTaskRun.objects.filter(metadata__command__resources__has_key="max_rss_kb")
+    if workspace is not None:
+        runs = runs.filter(workspace=workspace)
+    cpu = _usage_field("user_cpu_seconds") + _usage_field("system_cpu_seconds")
+    rss = _usage_field("max_rss_kb")
+    rows = (
+        runs.values("preset__key", "preset__label", "workspace__slug")
+        .annotate(
+            runs=Count("pk"),
+            cpu_total=Sum(cpu),
+            cpu_max=Max(cpu),
+            rss_total=Sum(rss),
+            rss_max=Max(rss),
+            block_io_total=Sum(_usage_field("block_input_ops") + _usage_field("block_output_ops")),
+            switches_total=Sum(
+                _usage_field("voluntary_context_switches")
+                + _usage_field("involuntary_context_switches")
+            ),
+            duration_total=Sum(Cast(KT("metadata__command__duration_seconds"), FloatField())),
+        )
+        .order_by("preset__key", "workspace__slug")
+    )
+
+    totals: dict[str, dict[str, Any]] = {}
+    breakdown: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        key = row["preset__key"]
+        breakdown.setdefault(key, []).append(
+            {"workspace": row["workspace__slug"], **_usage_summary(row)}
+        )
+        total = totals.setdefault(key, {"label": row["preset__label"]})
+        for field in ("runs", "cpu_total", "rss_total", "block_io_total", "switches_total"):
+            total[field] = total.get(field, 0) + row[field]
+        total["duration_total"] = total.get("duration_total", 0) + (row["duration_total"] or 0)
+        total["cpu_max"] = max(total.get("cpu_max", 0), row["cpu_max"])
+        total["rss_max"] = max(total.get("rss_max", 0), row["rss_max"])
+
+    usage = [
+        {
+            "preset": key,
+            "label": total["label"],
+            **_usage_summary(total),
+            "workspaces": breakdown[key],
+        }
+        for key, total in totals.items()
+    ]
+    usage.sort(key=lambda item: item["cpu_seconds"]["total"], reverse=True)
+    return usage
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import shutil
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .fixture_export import export_dir
+from .models import DocLink, ScanJob, Workspace, WorkspaceTaskRun
+from .output_retention import spill_path_for
+
+
+@receiver(post_delete, sender=ScanJob)
+@receiver(post_delete, sender=WorkspaceTaskRun)
+def invalidate_workspace_status(sender: type, instance: Any, **kwargs: Any) -> None:
+    """Deleted scans/task runs cannot be expressed as a delta, so force a full payload."""
+    Workspace.bump_status_version(instance.workspace_id, reset=True)
+
+
+@receiver(post_delete, sender=WorkspaceTaskRun)
+def remove_spilled_output(sender: type, instance: WorkspaceTaskRun, **kwargs: Any) -> None:
+    """Drop the compressed full output kept for truncated runs."""
+    spill_path_for(instance.pk).unlink(missing_ok=True)
+
+
+@receiver(post_delete, sender=ScanJob)
+def remove_fixture_export(sender: type, instance: ScanJob, **kwargs: Any) -> None:
+    """Drop the compressed fixtures written by a FIXTURES scan."""
+    if instance.kind == ScanJob.Kind.FIXTURES:
+        shutil.rmtree(export_dir(instance), ignore_errors=True)
+
+
+@receiver(post_save, sender=DocLink)
+@receiver(post_delete, sender=DocLink)
+def invalidate_all_workspace_statuses(sender: type, instance: Any, **kwargs: Any) -> None:
+    """Doc links are global, so every workspace payload goes stale together."""
+    Workspace.bump_status_version(reset=True)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+from .command_runner import (
+    CommandExecutionError,
+    CommandSpec,
+    _resolve_workspace_path,
+    run_commands,
+)
+from .models import ScanJob, Workspace
+from .schema_ingest import project_hash
+
+SQLMIGRATE_COMMAND = "python manage.py sqlmigrate"
+
+
+class SqlPlanError(CommandExecutionError):
+    """Raised when a workspace has no migration scan to take pending migrations from."""
+
+
+def latest_migration_scan(workspace: Workspace) -> ScanJob | None:
+    return (
+        workspace.scans.filter(
+            kind=ScanJob.Kind.MIGRATIONS,
+            status=ScanJob.Status.COMPLETED,
+            details__has_key="migrations",
+        )
+        .order_by("-pk")
+        .first()
+    )
+
+
+def plan_key(path: Path, settings_hash: str, ancestors: Iterable[str] = ()) -> str:
+    """
+    Cache key of one migration's SQL: its file content, the project's settings, and the
+    keys of its pending dependencies.
+
+    Settings pick the database backend, which changes the SQL ``sqlmigrate`` prints.
+    ``sqlmigrate`` renders a migration against the state its ancestors leave behind, so
+    an edited ancestor changes the key of every migration after it.
+    """
+
+    digest = hashlib.sha256(settings_hash.encode())
+    digest.update(path.read_bytes())
+    for ancestor in sorted(ancestors):
+        digest.update(ancestor.encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return Path(settings.INSPECTOR_SQL_PLAN_ROOT) / key[:2] / f"{key}.json"
+
+
+def _store(key: str, entry: dict[str, Any]) -> None:
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False, suffix=".part") as tmp:
+        json.dump(entry, tmp)
+    os.replace(tmp.name, path)
+
+
+def _load(key: str) -> dict[str, Any] | None:
+    try:
+        return json.loads(_cache_path(key).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _queued_path(key: str) -> Path:
+    # A sidecar next to the plan, so queueing never replaces SQL that is already cached.
+    return _cache_path(key).with_suffix(".queued")
+
+
+def mark_queued(entries: list[dict[str, Any]]) -> None:
+    """Record that a task will compute ``entries``; see ``sql_plan(compute=False)``."""
+    for entry in entries:
+        path = _queued_path(entry["key"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(str(time.time()))
+
+
+def _queued(key: str) -> bool:
+    try:
+        queued_at = float(_queued_path(key).read_text())
+    except (OSError, ValueError):
+        return False
+    return time.time() - queued_at < settings.INSPECTOR_TASK_TIMEOUT
+
+
+def _record(key: str, entry: dict[str, Any]) -> None:
+    """Cache a computed ``entry``; a failed rerun keeps an earlier good plan."""
+    if entry["status"] == "done" or (_load(key) or {}).get("status") != "done":
+        _store(key, entry)
+    _queued_path(key).unlink(missing_ok=True)
+
+
+def sql_plan(
+    workspace: Workspace, *, refresh: bool = False, compute: bool = True
+) -> dict[str, Any]:
+    """
+    SQL of every unapplied migration of ``workspace``, in the order they would apply.
+
+    Pending migrations come from the latest ``migrations`` scan. Each migration's SQL is
+    cached under ``INSPECTOR_SQL_PLAN_ROOT`` by ``plan_key``; migrations without a cached
+    plan (or all of them with ``refresh``) run ``sqlmigrate`` at once, at most
+    ``INSPECTOR_SQL_PLAN_WORKERS`` processes at a time. Failed runs are recorded but
+    run again on the next computing call.
+
+    Without ``compute`` nothing is run or written: recorded failures are reported, and
+    migrations without a plan come back as ``pending``. Failed and pending entries carry
+    ``queued``, telling whether ``mark_queued`` recorded a task for them that has not
+    timed out yet.
+    """
+
+    scan = latest_migration_scan(workspace)
+    if scan is None:
+        raise SqlPlanError("No migration scan has completed yet.")
+    workdir = _resolve_workspace_path(workspace.project_path)
+    details = scan.details["migrations"]
+    files = {(entry["app"], entry["name"]): path for path, entry in details["files"].items()}
+    dependencies = details.get("plan_dependencies", {})
+    settings_hash = project_hash(workdir)
+
+    migrations: list[dict[str, Any]] = []
+    keys: dict[str, str] = {}
+    missing = []
+    for label in details["plan"]:
+        app, name = label.split(".", 1)
+        entry: dict[str, Any] = {"migration": label, "app": app, "name": name}
+        try:
+            ancestors = [keys[dep] for dep in dependencies.get(label, [])]
+            entry["key"] = keys[label] = plan_key(
+                workdir / files[(app, name)], settings_hash, ancestors
+            )
+        except (KeyError, OSError):
+            entry.update(status="failed", error="Migration file is gone; rescan migrations.")
+        else:
+            cached = _load(entry["key"])
+            status = None if refresh or cached is None else cached.get("status")
+            if status == "done":
+                entry.update(cached, cached=True)
+            elif status == "failed" and not compute:
+                entry.update(cached, cached=True, queued=_queued(entry["key"]))
+            elif not compute:
+                entry.update(status="pending", cached=False, queued=_queued(entry["key"]))
+            else:
+                missing.append(entry)
+        migrations.append(entry)
+    if not compute:
+        missing = []
+
+    outputs: list[list[str]] = [[] for _ in missing]
+    specs = [
+        CommandSpec(
+            command=f"{SQLMIGRATE_COMMAND} {entry['app']} {entry['name']}",
+            workspace_path=workspace.project_path,
+            timeout=settings.INSPECTOR_TASK_TIMEOUT,
+            log_callback=output.append,
+        )
+        for entry, output in zip(missing, outputs, strict=True)
+    ]
+    results = run_commands(specs, limit=settings.INSPECTOR_SQL_PLAN_WORKERS)
+    for entry, output, result in zip(missing, outputs, results, strict=True):
+        entry["cached"] = False
+        if isinstance(result, CommandExecutionError):
+            entry.update(status="failed", error=str(result))
+            _record(entry["key"], {"status": "failed", "error": entry["error"]})
+        elif result.exit_code != 0:
+            error = output[-1] if output else f"Exit code {result.exit_code}."
+            entry.update(status="failed", error=error, seconds=round(result.duration, 3))
+            _record(entry["key"], {"status": "failed", "error": error})
+        else:
+            plan = {
+                "status": "done",
+                "sql": "\n".join(output),
+                "seconds": round(result.duration, 3),
+            }
+            _record(entry["key"], plan)
+            entry.update(plan)
+
+    done = [entry for entry in migrations if entry.get("status") == "done"]
+    return {
+        "workspace": workspace.slug,
+        "scan": scan.pk,
+        "migrations": migrations,
+        "sql": "\n\n".join(f"-- {entry['migration']}\n{entry['sql']}" for entry in done),
+        "stats": {
+            "migrations": len(migrations),
+            "cached": sum(1 for entry in migrations if entry.get("cached")),
+            "computed": len(missing),
+            "pending": sum(1 for entry in migrations if entry.get("status") == "pending"),
+            "failed": sum(1 for entry in migrations if entry.get("status") == "failed"),
+        },
+    }
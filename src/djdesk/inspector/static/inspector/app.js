@@ -4,6 +4,9 @@ class InspectorUI {
   constructor(root) {
     this.root = root;
     this.statusUrl = root?.dataset.statusEndpoint;
+    this.statusEtag = '';
+    this.statusCursor = null;
+    this.statusState = { scans: [], tasks: [] };
     this.taskEndpoint = root?.dataset.taskEndpoint;
     this.workspaceSlug = root?.dataset.workspaceSlug || '';
     this.taskDetailTemplate = root?.dataset.taskDetailTemplate || '';
@@ -26,7 +29,12 @@ class InspectorUI {
     this.taskDrawerProgress = this.taskDrawer?.querySelector('[data-task-drawer-progress]');
     this.taskDrawerLog = this.taskDrawer?.querySelector('[data-task-drawer-log]');
     this.taskDrawerClose = this.taskDrawer?.querySelector('[data-task-drawer-close]');
+    this.taskDrawerCancel = this.taskDrawer?.querySelector('[data-task-drawer-cancel]');
     this.taskDrawerPoll = null;
+    this.activeTaskId = null;
+    this.taskDrawerSeq = 0;
+    this.statusSocket = null;
+    this.taskSocket = null;
     this.schemaStateDebounce = null;
     this.tabs = [];
     this.tabPanels = [];
@@ -57,6 +65,7 @@ class InspectorUI {
     this.bindDataLab();
     this.observeConnection();
     this.startPolling();
+    this.connectSockets();
     this.requestNotificationPermission();
     this.loadInitialSchema();
     this.ensureSchemaTooltip();
@@ -215,6 +224,7 @@ class InspectorUI {
       }
     });
     this.taskDrawerClose?.addEventListener('click', () => this.closeTaskDrawer());
+    this.taskDrawerCancel?.addEventListener('click', () => this.cancelActiveTask());
     document.addEventListener('keydown', (event) => {
       if (event.key === 'Escape') {
         this.closeTaskDrawer();
@@ -323,12 +333,22 @@ class InspectorUI {
   }
 
   startPolling() {
-    if (!this.statusUrl) return;
+    if (!this.statusUrl || this.polling) return;
     const fetchStatus = () => {
-      fetch(this.statusUrl, {
-        headers: { 'X-Requested-With': 'XMLHttpRequest' },
-      })
-        .then((response) => response.json())
+      const headers = { 'X-Requested-With': 'XMLHttpRequest' };
+      if (this.statusEtag) {
+        headers['If-None-Match'] = this.statusEtag;
+      }
+      fetch(this.getStatusUrl(), { headers, cache: 'no-store' })
+        .then((response) => {
+          if (response.status === 304) {
+            this.toggleConnection(true);
+            return null;
+          }
+          if (!response.ok) throw new Error('Request failed');
+          this.statusEtag = response.headers.get('ETag') || '';
+          return response.json();
+        })
         .then((payload) => this.updateFromPayload(payload))
         .catch(() => {
           this.toggleConnection(false);
@@ -338,9 +358,95 @@ class InspectorUI {
     this.polling = window.setInterval(fetchStatus, 6000);
   }
 
+  stopPolling() {
+    if (this.polling) {
+      clearInterval(this.polling);
+      this.polling = null;
+    }
+  }
+
+  getSocketUrl(path) {
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    return `${scheme}://${window.location.host}${path}`;
+  }
+
+  connectSockets() {
+    if (!this.workspaceSlug || !('WebSocket' in window)) return;
+    this.connectStatusSocket();
+    this.connectTaskSocket();
+  }
+
+  connectStatusSocket() {
+    const socket = new WebSocket(this.getSocketUrl(`/ws/workspaces/${this.workspaceSlug}/`));
+    socket.addEventListener('open', () => {
+      this.statusSocket = socket;
+      this.stopPolling();
+    });
+    socket.addEventListener('message', (event) => {
+      this.updateFromPayload(JSON.parse(event.data));
+    });
+    socket.addEventListener('close', () => {
+      // Fall back to polling and try to upgrade again later.
+      this.statusSocket = null;
+      this.startPolling();
+      window.setTimeout(() => this.connectStatusSocket(), 15000);
+    });
+  }
+
+  connectTaskSocket() {
+    const socket = new WebSocket(this.getSocketUrl(`/ws/task-runs/${this.workspaceSlug}/`));
+    socket.addEventListener('open', () => {
+      this.taskSocket = socket;
+    });
+    socket.addEventListener('message', (event) => {
+      this.handleTaskEvent(JSON.parse(event.data));
+    });
+    socket.addEventListener('close', () => {
+      this.taskSocket = null;
+      window.setTimeout(() => this.connectTaskSocket(), 15000);
+    });
+  }
+
+  handleTaskEvent(event) {
+    if (!event || String(event.id) !== String(this.activeTaskId)) return;
+    // Chunks relayed from the database carry their sequence; skip ones already loaded.
+    if (event.seq !== undefined && event.seq <= this.taskDrawerSeq) return;
+    if (this.taskDrawerStatus) {
+      this.taskDrawerStatus.textContent = event.status || 'unknown';
+      this.taskDrawerStatus.className = `task-drawer-status task-drawer-status--${event.status || 'info'}`;
+    }
+    if (this.taskDrawerProgress) {
+      this.taskDrawerProgress.style.width = `${event.progress ?? 0}%`;
+    }
+    this.toggleTaskDrawerCancel(event.status);
+    if (event.log_line) {
+      this.appendTaskDrawerLog(event.log_line);
+    }
+    if (event.seq !== undefined) {
+      this.taskDrawerSeq = event.seq;
+    }
+  }
+
+  getStatusUrl() {
+    if (this.statusCursor === null || this.statusCursor === undefined) {
+      return this.statusUrl;
+    }
+    const url = new URL(this.statusUrl, window.location.origin);
+    url.searchParams.set('since', this.statusCursor);
+    return url.toString();
+  }
+
   updateFromPayload(payload) {
     if (!payload) return;
     this.toggleConnection(true);
+    if (payload.cursor !== undefined) {
+      this.statusCursor = payload.cursor;
+    }
+    if (payload.full === false) {
+      this.applyStatusDelta(payload);
+      return;
+    }
+    this.statusState = { scans: payload.scans || [], tasks: payload.tasks || [] };
     this.updateScans(payload.scans || []);
     this.updateInsights(payload.insights || []);
     this.updateActivity(payload.activity || []);
@@ -351,6 +457,30 @@ class InspectorUI {
     this.refreshIcons();
   }
 
+  applyStatusDelta(delta) {
+    const limits = delta.limits || {};
+    if (delta.scans?.length) {
+      this.statusState.scans = this.mergeById(this.statusState.scans, delta.scans, limits.scans);
+      this.updateScans(this.statusState.scans);
+    }
+    if (delta.tasks?.length) {
+      this.statusState.tasks = this.mergeById(this.statusState.tasks, delta.tasks, limits.tasks);
+      this.updateTasks(this.statusState.tasks);
+    }
+    if ('insights' in delta) this.updateInsights(delta.insights || []);
+    if ('activity' in delta) this.updateActivity(delta.activity || []);
+    if ('log_excerpt' in delta) this.updateLogs(delta.log_excerpt || []);
+    if ('schema' in delta) this.updateSchema(delta.schema || null);
+    this.refreshIcons();
+  }
+
+  mergeById(current, changes, limit) {
+    const merged = new Map(current.map((item) => [item.id, item]));
+    changes.forEach((item) => merged.set(item.id, item));
+    const ordered = Array.from(merged.values()).sort((a, b) => b.id - a.id);
+    return limit ? ordered.slice(0, limit) : ordered;
+  }
+
   updateScans(scans) {
     if (!this.scanBoard) return;
     if (!scans.length) {
@@ -893,6 +1023,8 @@ class InspectorUI {
 
   openTaskDrawer(taskId) {
     if (!this.taskDrawer || !taskId) return;
+    this.activeTaskId = taskId;
+    this.taskDrawerSeq = 0;
     this.taskDrawer.classList.add('is-visible');
     this.setTaskDrawerLoading();
     this.loadTaskDetails(taskId);
@@ -901,6 +1033,7 @@ class InspectorUI {
   closeTaskDrawer() {
     if (!this.taskDrawer) return;
     this.taskDrawer.classList.remove('is-visible');
+    this.activeTaskId = null;
     this.clearTaskDrawerPolling();
   }
 
@@ -913,11 +1046,53 @@ class InspectorUI {
       this.taskDrawerProgress.style.width = '5%';
     }
     this.taskDrawerLog.innerHTML = '<p class="empty-note">Preparing log stream…</p>';
+    this.toggleTaskDrawerCancel(null);
+  }
+
+  toggleTaskDrawerCancel(status) {
+    if (!this.taskDrawerCancel) return;
+    this.taskDrawerCancel.hidden = !['running', 'requested'].includes(status);
+    this.taskDrawerCancel.disabled = false;
+  }
+
+  cancelActiveTask() {
+    const taskId = this.activeTaskId;
+    const detailUrl = this.getTaskDetailUrl(taskId);
+    if (!detailUrl) return;
+    this.taskDrawerCancel.disabled = true;
+    fetch(`${detailUrl}cancel/`, {
+      method: 'POST',
+      headers: {
+        'X-Requested-With': 'XMLHttpRequest',
+        'X-CSRFToken': this.getCsrfToken(),
+      },
+    })
+      .then((response) => {
+        if (!response.ok) {
+          return response.json().then((data) => {
+            throw new Error(this.formatErrors(data.errors));
+          });
+        }
+        return response.json();
+      })
+      .then(() => {
+        this.showToast('Cancellation requested.', 'info');
+        if (String(taskId) === String(this.activeTaskId)) {
+          this.loadTaskDetails(taskId);
+        }
+      })
+      .catch((error) => {
+        this.taskDrawerCancel.disabled = false;
+        this.showToast(error.message || 'Unable to cancel task.', 'danger');
+      });
   }
 
   loadTaskDetails(taskId) {
-    const url = this.getTaskDetailUrl(taskId);
+    let url = this.getTaskDetailUrl(taskId);
     if (!url) return;
+    if (this.taskDrawerSeq) {
+      url = `${url}?after_seq=${this.taskDrawerSeq}`;
+    }
     fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
       .then((response) => {
         if (!response.ok) throw new Error('Request failed');
@@ -925,7 +1100,7 @@ class InspectorUI {
       })
       .then((data) => {
         this.renderTaskDrawer(data);
-        if (['running', 'requested'].includes(data.status)) {
+        if (['running', 'requested'].includes(data.status) && !this.taskSocket) {
           this.scheduleTaskDrawerRefresh(taskId);
         } else {
           this.clearTaskDrawerPolling();
@@ -949,9 +1124,27 @@ class InspectorUI {
     if (this.taskDrawerProgress) {
       this.taskDrawerProgress.style.width = `${data.progress ?? 0}%`;
     }
+    this.toggleTaskDrawerCancel(data.status);
     if (this.taskDrawerLog) {
-      this.taskDrawerLog.textContent = data.log || 'Awaiting log output…';
+      if (data.after_seq) {
+        // Ranged read: only the chunks written since the previous refresh.
+        this.appendTaskDrawerLog(data.log);
+      } else if (data.log) {
+        this.taskDrawerLog.textContent = data.log;
+      } else {
+        this.taskDrawerLog.innerHTML = '<p class="empty-note">Awaiting log output…</p>';
+      }
+    }
+    this.taskDrawerSeq = data.last_seq || this.taskDrawerSeq;
+  }
+
+  appendTaskDrawerLog(text) {
+    if (!text || !this.taskDrawerLog) return;
+    if (this.taskDrawerLog.querySelector('.empty-note')) {
+      this.taskDrawerLog.textContent = '';
     }
+    const prefix = this.taskDrawerLog.textContent ? '\n' : '';
+    this.taskDrawerLog.append(document.createTextNode(`${prefix}${text}`));
   }
 
   scheduleTaskDrawerRefresh(taskId) {
@@ -0,0 +1,597 @@
+"""
+Describe a Django project's models without importing it.
+
+``extract_models`` reads ``manage.py`` and the settings module to find the installed apps
+that live in the workspace, parses their ``models.py`` files and ``models/`` packages with
+``ast``, and returns the same per-app model descriptions as ``schema_probe.py``. Apps
+installed from site-packages (``django.contrib.*``, third-party apps) are not parsed;
+relations to their models keep the label they are declared with.
+
+Anything that cannot be settled from the source alone is recorded as an issue:
+unresolved relation targets, model base classes from outside the workspace (their fields
+are unknown), non-literal ``INSTALLED_APPS``. Callers fall back to runtime introspection
+when ``StaticExtraction.complete`` is false.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from .warm_worker import FINGERPRINT_SKIP_DIRS
+
+RELATION_KINDS = {"ForeignKey": "fk", "OneToOneField": "o2o", "ManyToManyField": "m2m"}
+DJANGO_MODEL = ("django.db.models", "Model")
+# Smaller batches are parsed inline. ``ast.parse`` reads about 1.5 MB/s, and starting the
+# ``spawn`` pool costs about 0.75 s, so the pool only pays off for megabytes of source.
+POOL_MIN_BYTES = 2 * 1024 * 1024
+SETTINGS_NAMES = ("INSTALLED_APPS", "AUTH_USER_MODEL")
+DEFAULT_USER_MODEL = "auth.User"
+
+_UNKNOWN = object()
+
+
+@dataclass
+class StaticExtraction:
+    apps: dict[str, dict[str, Any]] = field(default_factory=dict)
+    issues: list[str] = field(default_factory=list)
+    files: int = 0
+    seconds: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return not self.issues
+
+
+def dotted_name(node: ast.AST) -> str | None:
+    """``a.b.c`` for a name or attribute chain, else ``None``."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and (base := dotted_name(node.value)):
+        return f"{base}.{node.attr}"
+    return None
+
+
+def literal(node: ast.AST | None, namespace: dict[str, Any]) -> Any:
+    """Value of a constant, list/tuple of constants, known name, or concatenation."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.List | ast.Tuple):
+        items = [literal(item, namespace) for item in node.elts]
+        return _UNKNOWN if _UNKNOWN in items else items
+    if isinstance(node, ast.Name):
+        return namespace.get(node.id, _UNKNOWN)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = literal(node.left, namespace), literal(node.right, namespace)
+        if isinstance(left, list) and isinstance(right, list):
+            return left + right
+    return _UNKNOWN
+
+
+def _parse_field(name: str, call: ast.Call) -> dict[str, Any] | None:
+    func = dotted_name(call.func)
+    field_type = func.rsplit(".", 1)[-1] if func else ""
+    if not field_type.endswith(("Field", "ForeignKey")):
+        return None
+    described: dict[str, Any] = {
+        "name": name,
+        "type": field_type,
+        "primary_key": any(
+            keyword.arg == "primary_key" and literal(keyword.value, {}) is True
+            for keyword in call.keywords
+        ),
+    }
+    if field_type in RELATION_KINDS:
+        to = call.args[0] if call.args else None
+        to = next((kw.value for kw in call.keywords if kw.arg == "to"), to)
+        if isinstance(to, ast.Constant) and isinstance(to.value, str):
+            described["target"] = {"string": to.value}
+        elif to is not None and (dotted := dotted_name(to)):
+            described["target"] = {"name": dotted}
+        else:
+            described["target"] = None
+    return described
+
+
+def _parse_class(node: ast.ClassDef) -> dict[str, Any]:
+    meta: dict[str, Any] = {}
+    fields = []
+    for statement in node.body:
+        if isinstance(statement, ast.ClassDef) and statement.name == "Meta":
+            for item in statement.body:
+                if isinstance(item, ast.Assign) and isinstance(item.targets[0], ast.Name):
+                    meta[item.targets[0].id] = literal(item.value, {})
+            continue
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+            target, value = statement.targets[0], statement.value
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            target, value = statement.target, statement.value
+        else:
+            continue
+        if isinstance(target, ast.Name) and isinstance(value, ast.Call):
+            if described := _parse_field(target.id, value):
+                fields.append(described)
+    return {
+        "name": node.name,
+        "bases": [dotted_name(base) or "?" for base in node.bases],
+        "abstract": meta.get("abstract") is True,
+        "proxy": meta.get("proxy") is True,
+        "db_table": meta.get("db_table") if isinstance(meta.get("db_table"), str) else None,
+        "app_label": meta.get("app_label") if isinstance(meta.get("app_label"), str) else None,
+        "fields": fields,
+    }
+
+
+def parse_file(path: str) -> dict[str, Any]:
+    """Imports and class definitions of one models module; runs in worker processes."""
+    try:
+        tree = ast.parse(Path(path).read_bytes(), filename=path)
+    except (OSError, SyntaxError, ValueError) as exc:
+        return {"path": path, "error": f"{type(exc).__name__}: {exc}"}
+    imports: dict[str, str] = {}
+    star_imports = []
+    classes = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            for alias in node.names:
+                if alias.name == "*":
+                    star_imports.append(module)
+                else:
+                    imports[alias.asname or alias.name] = f"{module}:{alias.name}"
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                local = alias.asname or alias.name.split(".")[0]
+                imports[local] = alias.name if alias.asname else local
+        elif isinstance(node, ast.ClassDef):
+            classes.append(_parse_class(node))
+    return {"path": path, "imports": imports, "star_imports": star_imports, "classes": classes}
+
+
+def _total_size(paths: list[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            continue
+    return total
+
+
+def parse_all(
+    paths: list[str], workers: int, parse: Callable[[str], dict[str, Any]] = parse_file
+) -> list[dict[str, Any]]:
+    """``parse`` applied to every path, across a process pool for large batches."""
+    if workers < 2 or len(paths) < 2 or _total_size(paths) < POOL_MIN_BYTES:
+        return [parse(path) for path in paths]
+    # ``spawn``: forking a process that runs threads (task workers, Channels) is unsafe.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        return list(pool.map(parse, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def _absolute(module: str, current: str, is_package: bool) -> str:
+    """Resolve a relative ``from .x import`` module against the importing module."""
+    level = len(module) - len(module.lstrip("."))
+    if not level:
+        return module
+    parts = current.split(".") if is_package else current.split(".")[:-1]
+    parts = parts[: len(parts) - (level - 1)] if level > 1 else parts
+    rest = module[level:]
+    return ".".join([*parts, rest] if rest else parts)
+
+
+class _Settings:
+    """``INSTALLED_APPS`` and ``AUTH_USER_MODEL`` read from the project's settings source."""
+
+    def __init__(self, finder: _Finder) -> None:
+        self.finder = finder
+        self.namespace: dict[str, Any] = {}
+        self.issues: list[str] = []
+
+    def load(self, module: str, depth: int = 0) -> None:
+        path = self.finder.module_file(module)
+        if path is None or depth > 5:
+            self.issues.append(f"settings module {module} not found in the workspace")
+            return
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (OSError, SyntaxError, ValueError) as exc:
+            self.issues.append(f"{path.name}: {type(exc).__name__}")
+            return
+        is_package = path.name == "__init__.py"
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names):
+                source = _absolute("." * node.level + (node.module or ""), module, is_package)
+                if self.finder.module_file(source) is not None:
+                    self.load(source, depth + 1)
+            elif isinstance(node, ast.Assign | ast.AnnAssign) and node.value is not None:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        self.namespace[target.id] = literal(node.value, self.namespace)
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                name = node.target.id
+                current = self.namespace.get(name, _UNKNOWN)
+                added = literal(node.value, self.namespace)
+                if isinstance(current, list) and isinstance(added, list | tuple):
+                    self.namespace[name] = current + list(added)
+                else:
+                    self.namespace[name] = _UNKNOWN
+            elif isinstance(node, ast.Expr):
+                self._mutations(node)
+            elif isinstance(node, ast.If | ast.Try | ast.For | ast.While | ast.With):
+                self._mutations(node, nested=True)
+
+    def _mutations(self, node: ast.AST, *, nested: bool = False) -> None:
+        for child in ast.walk(node):
+            changed = None
+            if isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute):
+                changed = dotted_name(child.func.value)
+            elif nested and isinstance(child, ast.Assign | ast.AugAssign | ast.AnnAssign):
+                targets = child.targets if isinstance(child, ast.Assign) else [child.target]
+                changed = next((t.id for t in targets if isinstance(t, ast.Name)), None)
+            if changed in SETTINGS_NAMES:
+                self.namespace[changed] = _UNKNOWN
+
+    def value(self, name: str, default: Any = _UNKNOWN) -> Any:
+        return self.namespace.get(name, default)
+
+
+class _Finder:
+    """Locate modules and packages under the workspace's import roots."""
+
+    def __init__(self, workdir: Path) -> None:
+        self.roots = [workdir, *([workdir / "src"] if (workdir / "src").is_dir() else [])]
+
+    def module_file(self, module: str) -> Path | None:
+        for root in self.roots:
+            path = root.joinpath(*module.split("."))
+            if path.with_suffix(".py").is_file():
+                return path.with_suffix(".py")
+            if (path / "__init__.py").is_file():
+                return path / "__init__.py"
+        return None
+
+    def package_dir(self, module: str) -> Path | None:
+        for root in self.roots:
+            path = root.joinpath(*module.split("."))
+            if path.is_dir() and not path.with_suffix(".py").is_file():
+                return path
+        return None
+
+    def module_name(self, path: Path) -> str:
+        root = next(root for root in self.roots if path.is_relative_to(root))
+        parts = list(path.relative_to(root).with_suffix("").parts)
+        if parts[-1] == "__init__":
+            parts.pop()
+        return ".".join(parts)
+
+
+def app_config(path: Path, class_name: str | None = None) -> dict[str, Any] | None:
+    """``name``/``label`` of an ``AppConfig`` in ``apps.py``, the default one if unnamed."""
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return None
+    configs = {}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and any(
+            (dotted_name(base) or "").endswith("AppConfig") for base in node.bases
+        ):
+            configs[node.name] = {
+                item.targets[0].id: literal(item.value, {})
+                for item in node.body
+                if isinstance(item, ast.Assign) and isinstance(item.targets[0], ast.Name)
+            }
+    if class_name is not None:
+        return configs.get(class_name)
+    defaults = [config for config in configs.values() if config.get("default") is True]
+    if len(defaults) == 1:
+        return defaults[0]
+    return next(iter(configs.values())) if len(configs) == 1 else None
+
+
+def _installed_app(finder: _Finder, entry: str) -> tuple[str, str, Path] | None:
+    """``(label, module, directory)`` of an ``INSTALLED_APPS`` entry inside the workspace."""
+    config = None
+    directory = finder.package_dir(entry)
+    module = entry
+    if directory is None:
+        module_part, _, class_name = entry.rpartition(".")
+        apps_file = finder.module_file(module_part) if module_part else None
+        if apps_file is None:
+            return None
+        config = app_config(apps_file, class_name)
+        if config is None or not isinstance(config.get("name"), str):
+            return None
+        module = config["name"]
+        directory = finder.package_dir(module)
+        if directory is None:
+            return None
+    elif (directory / "apps.py").is_file():
+        config = app_config(directory / "apps.py")
+    label = (config or {}).get("label")
+    if not isinstance(label, str):
+        label = module.rpartition(".")[2]
+    return label, module, directory
+
+
+def _model_files(directory: Path) -> list[Path]:
+    files = []
+    if (directory / "models.py").is_file():
+        files.append(directory / "models.py")
+    if (directory / "models").is_dir():
+        for root, dirs, names in os.walk(directory / "models"):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in FINGERPRINT_SKIP_DIRS]
+            files.extend(Path(root) / name for name in names if name.endswith(".py"))
+    return sorted(files)
+
+
+class _Resolver:
+    """Links parsed classes across modules and describes the concrete models."""
+
+    def __init__(self, parsed: list[dict[str, Any]], user_model: Any) -> None:
+        self.user_model = user_model
+        self.issues: list[str] = []
+        self.by_module: dict[str, dict[str, dict[str, Any]]] = {}
+        self.files: dict[str, dict[str, Any]] = {}
+        for source in parsed:
+            self.files[source["module"]] = source
+            for cls in source["classes"]:
+                cls["file"] = source
+                cls["label_app"] = cls["app_label"] or source["app"]
+                self.by_module.setdefault(source["module"], {})[cls["name"]] = cls
+        self._model_cache: dict[int, bool] = {}
+
+    def lookup(self, module: str, name: str) -> dict[str, Any] | None:
+        if cls := self.by_module.get(module, {}).get(name):
+            return cls
+        # ``models/__init__.py`` re-exporting classes defined in its submodules.
+        matches = [
+            classes[name]
+            for other, classes in self.by_module.items()
+            if other.startswith(f"{module}.") and name in classes
+        ]
+        return matches[0] if len(matches) == 1 else None
+
+    def resolve(self, dotted: str, source: dict[str, Any]) -> Any:
+        """A parsed class, ``DJANGO_MODEL``, ``(module, name)`` outside the workspace, or None."""
+        first, *rest = dotted.split(".")
+        if not rest and (cls := self.by_module.get(source["module"], {}).get(first)):
+            return cls
+        if first in source["imports"]:
+            target = source["imports"][first]
+            module, _, attr = target.partition(":")
+            module = _absolute(module, source["module"], source["is_package"])
+            if attr:
+                parts = [*module.split("."), attr, *rest] if module else [attr, *rest]
+            else:
+                parts = [*module.split("."), *rest]
+            module, name = ".".join(parts[:-1]), parts[-1]
+            if (module, name) == DJANGO_MODEL or (module, name) == (
+                "django.db.models.base",
+                "Model",
+            ):
+                return DJANGO_MODEL
+            return self.lookup(module, name) or (module, name)
+        if not rest:
+            for star in source["star_imports"]:
+                module = _absolute(star, source["module"], source["is_package"])
+                if cls := self.lookup(module, first):
+                    return cls
+        return None
+
+    def bases(self, cls: dict[str, Any]) -> list[Any]:
+        return [self.resolve(base, cls["file"]) for base in cls["bases"]]
+
+    def is_model(self, cls: dict[str, Any], seen: frozenset[int] = frozenset()) -> bool:
+        key = id(cls)
+        if key in self._model_cache:
+            return self._model_cache[key]
+        if key in seen:
+            return False
+        result = any(
+            base is DJANGO_MODEL or (isinstance(base, dict) and self.is_model(base, seen | {key}))
+            for base in self.bases(cls)
+        )
+        self._model_cache[key] = result
+        return result
+
+    def check_bases(self, cls: dict[str, Any]) -> None:
+        """Record an issue for a field-bearing class whose base cannot be followed."""
+        if not cls["fields"] and not self.is_model(cls):
+            return
+        for dotted, base in zip(cls["bases"], self.bases(cls), strict=True):
+            if base is None or (isinstance(base, tuple) and not base[0].startswith("django.db")):
+                where = f"{cls['file']['module']}.{cls['name']}"
+                self.issues.append(f"{where}: base class {dotted} is outside the workspace")
+
+    def label(self, cls: dict[str, Any]) -> str:
+        return f"{cls['label_app']}.{cls['name']}"
+
+    def target(self, field_: dict[str, Any], owner: dict[str, Any], source: dict[str, Any]):
+        target = field_["target"]
+        if target is None:
+            return None
+        if "string" in target:
+            value = target["string"]
+            if value == "self":
+                return self.label(owner)
+            return value if "." in value else f"{owner['label_app']}.{value}"
+        dotted = target["name"]
+        if dotted.endswith("AUTH_USER_MODEL"):
+            return self.user_model if isinstance(self.user_model, str) else None
+        resolved = self.resolve(dotted, source)
+        if isinstance(resolved, dict):
+            return self.label(resolved)
+        if isinstance(resolved, tuple):
+            parts = resolved[0].split(".")
+            # ``django.contrib.auth.models`` → ``auth``; models modules of installed apps.
+            if "models" in parts and parts.index("models") > 0:
+                return f"{parts[parts.index('models') - 1]}.{resolved[1]}"
+        return None
+
+    def inherited(self, cls: dict[str, Any], seen: frozenset[int] = frozenset()):
+        """``(field, declaring class)`` pairs from abstract bases, base-most first."""
+        pairs = []
+        for base in self.bases(cls):
+            if isinstance(base, dict) and base["abstract"] and id(base) not in seen:
+                pairs.extend(self.inherited(base, seen | {id(cls)}))
+                pairs.extend((field_, base) for field_ in base["fields"])
+        return pairs
+
+    def concrete_parent(self, cls: dict[str, Any]) -> dict[str, Any] | None:
+        for base in self.bases(cls):
+            if isinstance(base, dict) and self.is_model(base) and not base["abstract"]:
+                return base
+        return None
+
+    def describe(self, cls: dict[str, Any], seen: frozenset[int] = frozenset()) -> dict:
+        parent = self.concrete_parent(cls) if id(cls) not in seen else None
+        parent_model = self.describe(parent, seen | {id(cls)}) if parent else None
+        label = self.label(cls)
+        if cls["proxy"] and parent_model:
+            return {
+                "name": cls["name"],
+                "label": label,
+                "table": parent_model["table"],
+                "fields": parent_model["fields"],
+                "relations": [],
+                "proxy": True,
+            }
+        declared = [*self.inherited(cls), *((field_, cls) for field_ in cls["fields"])]
+        fields, many = [], []
+        relations = []
+        if parent_model:
+            ptr = f"{parent['name'].lower()}_ptr"
+            fields = [f for f in parent_model["fields"] if f not in parent_model.get("m2m", [])]
+            many = list(parent_model.get("m2m", []))
+            fields.append(ptr)
+            relations.append({"field": ptr, "target": parent_model["label"], "kind": "o2o"})
+        elif not any(field_["primary_key"] for field_, _ in declared):
+            fields.append("id")
+        for field_, origin in declared:
+            (many if field_["type"] == "ManyToManyField" else fields).append(field_["name"])
+            if field_["type"] not in RELATION_KINDS:
+                continue
+            target = self.target(field_, cls, origin["file"])
+            if target is None:
+                where = f"{cls['file']['module']}.{cls['name']}.{field_['name']}"
+                self.issues.append(f"{where}: relation target cannot be resolved statically")
+                continue
+            relations.append(
+                {"field": field_["name"], "target": target, "kind": RELATION_KINDS[field_["type"]]}
+            )
+        return {
+            "name": cls["name"],
+            "label": label,
+            "table": cls["db_table"] or f"{cls['label_app']}_{cls['name'].lower()}",
+            "fields": [*fields, *many],
+            "relations": relations,
+            "proxy": False,
+            "m2m": many,
+        }
+
+
+@dataclass
+class ProjectApps:
+    """Installed apps inside the workspace (label → directory), as read from the settings."""
+
+    apps: dict[str, Path] = field(default_factory=dict)
+    user_model: Any = DEFAULT_USER_MODEL
+    issues: list[str] = field(default_factory=list)
+
+
+def project_apps(workdir: Path) -> ProjectApps:
+    """Follow ``manage.py`` to the settings and resolve ``INSTALLED_APPS`` from source."""
+    project = ProjectApps()
+    finder = _Finder(workdir)
+    settings_module = None
+    try:
+        nodes = list(ast.walk(ast.parse((workdir / "manage.py").read_bytes())))
+    except (OSError, SyntaxError, ValueError):
+        nodes = []
+    for node in nodes:
+        if (
+            isinstance(node, ast.Call)
+            and (dotted_name(node.func) or "").endswith("setdefault")
+            and len(node.args) == 2
+            and literal(node.args[0], {}) == "DJANGO_SETTINGS_MODULE"
+        ):
+            settings_module = literal(node.args[1], {})
+    if not isinstance(settings_module, str):
+        project.issues.append("DJANGO_SETTINGS_MODULE is not set literally in manage.py")
+        return project
+
+    project_settings = _Settings(finder)
+    project_settings.load(settings_module)
+    project.issues.extend(project_settings.issues)
+    project.user_model = project_settings.value("AUTH_USER_MODEL", DEFAULT_USER_MODEL)
+    installed = project_settings.value("INSTALLED_APPS")
+    if not isinstance(installed, list) or not all(isinstance(a, str) for a in installed):
+        project.issues.append("INSTALLED_APPS cannot be read without running the settings")
+        return project
+    for entry in installed:
+        if (app := _installed_app(finder, entry)) is not None:
+            label, _, directory = app
+            project.apps[label] = directory
+    if not project.apps and list(workdir.glob("*/models.py")):
+        project.issues.append("no installed app was found in the workspace")
+    return project
+
+
+def extract_models(workdir: Path, *, workers: int = 1) -> StaticExtraction:
+    """Describe the workspace's installed apps and their models from source."""
+    start = time.monotonic()
+    extraction = StaticExtraction()
+    finder = _Finder(workdir)
+    project = project_apps(workdir)
+    if project.issues:
+        extraction.issues.extend(project.issues)
+        return extraction
+
+    sources = []
+    for label, directory in project.apps.items():
+        extraction.apps[label] = {"label": label, "path": str(directory), "models": []}
+        sources.extend((label, path) for path in _model_files(directory))
+
+    parsed = parse_all([str(path) for _, path in sources], workers)
+    extraction.files = len(parsed)
+    for (label, path), source in zip(sources, parsed, strict=True):
+        if "error" in source:
+            extraction.issues.append(f"{path.name}: {source['error']}")
+            source.update(imports={}, star_imports=[], classes=[])
+        source.update(
+            app=label, module=finder.module_name(path), is_package=path.name == "__init__.py"
+        )
+
+    resolver = _Resolver(parsed, project.user_model)
+    for source in parsed:
+        for cls in source["classes"]:
+            resolver.check_bases(cls)
+            if resolver.is_model(cls) and not cls["abstract"]:
+                model = resolver.describe(cls)
+                model.pop("m2m", None)
+                extraction.apps.setdefault(
+                    cls["label_app"], {"label": cls["label_app"], "path": "", "models": []}
+                )["models"].append(model)
+    # Django matches ``"app.model"`` strings case-insensitively; use the declared spelling.
+    labels = {
+        model["label"].lower(): model["label"]
+        for app in extraction.apps.values()
+        for model in app["models"]
+    }
+    for app in extraction.apps.values():
+        for model in app["models"]:
+            for relation in model["relations"]:
+                relation["target"] = labels.get(relation["target"].lower(), relation["target"])
+    extraction.issues.extend(dict.fromkeys(resolver.issues))
+    extraction.seconds = round(time.monotonic() - start, 4)
+    return extraction
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
 from typing import Any
 
 from django.conf import settings
 from django.db import transaction
-from django_tasks import task
+from django.utils import timezone
+from django_tasks import TaskResult, task
 
 from .command_runner import (
     CommandExecutionError,
@@ -13,14 +19,26 @@ from .command_runner import (
     run_command,
     validate_safe_command,
 )
-from .models import WorkspaceTaskRun
+from .fixture_export import export_fixtures
+from .migration_diff import diff_migrations
+from .models import ScanJob, Workspace, WorkspaceTaskRun
+from .output_parsers import parsed_insights, parsers_for, trusted_results
+from .output_retention import HeadTailLog, spill_path_for
+from .pipelines import advance_pipeline
+from .result_cache import cached_output, find_cached_run, is_cacheable, workspace_fingerprint
+from .scheduler import record_enqueue, retry_delay, task_priority, try_admit
+from .schema_ingest import ingest_schema
+from .sql_plan import sql_plan
+from .warm_worker import run_warm_command
+
+logger = logging.getLogger(__name__)
 
 
 def _store_command_metadata(run: WorkspaceTaskRun, payload: dict[str, Any]) -> dict[str, Any]:
     metadata = run.metadata or {}
     metadata["command"] = payload
-    run.metadata = metadata
-    run.save(update_fields=["metadata"])
+    # Written together with the final status by ``mark_finished``.
+    run.stage(metadata=metadata)
     return metadata["command"]
 
 
@@ -31,9 +49,8 @@ def _fail_run(
     safe_prefix: str | None = None,
 ) -> dict[str, Any]:
     run.append_log(message)
-    run.flush_log_buffer()
     payload: dict[str, Any] = {
-        "raw": run.preset.command,
+        "raw": run.command_line,
         "workspace_path": run.workspace.project_path,
         "error": message,
     }
@@ -46,61 +63,230 @@ def _fail_run(
     return payload
 
 
-def _success_payload(run: WorkspaceTaskRun, result: CommandResult) -> dict[str, Any]:
+def _success_payload(
+    run: WorkspaceTaskRun, result: CommandResult, cache: dict[str, Any]
+) -> dict[str, Any]:
     payload = {
-        "raw": run.preset.command,
+        "raw": run.command_line,
         "workspace_path": run.workspace.project_path,
         "safe_prefix": result.safe_prefix,
         "exit_code": result.exit_code,
         "duration_seconds": result.duration,
         "output_lines": result.output_lines,
         "timed_out": result.timed_out,
+        "warm_worker": result.warm,
+        "cancelled": result.cancelled,
+        "resources": result.resources,
+        "parsed": result.parsed,
+        **cache,
     }
     return _store_command_metadata(run, payload)
 
 
+def _record_insights(run: WorkspaceTaskRun, parsed: dict[str, Any]) -> None:
+    """Replace the workspace insight cards derived from ``parsed`` output."""
+    with transaction.atomic():
+        workspace = Workspace.objects.select_for_update().get(pk=run.workspace_id)
+        metadata = workspace.metadata or {}
+        previous = {insight.get("title"): insight for insight in metadata.get("insights", [])}
+        fresh = parsed_insights(parsed, previous)
+        titles = {insight["title"] for insight in fresh}
+        kept = [insight for insight in previous.values() if insight.get("title") not in titles]
+        metadata["insights"] = fresh + kept
+        workspace.metadata = metadata
+        workspace.save(update_fields=["metadata"])
+
+
+def _tick(run: WorkspaceTaskRun, output: HeadTailLog | None = None) -> bool:
+    """Runner heartbeat: flush due log lines and report whether a cancel was requested."""
+    if output is not None:
+        output.tick()
+    run.flush_if_due()
+    return run.cancel_requested()
+
+
+def enqueue_task_run(run: WorkspaceTaskRun, *, priority: int | None = None) -> TaskResult:
+    """Queue ``run`` with its category priority and record queue depth in the metadata."""
+    if priority is None:
+        priority = task_priority(run.preset)
+    record_enqueue(run, priority)
+    return execute_workspace_task.using(priority=priority).enqueue(run.pk)
+
+
+def _defer_run(run: WorkspaceTaskRun) -> dict[str, Any]:
+    """Re-queue ``run`` with backoff because a concurrency cap is reached."""
+    scheduler = run.metadata["scheduler"]
+    delay = retry_delay(scheduler["deferrals"])
+    run_after = timezone.now() + timedelta(seconds=delay)
+    result = execute_workspace_task.using(
+        priority=scheduler["priority"], run_after=run_after
+    ).enqueue(run.pk)
+    # No ``save()``: a status version bump per retry would keep every dashboard refreshing.
+    run.result_id = result.id
+    WorkspaceTaskRun.objects.filter(pk=run.pk).update(result_id=result.id)
+    return {"deferred": True, "retry_seconds": delay, **scheduler}
+
+
+def _lookup_cached_result(
+    run: WorkspaceTaskRun, command: str, safe_prefix: str
+) -> tuple[dict[str, Any], WorkspaceTaskRun | None]:
+    """Return cache metadata for ``run`` and the earlier run whose output can be reused."""
+    if not is_cacheable(safe_prefix):
+        return {"cache": "skipped"}, None
+    fingerprint = workspace_fingerprint(Path(run.workspace.project_path))
+    if (run.metadata or {}).get("force_refresh"):
+        return {"cache": "refresh", "fingerprint": fingerprint}, None
+    cache = {"cache": "miss", "fingerprint": fingerprint}
+    return cache, find_cached_run(run, command, fingerprint)
+
+
+def start_pipeline_steps(pipeline_id: int) -> list[WorkspaceTaskRun]:
+    """Queue every step of the pipeline that became runnable; returns the new child runs."""
+    runs = advance_pipeline(pipeline_id)
+    for run in runs:
+        result = enqueue_task_run(run)
+        WorkspaceTaskRun.objects.filter(pk=run.pk).update(result_id=result.id)
+    return runs
+
+
 @task()
 def execute_workspace_task(task_run_id: int) -> dict[str, Any]:
     """Execute a SAFE Django management command for the selected workspace."""
 
     run = WorkspaceTaskRun.objects.select_related("workspace", "preset").get(pk=task_run_id)
-    command = (run.preset.command or "").strip()
+    payload = _execute_run(run)
+    if run.pipeline_id is not None and not payload.get("deferred"):
+        # Dependent steps start as soon as their last input finished.
+        start_pipeline_steps(run.pipeline_id)
+    return payload
+
+
+def _execute_run(run: WorkspaceTaskRun) -> dict[str, Any]:
+    if run.status != WorkspaceTaskRun.Status.REQUESTED:
+        return {"skipped": run.status}  # cancelled while queued
+    command = run.command_line
     try:
         safe_prefix = validate_safe_command(command)
     except CommandExecutionError as exc:
         return _fail_run(run, str(exc))
 
-    run.mark_running()
-    run.progress = 5
-    run.save(update_fields=["progress"])
+    if not try_admit(run, enforce_caps=execute_workspace_task.get_backend().supports_defer):
+        if run.status != WorkspaceTaskRun.Status.REQUESTED:
+            return {"skipped": run.status}  # cancelled after the check above
+        return _defer_run(run)
+    run.stage(progress=5)
     run.append_log(f"Executing `{command}` inside {run.workspace.project_path}")
-    run.flush_log_buffer()
+    run.flush_state()
 
-    try:
-        result = run_command(
-            command=command,
-            workspace_path=run.workspace.project_path,
-            timeout=settings.INSPECTOR_TASK_TIMEOUT,
-            log_callback=run.append_log,
-            safe_prefix=safe_prefix,
-        )
-    except UnsafeCommandError as exc:
-        return _fail_run(run, str(exc))
-    except CommandExecutionError as exc:
-        return _fail_run(run, str(exc), safe_prefix=safe_prefix)
+    cache, source = _lookup_cached_result(run, command, safe_prefix)
+    output_start = run.logged_line_count
+    if source is not None:
+        result, lines = cached_output(source)
+        run.append_log(f"Project unchanged since run #{source.pk}; replaying cached output.")
+        output_start = run.logged_line_count
+        run.replay_log(lines)
+        cache.update(cache="hit", cached_from=source.pk)
+    else:
+        runner = run_warm_command if settings.INSPECTOR_WARM_WORKERS else run_command
+        log_callback = output = None
+        if settings.INSPECTOR_TASK_OUTPUT_BOUNDED:
+            log_callback = output = HeadTailLog(
+                run.append_log,
+                head=settings.INSPECTOR_TASK_OUTPUT_HEAD_LINES,
+                tail=settings.INSPECTOR_TASK_OUTPUT_TAIL_LINES,
+                spill_path=spill_path_for(run.pk),
+                progress_interval=settings.INSPECTOR_TASK_OUTPUT_PROGRESS_SECONDS,
+            )
+        try:
+            result = runner(
+                command=command,
+                workspace_path=run.workspace.project_path,
+                timeout=settings.INSPECTOR_TASK_TIMEOUT,
+                log_callback=log_callback or run.append_log,
+                safe_prefix=safe_prefix,
+                tick_callback=partial(_tick, run, output),
+                parsers=parsers_for(safe_prefix),
+            )
+        except UnsafeCommandError as exc:
+            return _fail_run(run, str(exc))
+        except CommandExecutionError as exc:
+            return _fail_run(run, str(exc), safe_prefix=safe_prefix)
+        finally:
+            if output is not None:
+                cache["output"] = output.close()
+    if "fingerprint" in cache:
+        # Line range of the command output, replayed by later cache hits.
+        cache["log_lines"] = [output_start, run.logged_line_count]
 
-    run.progress = 95
-    run.save(update_fields=["progress"])
+    if result.cancelled:
+        run.append_log("Command cancelled; its process group was terminated.")
+        payload = _success_payload(run, result, cache)
+        run.mark_cancelled()
+        return payload
     if result.timed_out:
         run.append_log("Command timed out before completion.")
-        run.flush_log_buffer()
     else:
         run.append_log(f"Command finished with exit code {result.exit_code}.")
-        run.flush_log_buffer()
 
-    payload = _success_payload(run, result)
+    # Remaining log lines, metadata, and the final status go out in one write.
+    payload = _success_payload(run, result, cache)
     run.mark_finished(success=(result.exit_code == 0 and not result.timed_out))
+    parsed = trusted_results(result.parsed or {}, result.exit_code)
+    if parsed and not result.timed_out:
+        _record_insights(run, parsed)
 
     # Ensure the calling view gets deterministic data even inside transactions.
     transaction.on_commit(lambda: None)
     return payload
+
+
+# Engines per ``ScanJob.Kind``; scans of other kinds cannot be run yet.
+SCAN_ENGINES: dict[str, Callable[[ScanJob], dict[str, Any]]] = {
+    ScanJob.Kind.SCHEMA: ingest_schema,
+    ScanJob.Kind.MIGRATIONS: diff_migrations,
+    ScanJob.Kind.FIXTURES: export_fixtures,
+}
+
+
+def enqueue_scan_job(job: ScanJob) -> TaskResult:
+    """Queue ``job``; scans are bulk work and share the ``automation`` priority."""
+    priority = settings.INSPECTOR_TASK_PRIORITIES.get("automation", 0)
+    return execute_scan_job.using(priority=priority).enqueue(job.pk)
+
+
+@task()
+def execute_scan_job(scan_job_id: int) -> dict[str, Any]:
+    """Run the engine registered for the scan's kind."""
+
+    job = ScanJob.objects.select_related("workspace").get(pk=scan_job_id)
+    try:
+        result = SCAN_ENGINES[job.kind](job)
+    except Exception as exc:
+        # An engine that crashes must not leave the job RUNNING; that blocks every rerun.
+        logger.exception("Scan job %s failed.", job.pk)
+        job.status = ScanJob.Status.FAILED
+        job.summary = f"{job.get_kind_display()} failed: {type(exc).__name__}: {exc}"[:255]
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "summary", "completed_at"])
+        return {"id": job.pk, "status": job.status, "summary": job.summary}
+    if (
+        job.kind == ScanJob.Kind.MIGRATIONS
+        and job.status == ScanJob.Status.COMPLETED
+        and job.details["migrations"]["plan"]
+        and settings.INSPECTOR_SQL_PLAN_PRECOMPUTE
+    ):
+        priority = settings.INSPECTOR_TASK_PRIORITIES.get("automation", 0)
+        precompute_sql_plan.using(priority=priority).enqueue(job.workspace_id)
+    return result
+
+
+@task()
+def precompute_sql_plan(workspace_id: int, refresh: bool = False) -> dict[str, Any]:
+    """Fill the ``sqlmigrate`` cache for the workspace's pending migrations."""
+
+    workspace = Workspace.objects.get(pk=workspace_id)
+    try:
+        plan = sql_plan(workspace, refresh=refresh)
+    except CommandExecutionError as exc:
+        return {"workspace": workspace.slug, "error": str(exc)}
+    return {"workspace": workspace.slug, "stats": plan["stats"]}
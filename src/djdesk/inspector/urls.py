@@ -12,6 +12,21 @@ urlpatterns = [
         views.workspace_status_api,
         name="workspace-status",
     ),
+    path(
+        "api/workspaces/<slug:slug>/migrations/",
+        views.workspace_migrations_api,
+        name="workspace-migrations",
+    ),
+    path(
+        "api/workspaces/<slug:slug>/sql-plan/",
+        views.workspace_sql_plan_api,
+        name="workspace-sql-plan",
+    ),
+    path(
+        "api/workspaces/<slug:slug>/sql-plan/compute/",
+        views.workspace_sql_plan_compute_api,
+        name="workspace-sql-plan-compute",
+    ),
     path(
         "api/task-runs/",
         views.TaskRunCreateView.as_view(),
@@ -22,6 +37,46 @@ urlpatterns = [
         views.task_run_detail_api,
         name="task-run-detail",
     ),
+    path(
+        "api/task-runs/<int:pk>/cancel/",
+        views.task_run_cancel_api,
+        name="task-run-cancel",
+    ),
+    path(
+        "api/task-batches/",
+        views.TaskBatchCreateView.as_view(),
+        name="task-batch-create",
+    ),
+    path(
+        "api/task-batches/<slug:batch_id>/",
+        views.task_batch_detail_api,
+        name="task-batch-detail",
+    ),
+    path(
+        "api/task-pipelines/",
+        views.TaskPipelineCreateView.as_view(),
+        name="task-pipeline-create",
+    ),
+    path(
+        "api/task-pipelines/<int:pk>/",
+        views.task_pipeline_detail_api,
+        name="task-pipeline-detail",
+    ),
+    path(
+        "api/scans/<int:pk>/",
+        views.scan_job_detail_api,
+        name="scan-detail",
+    ),
+    path(
+        "api/scans/<int:pk>/run/",
+        views.scan_job_run_api,
+        name="scan-run",
+    ),
+    path(
+        "api/task-presets/usage/",
+        views.task_resource_usage_api,
+        name="task-resource-usage",
+    ),
     path(
         "api/workspaces/<slug:slug>/data-lab/export/",
         views.data_lab_export_api,
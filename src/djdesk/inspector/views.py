@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import mimetypes
 import posixpath
+import re
 from typing import Any
 from urllib.parse import urlsplit
 
@@ -18,19 +19,32 @@ from django.http import (
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.views import View
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
 from django.views.generic import FormView, TemplateView
 
 from . import assets, data_lab
-from .forms import TaskRunForm, WorkspaceWizardForm
-from .models import DocLink, TaskPreset, Workspace, WorkspaceTaskRun
-from .services import workspace_data_lab_payload, workspace_status_payload
+from .batches import task_batch_summary
+from .command_runner import CommandExecutionError
+from .forms import TaskBatchForm, TaskPipelineForm, TaskRunForm, WorkspaceWizardForm
+from .models import DocLink, ScanJob, TaskPipelineRun, TaskPreset, Workspace, WorkspaceTaskRun
+from .pipelines import pipeline_payload
+from .services import (
+    serialize_scan,
+    task_resource_usage,
+    workspace_data_lab_payload,
+    workspace_status_payload,
+)
+from .sql_plan import SqlPlanError, mark_queued, sql_plan
+from .tasks import SCAN_ENGINES, enqueue_scan_job, precompute_sql_plan
 
 MIMETYPE_OVERRIDES = {
     ".woff": "font/woff",
     ".woff2": "font/woff2",
     ".svg": "image/svg+xml",
 }
+# ``app_label`` or ``app_label.ModelName``; labels end up in argv and export file names.
+MODEL_LABEL = re.compile(r"\w+(\.\w+)?")
 
 
 class DashboardView(TemplateView):
@@ -175,33 +189,233 @@ class TaskRunCreateView(View):
             "id": run.pk,
             "status": run.status,
             "progress": run.progress,
-            "log": run.log,
+            "log_line_count": run.log_line_count,
+            "log_tail": run.log_tail,
         }
         return JsonResponse(payload, status=201)
 
 
+class TaskBatchCreateView(View):
+    """Queues one preset across many workspaces and answers with the batch summary."""
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        form = TaskBatchForm(request.POST, initial={"requested_by": "inspector-batch"})
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        batch_id = form.save()
+        return JsonResponse(task_batch_summary(batch_id), status=202)
+
+
+@require_GET
+def task_batch_detail_api(request: HttpRequest, batch_id: str) -> JsonResponse:
+    summary = task_batch_summary(batch_id)
+    if summary is None:
+        raise Http404("Unknown task batch.")
+    return JsonResponse(summary)
+
+
+class TaskPipelineCreateView(View):
+    """Starts a pipeline run; its independent steps are queued right away."""
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        form = TaskPipelineForm(request.POST, initial={"requested_by": "inspector-ui"})
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        try:
+            pipeline = form.save()
+        except forms.ValidationError as exc:
+            return JsonResponse({"errors": exc.message_dict}, status=400)
+        return JsonResponse(pipeline_payload(pipeline), status=201)
+
+
 @require_GET
+def task_pipeline_detail_api(request: HttpRequest, pk: int) -> JsonResponse:
+    pipeline = get_object_or_404(TaskPipelineRun.objects.select_related("workspace"), pk=pk)
+    return JsonResponse(pipeline_payload(pipeline))
+
+
+def workspace_status_etag(request: HttpRequest, slug: str) -> str | None:
+    """Cheap fingerprint lookup so unchanged polls skip payload assembly entirely."""
+    version = (
+        Workspace.objects.filter(slug=slug).values_list("status_version", flat=True).first()
+    )
+    if version is None:
+        return None
+    return f'"{slug}-{version}"'
+
+
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=workspace_status_etag)
 def workspace_status_api(request: HttpRequest, slug: str) -> JsonResponse:
     workspace = get_object_or_404(Workspace, slug=slug)
-    payload = workspace_status_payload(workspace)
+    try:
+        since = int(request.GET["since"])
+    except (KeyError, ValueError):
+        since = None
+    payload = workspace_status_payload(workspace, since=since)
     return JsonResponse(payload)
 
 
+@require_GET
+def workspace_migrations_api(request: HttpRequest, slug: str) -> JsonResponse:
+    """The workspace's precomputed migration graph analytics, optionally for one ``app``."""
+    workspace = get_object_or_404(Workspace, slug=slug)
+    graph = workspace.migration_graph
+    if not graph:
+        return JsonResponse(
+            {"errors": {"migrations": ["No migration scan has completed yet."]}}, status=404
+        )
+    if label := request.GET.get("app"):
+        if label not in graph["apps"]:
+            return JsonResponse({"errors": {"app": [f"Unknown app {label!r}."]}}, status=404)
+        app = graph["apps"][label]
+        return JsonResponse(
+            {
+                "app": label,
+                **app,
+                "conflict": label in graph["conflicts"],
+                "squash_candidate": label in graph["squash_candidates"],
+            }
+        )
+    return JsonResponse(graph)
+
+
+@require_GET
+def workspace_sql_plan_api(request: HttpRequest, slug: str) -> JsonResponse:
+    """
+    Combined ``sqlmigrate`` output of the pending migrations, from the plan cache only.
+
+    Migrations without a cached plan are listed as ``pending``; ``POST`` to
+    ``workspace_sql_plan_compute_api`` to have them computed.
+    """
+
+    workspace = get_object_or_404(Workspace, slug=slug)
+    try:
+        plan = sql_plan(workspace, compute=False)
+    except SqlPlanError as exc:
+        return JsonResponse({"errors": {"migrations": [str(exc)]}}, status=404)
+    except CommandExecutionError as exc:
+        return JsonResponse({"errors": {"workspace": [str(exc)]}}, status=400)
+    return JsonResponse(plan)
+
+
+@require_POST
+def workspace_sql_plan_compute_api(request: HttpRequest, slug: str) -> JsonResponse:
+    """
+    Queue ``precompute_sql_plan`` for missing or failed plans; ``refresh`` recomputes all.
+
+    Migrations a task is already queued for are not queued again. Cached plans stay
+    readable until their recomputed SQL replaces them.
+    """
+
+    workspace = get_object_or_404(Workspace, slug=slug)
+    refresh = bool(request.POST.get("refresh"))
+    try:
+        plan = sql_plan(workspace, compute=False)
+        targets = [
+            entry
+            for entry in plan["migrations"]
+            if "key" in entry and (refresh or (entry["status"] != "done" and not entry["queued"]))
+        ]
+        if not targets:
+            return JsonResponse(plan)
+        mark_queued(targets)
+        priority = settings.INSPECTOR_TASK_PRIORITIES.get("schema", 0)
+        precompute_sql_plan.using(priority=priority).enqueue(workspace.pk, refresh)
+        plan = sql_plan(workspace, compute=False)
+    except SqlPlanError as exc:
+        return JsonResponse({"errors": {"migrations": [str(exc)]}}, status=404)
+    except CommandExecutionError as exc:
+        return JsonResponse({"errors": {"workspace": [str(exc)]}}, status=400)
+    return JsonResponse(plan, status=202)
+
+
 @require_GET
 def task_run_detail_api(request: HttpRequest, pk: int) -> JsonResponse:
     run = get_object_or_404(WorkspaceTaskRun.objects.select_related("preset"), pk=pk)
+    try:
+        after_seq = int(request.GET.get("after_seq", 0))
+    except ValueError:
+        after_seq = -1
+    if after_seq < 0:
+        return JsonResponse(
+            {"errors": {"after_seq": ["Must be a non-negative integer."]}}, status=400
+        )
+
+    log, last_seq = run.read_log(after_seq=after_seq)
     data = {
         "id": run.pk,
         "preset": run.preset.key,
         "label": run.preset.label,
         "status": run.status,
         "progress": run.progress,
-        "log": run.log,
+        "log": log,
+        "after_seq": after_seq,
+        "last_seq": last_seq,
         "metadata": run.metadata,
     }
     return JsonResponse(data)
 
 
+@require_POST
+def task_run_cancel_api(request: HttpRequest, pk: int) -> JsonResponse:
+    run = get_object_or_404(WorkspaceTaskRun, pk=pk)
+    if not run.request_cancel():
+        return JsonResponse(
+            {"errors": {"status": [f"Task run already finished ({run.status})."]}}, status=409
+        )
+    return JsonResponse(
+        {"id": run.pk, "status": run.status, "cancel_requested_at": run.cancel_requested_at},
+        status=202,
+    )
+
+
+def _scan_payload(job: ScanJob) -> dict[str, Any]:
+    return {**serialize_scan(job), "details": job.details, "duration": job.duration_seconds()}
+
+
+@require_GET
+def scan_job_detail_api(request: HttpRequest, pk: int) -> JsonResponse:
+    return JsonResponse(_scan_payload(get_object_or_404(ScanJob, pk=pk)))
+
+
+@require_POST
+def scan_job_run_api(request: HttpRequest, pk: int) -> JsonResponse:
+    """Queue a scan; running a finished or failed job again resumes it where possible."""
+    job = get_object_or_404(ScanJob.objects.select_related("workspace"), pk=pk)
+    if job.kind not in SCAN_ENGINES:
+        return JsonResponse(
+            {"errors": {"kind": [f"{job.get_kind_display()} scans cannot be run yet."]}},
+            status=400,
+        )
+    # ``force`` recovers a job left running by a worker that died mid-scan.
+    if job.status == ScanJob.Status.RUNNING and not request.POST.get("force"):
+        return JsonResponse({"errors": {"status": ["Scan is already running."]}}, status=409)
+    job.details = {**job.details, "force_refresh": bool(request.POST.get("force_refresh"))}
+    models = request.POST.getlist("models")
+    if invalid := [label for label in models if not MODEL_LABEL.fullmatch(label)]:
+        return JsonResponse(
+            {"errors": {"models": [f"Invalid model label: {label!r}." for label in invalid]}},
+            status=400,
+        )
+    if models:
+        job.details["models"] = models
+    job.status = ScanJob.Status.PENDING
+    job.save(update_fields=["details", "status"])
+    enqueue_scan_job(job)
+    job.refresh_from_db()
+    return JsonResponse(_scan_payload(job), status=202)
+
+
+@require_GET
+def task_resource_usage_api(request: HttpRequest) -> JsonResponse:
+    workspace = None
+    if slug := request.GET.get("workspace"):
+        workspace = get_object_or_404(Workspace, slug=slug)
+    return JsonResponse({"presets": task_resource_usage(workspace)})
+
+
 @require_POST
 def data_lab_export_api(request: HttpRequest, slug: str) -> JsonResponse:
     workspace = get_object_or_404(Workspace, slug=slug)
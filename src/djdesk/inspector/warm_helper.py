@@ -0,0 +1,151 @@
+"""
+Long-lived helper executed with the *inspected* project's interpreter.
+
+Started by ``djdesk.inspector.warm_worker`` as ``python warm_helper.py`` inside the workspace
+directory. It runs the project's own ``manage.py`` (so settings and ``sys.path`` are resolved
+exactly like a cold ``python manage.py …`` run), intercepts ``execute_from_command_line``,
+and then serves ``call_command`` requests over stdin/stdout as JSON lines:
+
+* request: ``{"args": ["check", "--deploy"]}``
+* responses: ``{"ready": true}`` once, then ``{"line": "…"}`` per output line and a final
+  ``{"exit": <code>, "rusage": {…}}`` per request, or ``{"error": "…"}`` when startup fails.
+  ``rusage`` holds the helper's resource usage during the request (``ru_maxrss`` is the
+  helper's peak), or ``null`` where the ``resource`` module is unavailable.
+
+This file must not import anything from djdesk: the target interpreter only has the
+project's dependencies installed.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import runpy
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+RUSAGE_FIELDS = (
+    "ru_utime",
+    "ru_stime",
+    "ru_maxrss",
+    "ru_inblock",
+    "ru_oublock",
+    "ru_nvcsw",
+    "ru_nivcsw",
+)
+
+
+class _LineEmitter(io.TextIOBase):
+    """Text stream that forwards complete lines to the protocol channel."""
+
+    def __init__(self, emit):
+        self._emit = emit
+        self._partial = ""
+        self.lines = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._partial += text
+        *complete, self._partial = self._partial.split("\n")
+        for line in complete:
+            self._emit({"line": line.rstrip("\r")})
+            self.lines += 1
+        return len(text)
+
+    def finish(self) -> None:
+        if self._partial:
+            self.write("\n")
+
+
+def _usage():
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    usage = {field: getattr(own, field) + getattr(children, field) for field in RUSAGE_FIELDS}
+    usage["ru_maxrss"] = max(own.ru_maxrss, children.ru_maxrss)
+    return usage
+
+
+def _usage_delta(before, after):
+    if before is None or after is None:
+        return None
+    delta = {field: after[field] - before[field] for field in RUSAGE_FIELDS}
+    delta["ru_maxrss"] = after["ru_maxrss"]
+    return delta
+
+
+def _serve(protocol, argv) -> None:
+    import django
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+    from django.db import connections
+
+    def emit(message) -> None:
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    try:
+        django.setup()
+    except Exception:
+        emit({"error": traceback.format_exc()})
+        raise SystemExit(1) from None
+    emit({"ready": True, "pid": os.getpid()})
+
+    for raw in sys.stdin:
+        try:
+            args = json.loads(raw)["args"]
+        except (ValueError, KeyError, TypeError):
+            emit({"exit": 2})
+            continue
+        output = _LineEmitter(emit)
+        sys.stdout = sys.stderr = output
+        code = 0
+        before = _usage()
+        try:
+            call_command(*args, stdout=output, stderr=output, no_color=True)
+        except CommandError as exc:
+            output.write(f"CommandError: {exc}\n")
+            code = exc.returncode
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except Exception:
+            output.write(traceback.format_exc())
+            code = 1
+        finally:
+            output.finish()
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+            # Never reuse connections across requests so each run sees current database state.
+            connections.close_all()
+        emit({"exit": code, "rusage": _usage_delta(before, _usage())})
+
+
+def main() -> None:
+    # Keep the protocol on a private copy of stdout; anything printed elsewhere goes to stderr.
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    workdir = os.getcwd()
+    sys.path[0] = workdir
+    try:
+        import django.core.management as management
+    except ImportError:
+        protocol.write(json.dumps({"error": "Django is not importable in this workspace."}) + "\n")
+        protocol.flush()
+        raise SystemExit(1) from None
+
+    management.execute_from_command_line = lambda argv=None: _serve(protocol, argv)
+    sys.argv = [os.path.join(workdir, "manage.py")]
+    runpy.run_path(sys.argv[0], run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
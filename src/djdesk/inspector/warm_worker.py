@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+from . import output_parsers
+from .command_runner import (
+    TICK_SECONDS,
+    CommandExecutionError,
+    CommandResult,
+    _resolve_workspace_path,
+    command_env,
+    kill_process_group,
+    resource_usage,
+    run_command,
+    validate_safe_command,
+)
+from .output_parsers import OutputParser
+
+logger = logging.getLogger(__name__)
+
+HELPER_PATH = Path(__file__).with_name("warm_helper.py")
+# Directories never worth watching for project changes.
+FINGERPRINT_SKIP_DIRS = {"node_modules", "__pycache__", "venv", "env", "site-packages"}
+FINGERPRINT_SUFFIXES = {".py", ".env", ".cfg", ".toml", ".ini"}
+
+
+class WarmWorkerError(CommandExecutionError):
+    """Raised when the warm helper cannot be started or stops responding."""
+
+
+def project_fingerprint(workdir: Path) -> tuple[int, int, int]:
+    """Return a cheap (file count, newest mtime, total size) signature of project sources."""
+    count = newest = total = 0
+    for root, dirs, files in os.walk(workdir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in FINGERPRINT_SKIP_DIRS]
+        for name in files:
+            if Path(name).suffix not in FINGERPRINT_SUFFIXES:
+                continue
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            count += 1
+            newest = max(newest, stat.st_mtime_ns)
+            total += stat.st_size
+    return count, newest, total
+
+
+class WarmWorker:
+    """A ``warm_helper.py`` process that keeps one workspace's Django project set up."""
+
+    def __init__(self, interpreter: str, workdir: Path) -> None:
+        self.interpreter = interpreter
+        self.workdir = workdir
+        self.fingerprint: tuple[int, int, int] | None = None
+        self.start_error: str | None = None
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self.process: subprocess.Popen[bytes] | None = None
+        self._buffer = bytearray()
+        self._eof = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        try:
+            self.process = subprocess.Popen(
+                [self.interpreter, str(HELPER_PATH)],
+                cwd=str(self.workdir),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=command_env(),
+                start_new_session=True,
+            )
+        except OSError as exc:
+            raise WarmWorkerError(f"Unable to start warm worker: {exc}") from exc
+        deadline = time.monotonic() + settings.INSPECTOR_WARM_WORKER_STARTUP_TIMEOUT
+        message = self._read_message(deadline)
+        if message is None or not message.get("ready"):
+            error = (message or {}).get("error") or "Warm worker did not become ready."
+            self.close()
+            raise WarmWorkerError(error.strip().splitlines()[-1])
+
+    def run(
+        self,
+        args: list[str],
+        *,
+        timeout: float,
+        log_callback: Callable[[str], None],
+        tick_callback: Callable[[], bool | None] | None = None,
+    ) -> tuple[int, int, bool, bool, dict[str, float | int] | None]:
+        """
+        Execute ``call_command(*args)``.
+
+        Returns (exit code, output lines, timed out, cancelled, resources). A timeout or a truthy
+        ``tick_callback`` result kills the helper; the next run starts a fresh one.
+        """
+        assert self.process is not None and self.process.stdin is not None
+        self.last_used = time.monotonic()
+        try:
+            self.process.stdin.write(json.dumps({"args": args}).encode() + b"\n")
+            self.process.stdin.flush()
+        except OSError as exc:
+            self.close()
+            raise WarmWorkerError("Warm worker exited unexpectedly.") from exc
+
+        output_lines = 0
+        deadline = time.monotonic() + timeout
+        while True:
+            wait_until = deadline
+            if tick_callback is not None:
+                wait_until = min(deadline, time.monotonic() + TICK_SECONDS)
+            message = self._read_message(wait_until)
+            if message is None and not self._eof and time.monotonic() < deadline:
+                assert tick_callback is not None
+                if tick_callback():
+                    self.close()
+                    return -9, output_lines, False, True, None
+                continue
+            if message is None:
+                timed_out = time.monotonic() >= deadline
+                self.close()
+                if timed_out:
+                    return -9, output_lines, True, False, None
+                raise WarmWorkerError("Warm worker exited unexpectedly.")
+            if "line" in message:
+                log_callback(message["line"])
+                output_lines += 1
+            elif "exit" in message:
+                self.last_used = time.monotonic()
+                raw_usage = message.get("rusage")
+                resources = resource_usage(raw_usage) if raw_usage else None
+                return int(message["exit"]), output_lines, False, False, resources
+
+    def close(self) -> None:
+        process, self.process = self.process, None
+        self._buffer.clear()
+        self._eof = False
+        if process is None:
+            return
+        if process.poll() is None:
+            kill_process_group(process.pid)
+            process.kill()
+        process.wait()
+        for stream in (process.stdin, process.stdout):
+            if stream is not None:
+                stream.close()
+
+    def _read_message(self, deadline: float) -> dict[str, Any] | None:
+        """Return the next protocol message, or ``None`` on EOF or when ``deadline`` passes."""
+        assert self.process is not None and self.process.stdout is not None
+        fd = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return None
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    self._eof = True
+                    return None
+                self._buffer.extend(chunk)
+        line, _, rest = bytes(self._buffer).partition(b"\n")
+        self._buffer = bytearray(rest)
+        try:
+            return json.loads(line)
+        except ValueError:
+            return {"line": line.decode("utf-8", errors="replace")}
+
+
+_workers: dict[Path, WarmWorker] = {}
+_registry_lock = threading.Lock()
+_reap_timer: threading.Timer | None = None
+
+
+def _evict_idle() -> None:
+    cutoff = time.monotonic() - settings.INSPECTOR_WARM_WORKER_IDLE_SECONDS
+    for workdir, worker in list(_workers.items()):
+        if worker.last_used < cutoff and not worker.lock.locked():
+            worker.close()
+            del _workers[workdir]
+
+
+def _schedule_reap() -> None:
+    """
+    Arm a timer that evicts the next worker to go idle; call with ``_registry_lock`` held.
+
+    Busy workers are skipped; their run re-arms the timer when it releases them.
+    """
+
+    global _reap_timer
+    if _reap_timer is not None:
+        _reap_timer.cancel()
+        _reap_timer = None
+    idle = [worker.last_used for worker in _workers.values() if not worker.lock.locked()]
+    if not idle:
+        return
+    due = min(idle) + settings.INSPECTOR_WARM_WORKER_IDLE_SECONDS
+    _reap_timer = threading.Timer(max(due - time.monotonic(), 0) + TICK_SECONDS, _reap)
+    _reap_timer.daemon = True
+    _reap_timer.start()
+
+
+def _reap() -> None:
+    with _registry_lock:
+        _evict_idle()
+        _schedule_reap()
+
+
+def _release(worker: WarmWorker) -> None:
+    worker.lock.release()
+    with _registry_lock:
+        _schedule_reap()
+
+
+def _acquire(interpreter: str, workdir: Path) -> WarmWorker | None:
+    """Return a locked, ready worker for ``workdir`` or ``None`` if it is busy."""
+    with _registry_lock:
+        _evict_idle()
+        worker = _workers.get(workdir)
+        if worker is None:
+            worker = _workers[workdir] = WarmWorker(interpreter, workdir)
+        if not worker.lock.acquire(blocking=False):
+            return None
+
+    fingerprint = project_fingerprint(workdir)
+    if worker.interpreter != interpreter or worker.fingerprint != fingerprint:
+        if worker.alive:
+            logger.info("Project files changed in %s; restarting warm worker.", workdir)
+        worker.close()
+        worker.interpreter, worker.fingerprint, worker.start_error = interpreter, fingerprint, None
+    if not worker.alive:
+        try:
+            if worker.start_error:
+                # Do not pay for a doomed startup on every run; retry once files change.
+                raise WarmWorkerError(worker.start_error)
+            try:
+                worker.start()
+            except WarmWorkerError as exc:
+                worker.start_error = str(exc)
+                raise
+        except WarmWorkerError:
+            worker.last_used = time.monotonic()
+            _release(worker)
+            raise
+    return worker
+
+
+def shutdown_warm_workers() -> None:
+    """Stop every warm worker owned by this process."""
+    global _reap_timer
+    with _registry_lock:
+        if _reap_timer is not None:
+            _reap_timer.cancel()
+            _reap_timer = None
+        for worker in _workers.values():
+            worker.close()
+        _workers.clear()
+
+
+atexit.register(shutdown_warm_workers)
+
+
+def run_warm_command(
+    *,
+    command: str,
+    workspace_path: str,
+    timeout: float,
+    log_callback: Callable[[str], None],
+    safe_prefix: str | None = None,
+    tick_callback: Callable[[], bool | None] | None = None,
+    parsers: Sequence[OutputParser] = (),
+) -> CommandResult:
+    """
+    Run ``command`` through the workspace's warm worker, falling back to ``run_command``.
+
+    Only ``python manage.py …`` commands qualify. A cold subprocess is used when the helper
+    cannot start, is busy with another run, or the command uses another entry point.
+    """
+
+    safe_prefix = safe_prefix or validate_safe_command(command)
+    cold_kwargs = {
+        "command": command,
+        "workspace_path": workspace_path,
+        "timeout": timeout,
+        "log_callback": log_callback,
+        "safe_prefix": safe_prefix,
+        "tick_callback": tick_callback,
+        "parsers": parsers,
+    }
+    try:
+        interpreter, script, *args = shlex.split(command)
+    except ValueError:
+        return run_command(**cold_kwargs)
+    if script != "manage.py" or not args:
+        return run_command(**cold_kwargs)
+
+    workdir = _resolve_workspace_path(workspace_path)
+    start = time.monotonic()
+    try:
+        worker = _acquire(interpreter, workdir)
+    except WarmWorkerError as exc:
+        log_callback(f"Warm worker unavailable ({exc}); starting a fresh process.")
+        return run_command(**cold_kwargs)
+    if worker is None:
+        return run_command(**cold_kwargs)
+
+    def _parse_and_log(line: str) -> None:
+        output_parsers.feed(parsers, line)
+        log_callback(line)
+
+    try:
+        exit_code, output_lines, timed_out, cancelled, resources = worker.run(
+            args, timeout=timeout, log_callback=_parse_and_log, tick_callback=tick_callback
+        )
+    finally:
+        _release(worker)
+    if timed_out:
+        log_callback(f"Timeout reached ({timeout}s). Terminated command.")
+    return CommandResult(
+        exit_code=exit_code,
+        duration=time.monotonic() - start,
+        output_lines=output_lines,
+        safe_prefix=safe_prefix,
+        timed_out=timed_out,
+        warm=True,
+        cancelled=cancelled,
+        resources=resources,
+        parsed=output_parsers.results(parsers),
+    )
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+
+# Suffixes of SQLite side files that are never the database itself.
+SIDE_FILE_SUFFIXES = ("-wal", "-shm", "-journal")
+PREFERRED_NAMES = ("db.sqlite3", "db.sqlite")
+
+
+def find_database(workdir: Path) -> Path | None:
+    """The workspace's local SQLite database: ``db.sqlite3`` or the only ``*.sqlite*`` file."""
+    for name in PREFERRED_NAMES:
+        if (workdir / name).is_file():
+            return workdir / name
+    candidates = [
+        path
+        for path in workdir.iterdir()
+        if path.is_file() and ".sqlite" in path.name and not path.name.endswith(SIDE_FILE_SUFFIXES)
+    ]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def workspace_database(workdir: Path, configured: str | None = None) -> Path | None:
+    """
+    ``configured`` (a scan's ``details.database``) relative to ``workdir`` if it exists;
+    without one, ``find_database(workdir)``.
+    """
+
+    if configured:
+        path = (workdir / configured).expanduser()
+        return path if path.is_file() else None
+    return find_database(workdir)
+
+
+def connect_readonly(path: Path) -> sqlite3.Connection:
+    """Open ``path`` read-only; the project's own processes may keep writing to it."""
+    return sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _quote(identifier: str) -> str:
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+
+class _RowChecksum:
+    """Order-independent sum of per-row CRC32s, so no ``ORDER BY`` is needed."""
+
+    def __init__(self) -> None:
+        self.total = 0
+
+    def step(self, *values: object) -> None:
+        self.total = (self.total + zlib.crc32(repr(values).encode())) & 0xFFFFFFFFFFFF
+
+    def finalize(self) -> int:
+        return self.total
+
+
+def table_names(connection: sqlite3.Connection) -> list[str]:
+    rows = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )
+    return [name for (name,) in rows]
+
+
+def table_fingerprint(connection: sqlite3.Connection, table: str) -> list[int | float | str]:
+    """``[row count, max primary key, checksum]`` of ``table``."""
+    columns = connection.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+    names = [_quote(column[1]) for column in columns]
+    pk = next((_quote(column[1]) for column in columns if column[5] == 1), "rowid")
+    connection.create_aggregate("djdesk_checksum", -1, _RowChecksum)
+    count, max_pk, checksum = connection.execute(
+        f"SELECT COUNT(*), MAX({pk}), djdesk_checksum({', '.join(names)}) FROM {_quote(table)}"
+    ).fetchone()
+    if isinstance(max_pk, bytes):
+        max_pk = max_pk.hex()
+    return [count, max_pk, checksum or 0]
+
+
+def tables_for_label(label: str, tables: Iterable[str]) -> list[str]:
+    """
+    Tables holding the rows ``dumpdata <label>`` exports, assuming Django's default names.
+
+    ``app.Model`` covers ``app_model`` and its auto-created many-to-many tables
+    (``app_model_<field>``); a bare app label covers every ``app_*`` table. Models with a
+    custom ``db_table`` match nothing and are therefore always exported.
+    """
+
+    app_label, _, model = label.lower().partition(".")
+    prefix = f"{app_label}_{model}" if model else app_label
+    return sorted(table for table in tables if table == prefix or table.startswith(f"{prefix}_"))
+
+
+def referenced_tables(
+    connection: sqlite3.Connection, tables: Iterable[str], existing: set[str]
+) -> list[str]:
+    """``tables`` plus every table in ``existing`` their foreign keys reach, transitively."""
+    seen: set[str] = set()
+    stack = list(tables)
+    while stack:
+        table = stack.pop()
+        if table in seen or table not in existing:
+            continue
+        seen.add(table)
+        rows = connection.execute(f"PRAGMA foreign_key_list({_quote(table)})")
+        stack.extend(row[2] for row in rows)
+    return sorted(seen)
+
+
+def label_fingerprint(connection: sqlite3.Connection, label: str, tables: list[str]) -> str | None:
+    """
+    Hash of the fingerprints of every table behind ``label``; ``None`` if none was found.
+
+    Exports use ``--natural-foreign``, which writes the natural keys of referenced rows into
+    the fixture, so the tables reachable through foreign keys are fingerprinted as well.
+    """
+
+    matched = tables_for_label(label, tables)
+    if not matched:
+        return None
+    covered = referenced_tables(connection, matched, set(tables))
+    prints = {table: table_fingerprint(connection, table) for table in covered}
+    return hashlib.sha256(json.dumps(prints, sort_keys=True).encode()).hexdigest()
+
+
+def applied_migrations(connection: sqlite3.Connection) -> set[tuple[str, str]]:
+    """``(app, name)`` rows of ``django_migrations``; empty when it was never migrated."""
+    if "django_migrations" not in table_names(connection):
+        return set()
+    return set(connection.execute("SELECT app, name FROM django_migrations"))
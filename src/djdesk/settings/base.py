@@ -19,6 +19,8 @@ ALLOWED_HOSTS: list[str] = []
 # Application definition
 
 INSTALLED_APPS = [
+    # daphne must come first so ``runserver`` serves the ASGI app (HTTP + WebSockets).
+    "daphne",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -26,7 +28,9 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.humanize",
+    "channels",
     "django_tasks",
+    "django_tasks.backends.database",
     "djdesk.inspector",
 ]
 
@@ -59,6 +63,15 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "djdesk.wsgi.application"
+ASGI_APPLICATION = "djdesk.asgi.application"
+
+# Single-node desktop deployments push WebSocket events through an in-process layer.
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "CONFIG": {"capacity": 1000},
+    },
+}
 
 
 # Database
@@ -68,6 +81,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # The web process and task workers write concurrently: WAL lets readers proceed
+        # during writes, and IMMEDIATE transactions queue writers instead of failing.
+        "OPTIONS": {
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
@@ -142,13 +162,143 @@ INSPECTOR_SAFE_COMMANDS = [
     "python manage.py inspectdb",
     "python manage.py dumpdata",
 ]
+# Streaming parsers per safe command prefix; results land in ``metadata.command.parsed``
+# and refresh the workspace insight cards.
+INSPECTOR_OUTPUT_PARSERS = {
+    "python manage.py showmigrations": "djdesk.inspector.output_parsers.ShowMigrationsParser",
+    "python manage.py check": "djdesk.inspector.output_parsers.CheckParser",
+    "python manage.py diffsettings": "djdesk.inspector.output_parsers.DiffSettingsParser",
+}
+# Deterministic commands whose output is reused while the project fingerprint is unchanged.
+INSPECTOR_CACHEABLE_COMMANDS = [
+    "python manage.py showmigrations",
+    "python manage.py check",
+    "python manage.py diffsettings",
+]
 INSPECTOR_TASK_TIMEOUT = int(os.environ.get("DJDESK_INSPECTOR_TASK_TIMEOUT", "60"))
+# Write-behind flushing of running tasks: pending log lines and progress are written after
+# INSPECTOR_LOG_FLUSH_DELAY seconds or once the buffer reaches a line/byte threshold. Chatty
+# commands back the delay off up to the MAX values; status transitions always write at once.
+INSPECTOR_LOG_FLUSH_DELAY = float(os.environ.get("DJDESK_LOG_FLUSH_DELAY", "0.25"))
+INSPECTOR_LOG_FLUSH_MAX_DELAY = float(os.environ.get("DJDESK_LOG_FLUSH_MAX_DELAY", "2.0"))
+INSPECTOR_LOG_FLUSH_BYTES = 64 * 1024
+INSPECTOR_LOG_FLUSH_MAX_LINES = 2000
+
+# Task runs are queued in the database and executed by ``manage.py run_inspector_workers``
+# (the Electron shell starts it automatically) so request threads return immediately.
+TASKS = {
+    "default": {
+        "BACKEND": "django_tasks.backends.database.DatabaseBackend",
+    },
+}
+INSPECTOR_TASK_WORKERS = int(os.environ.get("DJDESK_TASK_WORKERS", "2"))
+
+# Scheduler caps checked when a worker picks up a run; blocked runs are re-queued after
+# INSPECTOR_SCHEDULER_RETRY_SECONDS, doubled per deferral up to
+# INSPECTOR_SCHEDULER_RETRY_MAX_SECONDS. Preset categories map to queue priorities, and negative
+# priorities (bulk exports) never take the slots reserved for interactive diagnostics.
+INSPECTOR_MAX_CONCURRENT_RUNS = int(
+    os.environ.get("DJDESK_MAX_CONCURRENT_RUNS", str(INSPECTOR_TASK_WORKERS))
+)
+INSPECTOR_MAX_RUNS_PER_WORKSPACE = int(os.environ.get("DJDESK_MAX_RUNS_PER_WORKSPACE", "2"))
+INSPECTOR_INTERACTIVE_RESERVED_SLOTS = 1
+INSPECTOR_SCHEDULER_RETRY_SECONDS = 1.0
+INSPECTOR_SCHEDULER_RETRY_MAX_SECONDS = 30.0
+INSPECTOR_TASK_PRIORITIES = {
+    "diagnostics": 50,
+    "configuration": 40,
+    "schema": 30,
+    "automation": -50,
+}
+
+# Task pipelines: DAGs of presets run as child task runs. A step starts once every step in
+# ``after`` succeeded; ``for_each`` fans it out over items derived from those steps' output.
+INSPECTOR_TASK_PIPELINES = {
+    "predeploy": {
+        "label": "Pre-deploy audit",
+        "steps": [
+            {"key": "check", "preset": "check"},
+            {"key": "diffsettings", "preset": "diffsettings"},
+            {"key": "showmigrations", "preset": "showmigrations"},
+            {
+                "key": "sqlmigrate",
+                "preset": "sqlmigrate",
+                "after": ["showmigrations"],
+                "for_each": "pending_migrations",
+            },
+        ],
+    },
+}
+
+# Opt-in warm workers keep one helper per workspace with the project's Django already set up
+# and run ``manage.py`` commands through ``call_command``. Helpers restart when project files
+# change and exit after sitting idle.
+INSPECTOR_WARM_WORKERS = _env_flag("DJDESK_WARM_WORKERS", False)
+INSPECTOR_WARM_WORKER_IDLE_SECONDS = float(os.environ.get("DJDESK_WARM_WORKER_IDLE", "300"))
+INSPECTOR_WARM_WORKER_STARTUP_TIMEOUT = float(
+    os.environ.get("DJDESK_WARM_WORKER_STARTUP_TIMEOUT", "30")
+)
+
+# WebSocket status pushes: coalescing window after a change, and the safety-net re-check
+# that catches writes from processes outside the in-process channel layer.
+INSPECTOR_STATUS_PUSH_DEBOUNCE = float(os.environ.get("DJDESK_STATUS_PUSH_DEBOUNCE", "0.1"))
+INSPECTOR_STATUS_PUSH_FALLBACK_INTERVAL = float(
+    os.environ.get("DJDESK_STATUS_PUSH_FALLBACK_INTERVAL", "5")
+)
+# Task runs execute in db_worker processes whose events never reach the web process's
+# channel layer; task stream sockets poll the database for new log chunks this often.
+INSPECTOR_TASK_STREAM_POLL_INTERVAL = float(
+    os.environ.get("DJDESK_TASK_STREAM_POLL_INTERVAL", "1")
+)
 
 INSPECTOR_DATA_LAB_ROOT = Path(
     os.environ.get("DJDESK_DATA_LAB_ROOT", BASE_DIR / "var" / "data_lab")
 ).expanduser()
 INSPECTOR_DATA_LAB_LIVE = _env_flag("DJDESK_FLAG_DATA_LAB_LIVE", False)
 
+# Bounded task output: the log keeps the first/last N lines of a command; the full stream is
+# spilled to a gzip file under INSPECTOR_TASK_OUTPUT_ROOT (next to the Data Lab root).
+INSPECTOR_TASK_OUTPUT_BOUNDED = _env_flag("DJDESK_TASK_OUTPUT_BOUNDED", True)
+INSPECTOR_TASK_OUTPUT_HEAD_LINES = int(os.environ.get("DJDESK_TASK_OUTPUT_HEAD_LINES", "500"))
+INSPECTOR_TASK_OUTPUT_TAIL_LINES = int(os.environ.get("DJDESK_TASK_OUTPUT_TAIL_LINES", "500"))
+# While a run is past its head lines, the log shows a "lines buffered" marker this often.
+INSPECTOR_TASK_OUTPUT_PROGRESS_SECONDS = float(
+    os.environ.get("DJDESK_TASK_OUTPUT_PROGRESS_SECONDS", "5")
+)
+INSPECTOR_TASK_OUTPUT_ROOT = Path(
+    os.environ.get("DJDESK_TASK_OUTPUT_ROOT", INSPECTOR_DATA_LAB_ROOT.parent / "task_output")
+).expanduser()
+# FIXTURES scans run one ``dumpdata`` per model in parallel and gzip each stream to disk.
+INSPECTOR_FIXTURE_EXPORT_ROOT = Path(
+    os.environ.get("DJDESK_FIXTURE_EXPORT_ROOT", INSPECTOR_DATA_LAB_ROOT.parent / "fixtures")
+).expanduser()
+INSPECTOR_FIXTURE_EXPORT_WORKERS = int(
+    os.environ.get("DJDESK_FIXTURE_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Skip models whose tables (row count, max pk, checksum) match the previous export.
+INSPECTOR_FIXTURE_EXPORT_INCREMENTAL = _env_flag("DJDESK_FIXTURE_EXPORT_INCREMENTAL", True)
+# SCHEMA scans read models from source with ``ast`` (files parsed in a process pool) and only
+# import the project when that is incomplete. MIGRATIONS scans parse migrations on the same pool.
+INSPECTOR_SCHEMA_STATIC = _env_flag("DJDESK_SCHEMA_STATIC", True)
+INSPECTOR_SCHEMA_STATIC_WORKERS = int(
+    os.environ.get("DJDESK_SCHEMA_STATIC_WORKERS", str(os.cpu_count() or 1))
+)
+# Apps whose own migration chain is at least this long are listed as squash candidates.
+INSPECTOR_MIGRATION_SQUASH_THRESHOLD = int(
+    os.environ.get("DJDESK_MIGRATION_SQUASH_THRESHOLD", "50")
+)
+# SQL plans of pending migrations: one ``sqlmigrate`` per migration, cached by file content.
+INSPECTOR_SQL_PLAN_ROOT = Path(
+    os.environ.get("DJDESK_SQL_PLAN_ROOT", INSPECTOR_DATA_LAB_ROOT.parent / "sql_plans")
+).expanduser()
+INSPECTOR_SQL_PLAN_WORKERS = int(
+    os.environ.get("DJDESK_SQL_PLAN_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Warm the cache in the background after every migrations scan that finds pending migrations.
+INSPECTOR_SQL_PLAN_PRECOMPUTE = _env_flag("DJDESK_SQL_PLAN_PRECOMPUTE", True)
+# Record CPU time, peak RSS, block I/O, and context switches of every task command (POSIX only).
+INSPECTOR_TASK_RESOURCE_ACCOUNTING = _env_flag("DJDESK_TASK_RESOURCE_ACCOUNTING", True)
+
 INSPECTOR_DOCS_BUNDLE_ROOT = Path(
     os.environ.get("DJDESK_DOCS_BUNDLE_ROOT", BASE_DIR / "var" / "docs_bundle")
 ).expanduser()
@@ -42,3 +42,6 @@ DATABASES["default"]["USER"] = os.environ.get("DJANGO_DB_USER", "")
 DATABASES["default"]["PASSWORD"] = os.environ.get("DJANGO_DB_PASSWORD", "")
 DATABASES["default"]["HOST"] = os.environ.get("DJANGO_DB_HOST", "")
 DATABASES["default"]["PORT"] = os.environ.get("DJANGO_DB_PORT", "")
+if "sqlite3" not in DATABASES["default"]["ENGINE"]:
+    # The shared OPTIONS only make sense for SQLite (WAL pragmas, transaction mode).
+    DATABASES["default"].pop("OPTIONS", None)
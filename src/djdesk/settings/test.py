@@ -1,5 +1,8 @@
 """Settings optimized for unit tests."""
 
+import tempfile
+from pathlib import Path
+
 from .base import *
 
 DEBUG = False
@@ -18,3 +21,15 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+
+# Run task runs inline so tests can assert on their results without a worker.
+TASKS = {
+    "default": {
+        "BACKEND": "django_tasks.backends.immediate.ImmediateBackend",
+    },
+}
+
+# Keep spilled task output, fixture exports, and SQL plans out of the source tree.
+INSPECTOR_TASK_OUTPUT_ROOT = Path(tempfile.gettempdir()) / "djdesk-test-task-output"
+INSPECTOR_FIXTURE_EXPORT_ROOT = Path(tempfile.gettempdir()) / "djdesk-test-fixtures"
+INSPECTOR_SQL_PLAN_ROOT = Path(tempfile.gettempdir()) / "djdesk-test-sql-plans"
@@ -1,20 +1,58 @@
 from __future__ import annotations
 
+import gzip
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from io import StringIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest import mock
+from unittest import mock, skipUnless
 
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
 from django import forms
 from django.core.exceptions import ValidationError
-from django.test import Client, RequestFactory, TestCase, override_settings
+from django.core.management import CommandError, call_command
+from django.test import (
+    Client,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
 from django.urls import reverse
+from django.utils import timezone
 
 from djdesk.inspector import forms as inspector_forms
-from djdesk.inspector.command_runner import CommandExecutionError, CommandResult
+from djdesk.inspector import realtime, static_schema
+from djdesk.inspector.command_runner import (
+    CommandExecutionError,
+    CommandResult,
+    CommandSpec,
+    run_command,
+    run_commands,
+)
 from djdesk.inspector.forms import TaskRunForm, WorkspaceWizardForm
+from djdesk.inspector.migration_diff import resolve_graph
 from djdesk.inspector.models import ScanJob, TaskPreset, Workspace, WorkspaceTaskRun
-from djdesk.inspector.tasks import execute_workspace_task
+from djdesk.inspector.output_parsers import (
+    CheckParser,
+    DiffSettingsParser,
+    OutputParser,
+    ShowMigrationsParser,
+    parsed_insights,
+    trusted_results,
+)
+from djdesk.inspector.output_retention import HeadTailLog
+from djdesk.inspector.pipelines import PipelineError, pipeline_definition
+from djdesk.inspector.routing import websocket_urlpatterns
+from djdesk.inspector.scheduler import try_admit
+from djdesk.inspector.tasks import enqueue_task_run, execute_workspace_task
 from djdesk.inspector.views import DashboardView
+from djdesk.inspector.warm_worker import _workers, run_warm_command, shutdown_warm_workers
 
 
 class WorkspaceModelTests(TestCase):
@@ -81,6 +119,67 @@ class WorkspaceTaskRunLogTests(TestCase):
         self.assertIn("Line 0", run.log)
 
 
+    def test_flushes_append_chunks_without_rewriting(self) -> None:
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        run.append_log("First batch")
+        run.flush_log_buffer()
+        run.append_log("Second batch")
+        run.flush_log_buffer()
+
+        chunks = list(run.log_chunks.values_list("sequence", "line_count"))
+        self.assertEqual(chunks, [(1, 1), (2, 1)])
+        self.assertIn("First batch", run.log)
+        self.assertIn("Second batch", run.log)
+
+    def test_coalesces_staged_fields_and_log_lines(self) -> None:
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        run.stage(progress=40)
+        for index in range(run.LOG_BATCH_SIZE):
+            run.append_log(f"Line {index}")
+
+        stored = WorkspaceTaskRun.objects.get(pk=run.pk)
+        self.assertEqual((stored.progress, stored.log_line_count), (40, run.LOG_BATCH_SIZE))
+
+        # A second full batch right away means a chatty command: the line trigger backs off.
+        for index in range(run.LOG_BATCH_SIZE):
+            run.append_log(f"More {index}")
+        self.assertEqual(run.log_policy.max_lines, 2 * run.LOG_BATCH_SIZE)
+
+        # Slow output is written once the oldest pending line exceeds the delay.
+        run.stage(progress=60)
+        run.append_log("Slow line")
+        stored.refresh_from_db()
+        self.assertEqual(stored.progress, 40)
+        run.log_policy.pending_since -= 10
+        run.flush_if_due()
+        stored.refresh_from_db()
+        self.assertEqual((stored.progress, stored.log_line_count), (60, 2 * run.LOG_BATCH_SIZE + 1))
+
+        run.mark_finished(success=True)
+        stats = WorkspaceTaskRun.objects.get(pk=run.pk).metadata["log_flush"]
+        self.assertEqual((stats["by_lines"], stats["by_time"], stats["backoffs"]), (2, 1, 1))
+        self.assertEqual(stats["lines"], 2 * run.LOG_BATCH_SIZE + 1)
+
+    def test_detail_api_supports_ranged_reads(self) -> None:
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        run.append_log("Early line")
+        run.flush_log_buffer()
+        url = reverse("inspector:task-run-detail", args=[run.pk])
+
+        first = self.client.get(url).json()
+        self.assertIn("Early line", first["log"])
+        self.assertEqual(first["last_seq"], 1)
+
+        run.append_log("Late line")
+        run.flush_log_buffer()
+        tail = self.client.get(url, {"after_seq": first["last_seq"]}).json()
+        self.assertNotIn("Early line", tail["log"])
+        self.assertIn("Late line", tail["log"])
+        self.assertEqual(tail["last_seq"], 2)
+
+        self.assertEqual(self.client.get(url, {"after_seq": "nope"}).status_code, 400)
+
+
 class WorkspaceWizardFormTests(TestCase):
     def test_creates_workspace_and_seeds_scans(self) -> None:
         with TemporaryDirectory() as temp:
@@ -191,8 +290,8 @@ class TaskRunFormTests(TestCase):
             }
         )
         self.assertTrue(form.is_valid())
-        with mock.patch("djdesk.inspector.forms.execute_workspace_task") as task_mock:
-            task_mock.enqueue.side_effect = RuntimeError("Queue offline")
+        with mock.patch("djdesk.inspector.forms.enqueue_task_run") as enqueue_mock:
+            enqueue_mock.side_effect = RuntimeError("Queue offline")
             with self.assertRaises(forms.ValidationError):
                 form.save()
 
@@ -244,6 +343,152 @@ class InspectorAPIViewTests(TestCase):
         self.assertEqual(data["workspace"], self.workspace.slug)
         self.assertTrue(data["scans"])
 
+    def test_workspace_status_summarizes_task_logs(self) -> None:
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        for index in range(run.LOG_TAIL_LINES + 2):
+            run.append_log(f"Line {index}")
+        run.flush_log_buffer()
+
+        response = Client().get(reverse("inspector:workspace-status", args=[self.workspace.slug]))
+        task = response.json()["tasks"][0]
+        self.assertNotIn("log", task)
+        self.assertEqual(task["log_line_count"], run.LOG_TAIL_LINES + 2)
+        self.assertEqual(len(task["log_tail"]), run.LOG_TAIL_LINES)
+        self.assertIn(f"Line {run.LOG_TAIL_LINES + 1}", task["log_tail"][-1])
+
+    def test_workspace_status_returns_304_when_unchanged(self) -> None:
+        client = Client()
+        url = reverse("inspector:workspace-status", args=[self.workspace.slug])
+        first = client.get(url)
+        etag = first["ETag"]
+        self.assertTrue(etag)
+
+        unchanged = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertFalse(unchanged.content)
+
+        WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_workspace_metadata_changes_bump_status_version(self) -> None:
+        self.workspace.refresh_from_db()
+        version = self.workspace.status_version
+        self.workspace.metadata["insights"] = []
+        self.workspace.save(update_fields=["metadata"])
+        self.assertEqual(self.workspace.status_version, version + 1)
+
+    def test_workspace_status_delta_only_returns_changes(self) -> None:
+        client = Client()
+        url = reverse("inspector:workspace-status", args=[self.workspace.slug])
+        cursor = client.get(url).json()["cursor"]
+
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        delta = client.get(url, {"since": cursor}).json()
+
+        self.assertFalse(delta["full"])
+        self.assertEqual(delta["scans"], [])
+        self.assertEqual([task["id"] for task in delta["tasks"]], [run.pk])
+        self.assertNotIn("activity", delta)
+        self.assertGreater(delta["cursor"], cursor)
+
+        self.workspace.refresh_from_db()
+        self.workspace.metadata["recent_activity"] = [{"message": "Synced"}]
+        self.workspace.save(update_fields=["metadata"])
+        delta = client.get(url, {"since": delta["cursor"]}).json()
+        self.assertEqual(delta["tasks"], [])
+        self.assertEqual(delta["activity"], [{"message": "Synced"}])
+
+    def test_workspace_status_delta_falls_back_after_deletions(self) -> None:
+        client = Client()
+        url = reverse("inspector:workspace-status", args=[self.workspace.slug])
+        cursor = client.get(url).json()["cursor"]
+
+        self.workspace.scans.all().delete()
+        payload = client.get(url, {"since": cursor}).json()
+        self.assertTrue(payload["full"])
+        self.assertEqual(payload["scans"], [])
+        self.assertTrue(client.get(url, {"since": "bogus"}).json()["full"])
+
+    def test_full_save_of_stale_workspace_keeps_deletion_reset(self) -> None:
+        client = Client()
+        url = reverse("inspector:workspace-status", args=[self.workspace.slug])
+        cursor = client.get(url).json()["cursor"]
+        stale = Workspace.objects.get(pk=self.workspace.pk)
+
+        self.workspace.scans.all().delete()
+        stale.description = "Edited elsewhere"
+        stale.save()
+        payload = client.get(url, {"since": cursor}).json()
+        self.assertTrue(payload["full"])
+        self.assertEqual(payload["scans"], [])
+
+    def test_task_run_cancel_endpoint(self) -> None:
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        url = reverse("inspector:task-run-cancel", args=[run.pk])
+
+        response = Client().post(url)
+        run.refresh_from_db()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(run.status, WorkspaceTaskRun.Status.CANCELLED)
+        self.assertIn("Cancelled before a worker picked it up.", run.log)
+        # A worker dequeuing the cancelled run leaves it alone.
+        self.assertEqual(execute_workspace_task.call(run.pk), {"skipped": "cancelled"})
+
+        response = Client().post(url)
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("status", response.json()["errors"])
+
+    def test_task_resource_usage_endpoint(self) -> None:
+        other = Workspace.objects.create(name="Other", project_path="/tmp/other")
+        dump, _ = TaskPreset.objects.get_or_create(
+            key="dumpdata", defaults={"label": "Export", "command": "python manage.py dumpdata"}
+        )
+
+        def record(workspace: Workspace, preset: TaskPreset, cpu: float, rss: int) -> None:
+            resources = {
+                "user_cpu_seconds": cpu,
+                "system_cpu_seconds": 0.5,
+                "max_rss_kb": rss,
+                "block_input_ops": 10,
+                "block_output_ops": 5,
+                "voluntary_context_switches": 3,
+                "involuntary_context_switches": 1,
+            }
+            WorkspaceTaskRun.objects.create(
+                workspace=workspace,
+                preset=preset,
+                status=WorkspaceTaskRun.Status.SUCCEEDED,
+                metadata={"command": {"duration_seconds": 2.0, "resources": resources}},
+            )
+
+        record(self.workspace, self.preset, 0.5, 50_000)
+        record(self.workspace, dump, 3.5, 400_000)
+        record(other, dump, 1.5, 200_000)
+        WorkspaceTaskRun.objects.create(  # cache hit: nothing measured
+            workspace=self.workspace,
+            preset=dump,
+            metadata={"command": {"duration_seconds": 0.0, "resources": None}},
+        )
+
+        url = reverse("inspector:task-resource-usage")
+        presets = Client().get(url).json()["presets"]
+        self.assertEqual([item["preset"] for item in presets], ["dumpdata", "check"])
+        dump_usage = presets[0]
+        self.assertEqual(dump_usage["runs"], 2)
+        self.assertEqual(dump_usage["cpu_seconds"], {"avg": 3.0, "max": 4.0, "total": 6.0})
+        self.assertEqual(dump_usage["max_rss_kb"], {"avg": 300_000, "max": 400_000})
+        self.assertEqual(dump_usage["block_io_ops"], 30)
+        self.assertEqual(dump_usage["cpu_per_wall"], 1.5)
+        self.assertEqual(
+            [row["workspace"] for row in dump_usage["workspaces"]],
+            sorted([self.workspace.slug, other.slug]),
+        )
+
+        scoped = Client().get(url, {"workspace": other.slug}).json()["presets"]
+        self.assertEqual([item["runs"] for item in scoped], [1])
+
     def test_task_run_create_endpoint(self) -> None:
         client = Client()
         payload = {
@@ -436,6 +681,35 @@ class TaskExecutionIntegrationTests(TestCase):
         self.assertEqual(command_meta["exit_code"], 0)
         self.assertFalse(command_meta["timed_out"])
         self.assertTrue(run.log)
+        self.assertTrue(command_meta["parsed"]["check"]["passed"])
+        run.workspace.refresh_from_db()
+        self.assertEqual(run.workspace.insights[0]["title"], "System check issues")
+
+    def test_replays_cached_output_while_project_is_unchanged(self) -> None:
+        first = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        execute_workspace_task.call(first.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.metadata["command"]["cache"], "miss")
+
+        second = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.preset)
+        execute_workspace_task.call(second.pk)
+        second.refresh_from_db()
+
+        meta = second.metadata["command"]
+        self.assertEqual(second.status, WorkspaceTaskRun.Status.SUCCEEDED)
+        self.assertEqual(meta["cache"], "hit")
+        self.assertEqual(meta["cached_from"], first.pk)
+        self.assertIn("replaying cached output", second.log)
+        self.assertIn("System check identified no issues", second.log)
+
+        forced = WorkspaceTaskRun.objects.create(
+            workspace=self.workspace, preset=self.preset, metadata={"force_refresh": True}
+        )
+        with mock.patch("djdesk.inspector.tasks.run_command", wraps=run_command) as runner:
+            execute_workspace_task.call(forced.pk)
+        forced.refresh_from_db()
+        runner.assert_called_once()
+        self.assertEqual(forced.metadata["command"]["cache"], "refresh")
 
     def test_rejects_unsafe_commands(self) -> None:
         TaskPreset.objects.bulk_create(
@@ -502,3 +776,1162 @@ class TaskExecutionIntegrationTests(TestCase):
 
         self.assertEqual(run.status, WorkspaceTaskRun.Status.FAILED)
         self.assertIn("boom", run.log)
+
+
+class CommandRunnerTests(TestCase):
+    MANAGE_PY = (
+        "import sys, time\n"
+        "for index in range(3):\n"
+        "    print(f'{sys.argv[1]} line {index}')\n"
+        "if sys.argv[1] == 'check':\n"
+        "    if 'spawn' in sys.argv:\n"
+        "        import subprocess\n"
+        "        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+        "        print(f'child {child.pid}', flush=True)\n"
+        "    time.sleep(30)\n"
+    )
+
+    def setUp(self) -> None:
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        (Path(self.tmpdir.name) / "manage.py").write_text(self.MANAGE_PY)
+
+    def test_streams_lines_and_kills_on_timeout(self) -> None:
+        lines: list[str] = []
+        tick = mock.Mock(return_value=None)
+
+        result = run_command(
+            command="python manage.py check",
+            workspace_path=self.tmpdir.name,
+            timeout=1,
+            log_callback=lines.append,
+            tick_callback=tick,
+        )
+
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.output_lines, 3)
+        self.assertEqual(lines[:3], ["check line 0", "check line 1", "check line 2"])
+        self.assertIn("Timeout reached", lines[-1])
+        self.assertLess(result.duration, 10)
+        self.assertTrue(tick.called)
+
+    @skipUnless(Path("/proc").is_dir(), "needs procfs")
+    def test_cancel_kills_the_process_group(self) -> None:
+        lines: list[str] = []
+
+        result = run_command(
+            command="python manage.py check --tag spawn",
+            workspace_path=self.tmpdir.name,
+            timeout=20,
+            log_callback=lines.append,
+            tick_callback=lambda: any(line.startswith("child ") for line in lines),
+        )
+
+        self.assertTrue(result.cancelled)
+        self.assertFalse(result.timed_out)
+        self.assertLess(result.duration, 10)
+        child = Path("/proc") / lines[-1].split()[1] / "status"
+        # The grandchild is gone (or a zombie awaiting its reaper), not still sleeping.
+        # SIGKILL is delivered asynchronously, so give the kernel a moment to act on it.
+        deadline = time.monotonic() + 2
+        while True:
+            try:
+                state = child.read_text()
+            except FileNotFoundError:
+                break
+            if "State:\tZ" in state:
+                break
+            self.assertLess(time.monotonic(), deadline, state.splitlines()[2])
+            time.sleep(0.01)
+
+    def test_records_resource_usage(self) -> None:
+        result = run_command(
+            command="python manage.py showmigrations",
+            workspace_path=self.tmpdir.name,
+            timeout=10,
+            log_callback=mock.Mock(),
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertGreater(result.resources["max_rss_kb"], 0)
+        self.assertGreaterEqual(result.resources["user_cpu_seconds"], 0)
+        self.assertIn("involuntary_context_switches", result.resources)
+
+        with override_settings(INSPECTOR_TASK_RESOURCE_ACCOUNTING=False):
+            result = run_command(
+                command="python manage.py showmigrations",
+                workspace_path=self.tmpdir.name,
+                timeout=10,
+                log_callback=mock.Mock(),
+            )
+        self.assertIsNone(result.resources)
+
+    def test_runs_commands_concurrently(self) -> None:
+        logs: dict[str, list[str]] = {"showmigrations": [], "diffsettings": []}
+        specs = [
+            CommandSpec(
+                command=f"python manage.py {name}",
+                workspace_path=self.tmpdir.name,
+                timeout=10,
+                log_callback=lines.append,
+            )
+            for name, lines in logs.items()
+        ]
+        specs.append(
+            CommandSpec(
+                command="python manage.py check",
+                workspace_path=str(Path(self.tmpdir.name) / "missing"),
+                timeout=10,
+                log_callback=mock.Mock(),
+            )
+        )
+
+        results = run_commands(specs)
+
+        self.assertEqual([result.exit_code for result in results[:2]], [0, 0])
+        self.assertIsInstance(results[2], CommandExecutionError)
+        self.assertEqual(logs["diffsettings"][-1], "diffsettings line 2")
+        self.assertEqual(len(logs["showmigrations"]), 3)
+
+
+class HeadTailLogTests(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.spill_path = Path(self.tmpdir.name) / "out" / "run.log.gz"
+
+    def test_keeps_head_and_tail_and_spills_everything(self) -> None:
+        forwarded: list[str] = []
+        output = HeadTailLog(forwarded.append, head=2, tail=2, spill_path=self.spill_path)
+        for index in range(10):
+            output(f"line {index}")
+        summary = output.close()
+
+        self.assertEqual(forwarded[:2], ["line 0", "line 1"])
+        self.assertIn("6 lines (42 bytes) omitted", forwarded[2])
+        self.assertEqual(forwarded[3:], ["line 8", "line 9"])
+        self.assertTrue(summary["truncated"])
+        self.assertEqual((summary["total_lines"], summary["omitted_lines"]), (10, 6))
+        with gzip.open(self.spill_path, "rt") as spilled:
+            self.assertEqual(len(spilled.read().splitlines()), 10)
+
+    def test_tick_reports_buffered_lines_while_running(self) -> None:
+        forwarded: list[str] = []
+        output = HeadTailLog(
+            forwarded.append, head=2, tail=2, spill_path=self.spill_path, progress_interval=0
+        )
+        output("line 0")
+        output.tick()
+        self.assertEqual(forwarded, ["line 0"])
+        for index in range(1, 6):
+            output(f"line {index}")
+        output.tick()
+        output.tick()
+
+        self.assertEqual(len(forwarded), 3)
+        self.assertEqual(forwarded[2], "… 4 lines buffered after the first 2; latest: line 5")
+        output.close()
+
+    def test_short_output_is_forwarded_whole_without_spill(self) -> None:
+        forwarded: list[str] = []
+        output = HeadTailLog(forwarded.append, head=2, tail=2, spill_path=self.spill_path)
+        for index in range(4):
+            output(f"line {index}")
+        summary = output.close()
+
+        self.assertEqual(forwarded, [f"line {index}" for index in range(4)])
+        self.assertFalse(summary["truncated"])
+        self.assertFalse(self.spill_path.exists())
+
+
+class WarmWorkerTests(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(shutdown_warm_workers)
+        root = Path(self.tmpdir.name)
+        (root / "manage.py").write_text(
+            "import os, sys\n"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'warmproj')\n"
+            "from django.core.management import execute_from_command_line\n"
+            "execute_from_command_line(sys.argv)\n"
+        )
+        self.settings_file = root / "warmproj.py"
+        self.settings_file.write_text("SECRET_KEY = 'warm'\nINSTALLED_APPS = []\n")
+
+    def _run(self, command: str) -> tuple[CommandResult, list[str]]:
+        lines: list[str] = []
+        result = run_warm_command(
+            command=command,
+            workspace_path=self.tmpdir.name,
+            timeout=30,
+            log_callback=lines.append,
+        )
+        return result, lines
+
+    def _helper_pid(self) -> int:
+        (worker,) = _workers.values()
+        assert worker.process is not None
+        return worker.process.pid
+
+    def test_reuses_helper_until_project_files_change(self) -> None:
+        result, lines = self._run("python manage.py check")
+        self.assertTrue(result.warm)
+        self.assertEqual(result.exit_code, 0)
+        self.assertGreater(result.resources["max_rss_kb"], 0)
+        self.assertIn("System check identified no issues", lines[0])
+        pid = self._helper_pid()
+
+        result, lines = self._run("python manage.py diffsettings")
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("SECRET_KEY = 'warm'", "\n".join(lines))
+        self.assertEqual(self._helper_pid(), pid)
+
+        self.settings_file.write_text("SECRET_KEY = 'changed'\nINSTALLED_APPS = []\n")
+        result, lines = self._run("python manage.py diffsettings")
+        self.assertIn("SECRET_KEY = 'changed'", "\n".join(lines))
+        self.assertNotEqual(self._helper_pid(), pid)
+
+    def test_reports_command_errors_and_evicts_idle_helpers(self) -> None:
+        result, lines = self._run("python manage.py check --tag missing")
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('no system check with the "missing" tag', lines[-1])
+
+        (worker,) = _workers.values()
+        with override_settings(INSPECTOR_WARM_WORKER_IDLE_SECONDS=0):
+            run_warm_command(
+                command="python manage.py check",
+                workspace_path=str(Path(self.tmpdir.name)),
+                timeout=30,
+                log_callback=mock.Mock(),
+            )
+        self.assertIsNone(worker.process)
+
+    @override_settings(INSPECTOR_WARM_WORKER_IDLE_SECONDS=0.2)
+    def test_reaps_idle_helpers_without_further_runs(self) -> None:
+        self._run("python manage.py check")
+        (worker,) = _workers.values()
+        process = worker.process
+
+        deadline = time.monotonic() + 5
+        while _workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(_workers, {})
+        self.assertIsNone(worker.process)
+        self.assertIsNotNone(process.poll())
+
+
+class TaskSchedulerTests(TestCase):
+    def setUp(self) -> None:
+        self.workspace = Workspace.objects.create(name="Queue", project_path="/tmp/queue")
+        self.check_preset = TaskPreset.objects.get(key="check")
+        self.export_preset = TaskPreset.objects.get(key="dumpdata")
+
+    def _running(self, preset: TaskPreset, workspace: Workspace | None = None) -> None:
+        WorkspaceTaskRun.objects.create(
+            workspace=workspace or self.workspace,
+            preset=preset,
+            status=WorkspaceTaskRun.Status.RUNNING,
+            started_at=timezone.now(),
+        )
+
+    def test_enqueue_records_priority_and_queue_depth(self) -> None:
+        WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.export_preset)
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.check_preset)
+
+        enqueue_task_run(run)
+        run.refresh_from_db()
+
+        scheduler = run.metadata["scheduler"]
+        self.assertEqual(scheduler["priority"], 50)
+        self.assertEqual(scheduler["queue_depth"], 1)
+        self.assertIn("wait_seconds", scheduler)
+
+    @override_settings(INSPECTOR_MAX_CONCURRENT_RUNS=3, INSPECTOR_MAX_RUNS_PER_WORKSPACE=1)
+    def test_caps_and_reserved_interactive_slot(self) -> None:
+        other = Workspace.objects.create(name="Other", project_path="/tmp/other")
+        self._running(self.export_preset, other)
+        third = Workspace.objects.create(name="Third", project_path="/tmp/third")
+        self._running(self.export_preset, third)
+
+        export = WorkspaceTaskRun.objects.create(
+            workspace=self.workspace, preset=self.export_preset
+        )
+        self.assertFalse(try_admit(export))
+        self.assertEqual(export.metadata["scheduler"]["blocked_by"], "bulk")
+        self.assertEqual(export.status, WorkspaceTaskRun.Status.REQUESTED)
+
+        check = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.check_preset)
+        self.assertTrue(try_admit(check))
+        self.assertEqual(check.status, WorkspaceTaskRun.Status.RUNNING)
+
+        second = WorkspaceTaskRun.objects.create(workspace=other, preset=self.check_preset)
+        self.assertFalse(try_admit(second))
+        self.assertEqual(second.metadata["scheduler"]["blocked_by"], "global")
+
+    @override_settings(
+        INSPECTOR_MAX_RUNS_PER_WORKSPACE=1,
+        TASKS={"default": {"BACKEND": "django_tasks.backends.database.DatabaseBackend"}},
+    )
+    def test_blocked_runs_are_requeued(self) -> None:
+        self._running(self.check_preset)
+        run = WorkspaceTaskRun.objects.create(workspace=self.workspace, preset=self.check_preset)
+
+        enqueue_task_run(run)
+        self.workspace.refresh_from_db()
+        version = self.workspace.status_version
+        payloads = [execute_workspace_task.call(run.pk) for _ in range(3)]
+        run.refresh_from_db()
+
+        self.assertTrue(payloads[0]["deferred"])
+        self.assertEqual([p["retry_seconds"] for p in payloads], [1.0, 2.0, 4.0])
+        self.assertEqual(run.status, WorkspaceTaskRun.Status.REQUESTED)
+        self.assertEqual(run.metadata["scheduler"]["deferrals"], 3)
+        self.assertEqual(run.metadata["scheduler"]["blocked_by"], "workspace")
+        self.assertTrue(run.result_id)
+        # Deferrals are bookkeeping only: the dashboard's ETag stays put.
+        self.workspace.refresh_from_db()
+        self.assertEqual(self.workspace.status_version, version)
+
+
+class RealtimeConsumerTests(TransactionTestCase):
+    application = URLRouter(websocket_urlpatterns)
+
+    def setUp(self) -> None:
+        self.workspace = Workspace.objects.create(
+            name="Realtime Workspace",
+            project_path="/tmp/realtime",
+            metadata={"recent_activity": [], "schema": {"nodes": []}},
+        )
+        self.preset = TaskPreset.objects.create(
+            key="check-realtime",
+            label="Check",
+            description="Realtime test",
+            command="python manage.py check",
+        )
+
+    async def test_status_socket_pushes_full_payload_then_deltas(self) -> None:
+        communicator = WebsocketCommunicator(
+            self.application, f"/ws/workspaces/{self.workspace.slug}/"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        initial = await communicator.receive_json_from()
+        self.assertTrue(initial["full"])
+
+        run = await database_sync_to_async(WorkspaceTaskRun.objects.create)(
+            workspace=self.workspace, preset=self.preset
+        )
+        delta = await communicator.receive_json_from(timeout=2)
+        self.assertFalse(delta["full"])
+        self.assertEqual([task["id"] for task in delta["tasks"]], [run.pk])
+        await communicator.disconnect()
+
+    async def test_task_socket_streams_log_lines(self) -> None:
+        communicator = WebsocketCommunicator(
+            self.application, f"/ws/task-runs/{self.workspace.slug}/"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        run = await database_sync_to_async(WorkspaceTaskRun.objects.create)(
+            workspace=self.workspace, preset=self.preset
+        )
+        created = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(created["id"], run.pk)
+
+        def work() -> None:
+            run.append_log("Streaming line")
+            run.append_log("Second line")
+            run.flush_state()
+
+        # Lines are published once per flush, as the chunk the drawer can also fetch.
+        with mock.patch(
+            "djdesk.inspector.realtime.publish_task_event",
+            wraps=realtime.publish_task_event,
+        ) as publish:
+            await database_sync_to_async(work)()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual((event["id"], event["seq"]), (run.pk, 1))
+        self.assertIn("Streaming line", event["log_line"])
+        self.assertIn("Second line", event["log_line"])
+        self.assertEqual(publish.call_count, 1)
+        await communicator.disconnect()
+
+    @override_settings(INSPECTOR_TASK_STREAM_POLL_INTERVAL=0.05)
+    async def test_task_socket_relays_chunks_written_by_other_processes(self) -> None:
+        run = await database_sync_to_async(WorkspaceTaskRun.objects.create)(
+            workspace=self.workspace, preset=self.preset
+        )
+        communicator = WebsocketCommunicator(
+            self.application, f"/ws/task-runs/{self.workspace.slug}/"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        def work() -> None:
+            run.stage(status=WorkspaceTaskRun.Status.RUNNING, progress=40)
+            run.append_log("Worker line")
+            run.flush_state()
+
+        # A db_worker publishes into its own channel layer, which this socket never sees.
+        with mock.patch("djdesk.inspector.realtime.publish_task_event"):
+            await database_sync_to_async(work)()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual((event["id"], event["seq"]), (run.pk, 1))
+        self.assertEqual((event["status"], event["progress"]), ("running", 40))
+        self.assertIn("Worker line", event["log_line"])
+        self.assertTrue(await communicator.receive_nothing(timeout=0.2))
+        await communicator.disconnect()
+
+    async def test_unknown_workspace_is_rejected(self) -> None:
+        communicator = WebsocketCommunicator(self.application, "/ws/workspaces/missing/")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+
+class TaskBatchTests(TestCase):
+    def setUp(self) -> None:
+        self.repo = Workspace.objects.create(
+            name="Repo Workspace", project_path=str(Path(__file__).resolve().parents[1])
+        )
+        self.missing = Workspace.objects.create(name="Gone", project_path="/tmp/djdesk-gone")
+        self.preset = TaskPreset.objects.get(key="check")
+
+    def test_batch_api_fans_out_and_aggregates(self) -> None:
+        client = Client()
+        response = client.post(
+            reverse("inspector:task-batch-create"),
+            data={
+                "preset": "check",
+                "workspaces": [self.repo.slug, self.missing.slug],
+                "confirm_safe": "on",
+            },
+        )
+
+        self.assertEqual(response.status_code, 202)
+        summary = response.json()
+        self.assertTrue(summary["done"])
+        self.assertEqual(summary["total"], 2)
+        self.assertEqual(summary["statuses"], {"succeeded": 1, "failed": 1})
+        self.assertEqual(summary["exit_codes"], {"0": 1})
+        self.assertEqual([failure["workspace"] for failure in summary["failures"]], ["gone"])
+        run = WorkspaceTaskRun.objects.get(pk=summary["runs"][1]["id"])
+        self.assertEqual(run.metadata["scheduler"]["priority"], 49)
+
+        detail = client.get(reverse("inspector:task-batch-detail", args=[summary["batch"]]))
+        self.assertEqual(detail.json()["runs"], summary["runs"])
+        missing = client.get(reverse("inspector:task-batch-detail", args=["unknown"]))
+        self.assertEqual(missing.status_code, 404)
+
+        invalid = client.post(
+            reverse("inspector:task-batch-create"), data={"preset": "check", "confirm_safe": "on"}
+        )
+        self.assertIn("workspaces", invalid.json()["errors"])
+
+    def test_command_reports_summary_and_failures(self) -> None:
+        stdout = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 run(s) failed."):
+            call_command(
+                "run_task_batch",
+                "check",
+                workspace=[self.repo.slug, self.missing.slug],
+                stdout=stdout,
+                stderr=StringIO(),
+            )
+
+        output = stdout.getvalue()
+        self.assertIn("2 run(s), 1 failed, 1 succeeded", output)
+        self.assertEqual(WorkspaceTaskRun.objects.filter(requested_by="inspector-cli").count(), 2)
+
+        with self.assertRaisesMessage(CommandError, "Unknown workspaces: nope."):
+            call_command("run_task_batch", "check", workspace=["nope"])
+
+
+class OutputParserTests(TestCase):
+    def _parse(self, parser, text: str) -> dict:
+        for line in text.splitlines():
+            parser.feed(line)
+        return parser.result()
+
+    def test_incomplete_parser_fails_on_creation(self) -> None:
+        class FeedOnly(OutputParser):
+            kind = "feed-only"
+
+            def feed(self, line: str) -> None:
+                pass
+
+        with self.assertRaises(TypeError):
+            FeedOnly()
+
+    def test_showmigrations_list_and_plan(self) -> None:
+        listed = self._parse(
+            ShowMigrationsParser(),
+            "core\n [X] 0001_initial\n [ ] 0002_add_index\nauth\n (no migrations)\n",
+        )
+        self.assertEqual(
+            listed["apps"],
+            {
+                "core": {"applied": ["0001_initial"], "unapplied": ["0002_add_index"]},
+                "auth": {"applied": [], "unapplied": []},
+            },
+        )
+        self.assertEqual((listed["applied"], listed["unapplied"]), (1, 1))
+
+        plan = self._parse(ShowMigrationsParser(), "[X]  core.0001_initial\n[ ]  core.0002_x\n")
+        self.assertEqual(plan["apps"]["core"]["unapplied"], ["0002_x"])
+
+    def test_crashed_commands_record_no_insights(self) -> None:
+        crashed = self._parse(
+            ShowMigrationsParser(),
+            "Traceback (most recent call last):\n"
+            '  File "manage.py", line 3, in <module>\n'
+            "ModuleNotFoundError: No module named 'shop'\n",
+        )
+        self.assertEqual(crashed["apps"], {})
+        check = self._parse(CheckParser(), "Traceback (most recent call last):\n")
+
+        parsed = {"showmigrations": crashed, "check": check}
+        self.assertEqual(trusted_results(parsed, 1), {})
+        self.assertEqual(trusted_results(parsed, 0), parsed)
+        check = self._parse(CheckParser(), "System check identified 1 issue (0 silenced).\n")
+        self.assertEqual(trusted_results({**parsed, "check": check}, 1), {"check": check})
+
+    def test_check_collects_levels_ids_and_hints(self) -> None:
+        result = self._parse(
+            CheckParser(),
+            "System check identified some issues:\n\n"
+            "ERRORS:\n"
+            "shop.Order.total: (fields.E130) DecimalFields must define a 'decimal_places'.\n"
+            "WARNINGS:\n"
+            "?: (security.W004) You have not set SECURE_HSTS_SECONDS.\n"
+            "\tHINT: Set it once HTTPS works.\n\n"
+            "System check identified 2 issues (1 silenced).\n",
+        )
+        self.assertEqual(result["counts"], {"error": 1, "warning": 1})
+        self.assertEqual(result["silenced"], 1)
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["messages"][0]["object"], "shop.Order.total")
+        self.assertEqual(result["messages"][1]["id"], "security.W004")
+        self.assertEqual(result["messages"][1]["hint"], "Set it once HTTPS works.")
+
+        insight = parsed_insights({"check": result}, {})[0]
+        self.assertEqual((insight["value"], insight["severity"]), ("2", "danger"))
+
+    def test_diffsettings_hash_and_unified_output(self) -> None:
+        hashed = self._parse(
+            DiffSettingsParser(),
+            "DEBUG = True\nMY_FLAG = 'on'  ###\n###USE_TZ = True\n",
+        )
+        self.assertEqual(hashed["settings"], {"DEBUG": "True", "MY_FLAG": "'on'"})
+        self.assertEqual(hashed["custom"], ["MY_FLAG"])
+
+        unified = self._parse(DiffSettingsParser(), "- DEBUG = False\n+ DEBUG = True\n")
+        self.assertEqual(unified["settings"], {"DEBUG": "True"})
+        self.assertEqual(unified["defaults"], {"DEBUG": "False"})
+
+
+class TaskPipelineTests(TestCase):
+    MANAGE_PY = (
+        "import os, sys\n"
+        "command = sys.argv[1]\n"
+        "if command == 'showmigrations':\n"
+        "    print('core')\n"
+        "    print(' [X] 0001_initial')\n"
+        "    print(' [ ] 0002_add_index')\n"
+        "    print('billing')\n"
+        "    print(' [ ] 0001_initial')\n"
+        "    sys.exit(1 if os.path.exists('broken') else 0)\n"
+        "elif command == 'sqlmigrate':\n"
+        "    print(f'BEGIN; -- {sys.argv[2]}.{sys.argv[3]}')\n"
+        "else:\n"
+        "    print(f'{command} ok')\n"
+    )
+
+    def _workspace(self, name: str, *, broken: bool = False) -> Workspace:
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        root = Path(tmpdir.name)
+        (root / "manage.py").write_text(self.MANAGE_PY)
+        if broken:
+            (root / "broken").touch()
+        return Workspace.objects.create(name=name, project_path=str(root))
+
+    def _start(self, workspace: Workspace) -> dict:
+        response = Client().post(
+            reverse("inspector:task-pipeline-create"),
+            data={"workspace": workspace.slug, "pipeline": "predeploy", "confirm_safe": "on"},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_predeploy_pipeline_fans_out_sqlmigrate(self) -> None:
+        payload = self._start(self._workspace("Audit"))
+
+        self.assertEqual(payload["status"], "succeeded")
+        steps = {step["key"]: step for step in payload["steps"]}
+        self.assertEqual({step["state"] for step in steps.values()}, {"succeeded"})
+        self.assertEqual(
+            [run["command"] for run in steps["sqlmigrate"]["runs"]],
+            [
+                "python manage.py sqlmigrate core 0002_add_index",
+                "python manage.py sqlmigrate billing 0001_initial",
+            ],
+        )
+        run = WorkspaceTaskRun.objects.get(pk=steps["sqlmigrate"]["runs"][1]["id"])
+        self.assertIn("BEGIN; -- billing.0001_initial", run.log)
+        insights = {insight["title"]: insight for insight in run.workspace.insights}
+        pending = insights["Pending migrations"]
+        self.assertEqual((pending["value"], pending["caption"]), ("2", "core · billing"))
+
+        detail = Client().get(reverse("inspector:task-pipeline-detail", args=[payload["id"]]))
+        self.assertEqual(detail.json()["steps"], payload["steps"])
+
+    def test_failed_step_skips_its_dependents_only(self) -> None:
+        payload = self._start(self._workspace("Broken", broken=True))
+
+        states = {step["key"]: step["state"] for step in payload["steps"]}
+        self.assertEqual(payload["status"], "failed")
+        self.assertEqual(
+            states,
+            {
+                "check": "succeeded",
+                "diffsettings": "succeeded",
+                "showmigrations": "failed",
+                "sqlmigrate": "skipped",
+            },
+        )
+
+    @override_settings(
+        INSPECTOR_TASK_PIPELINES={
+            "loop": {
+                "label": "Loop",
+                "steps": [
+                    {"key": "a", "preset": "check", "after": ["b"]},
+                    {"key": "b", "preset": "check", "after": ["a"]},
+                ],
+            }
+        }
+    )
+    def test_rejects_cyclic_pipelines(self) -> None:
+        with self.assertRaisesMessage(PipelineError, "dependency cycle"):
+            pipeline_definition("loop")
+
+
+class FixtureExportTests(TestCase):
+    MANAGE_PY = (
+        "import os, sys\n"
+        "label = sys.argv[2]\n"
+        "with open('dumped.txt', 'a') as log:\n"
+        "    log.write(label + '\\n')\n"
+        "if os.path.exists(f'fail-{label}'):\n"
+        "    sys.exit(f'CommandError: Unknown model: {label}')\n"
+        "rows = 3 if label == 'shop.Order' else 2\n"
+        "for pk in range(rows):\n"
+        "    print('{\"model\": \"%s\", \"pk\": %d}' % (label.lower(), pk))\n"
+    )
+
+    def setUp(self) -> None:
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        (self.root / "manage.py").write_text(self.MANAGE_PY)
+        workspace = Workspace.objects.create(
+            name="Shop",
+            project_path=str(self.root),
+            metadata={
+                "schema": {
+                    "nodes": [
+                        {"name": "Order", "badge": "shop"},
+                        {"name": "Customer", "badge": "shop"},
+                    ]
+                }
+            },
+        )
+        self.job = workspace.scans.create(kind=ScanJob.Kind.FIXTURES, summary="Export")
+
+    def _run(self) -> dict:
+        response = Client().post(reverse("inspector:scan-run", args=[self.job.pk]))
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_exports_each_model_to_gzip_and_resumes_failures(self) -> None:
+        (self.root / "fail-shop.Customer").touch()
+        payload = self._run()
+
+        self.assertEqual(payload["status"], "failed")
+        fixtures = payload["details"]["fixtures"]
+        self.assertIn("Unknown model: shop.Customer", fixtures["models"]["shop.Customer"]["error"])
+        order = fixtures["models"]["shop.Order"]
+        self.assertEqual((order["status"], order["rows"]), ("done", 3))
+        path = Path(fixtures["directory"]) / order["file"]
+        with gzip.open(path, "rt") as fixture:
+            self.assertEqual(len(fixture.read().splitlines()), 3)
+        self.assertEqual(order["compressed_bytes"], path.stat().st_size)
+        self.assertFalse(list(Path(fixtures["directory"]).glob("*.part")))
+
+        (self.root / "fail-shop.Customer").unlink()
+        payload = self._run()
+
+        fixtures = payload["details"]["fixtures"]
+        self.assertEqual(payload["status"], "completed")
+        self.assertEqual(payload["progress"], 100)
+        self.assertEqual(fixtures["resumed"], 1)
+        self.assertEqual(fixtures["models"]["shop.Order"], order)
+        self.assertEqual((fixtures["totals"]["exported"], fixtures["totals"]["rows"]), (2, 5))
+        self.assertIn("2/2 models · 5 rows", payload["summary"])
+
+        self.job.delete()
+        self.assertFalse(Path(fixtures["directory"]).exists())
+
+    def test_reexports_only_models_whose_tables_changed(self) -> None:
+        with closing(sqlite3.connect(self.root / "db.sqlite3")) as connection, connection:
+            connection.execute("CREATE TABLE shop_order (id INTEGER PRIMARY KEY, total REAL)")
+            connection.execute("CREATE TABLE shop_customer (id INTEGER PRIMARY KEY, name TEXT)")
+            connection.execute("INSERT INTO shop_order (total) VALUES (9.5)")
+        first = self._run()
+        self.assertTrue(first["details"]["fixtures"]["models"]["shop.Order"]["fingerprint"])
+
+        def export_again() -> dict:
+            (self.root / "dumped.txt").unlink(missing_ok=True)
+            self.job = self.job.workspace.scans.create(kind=ScanJob.Kind.FIXTURES, summary="Export")
+            return self._run()["details"]["fixtures"]
+
+        fixtures = export_again()
+        self.assertEqual(fixtures["unchanged"], 2)
+        self.assertFalse((self.root / "dumped.txt").exists())
+        self.assertEqual(fixtures["models"]["shop.Order"]["reused_from"], first["id"])
+        self.assertTrue((Path(fixtures["directory"]) / "shop.Order.jsonl.gz").exists())
+
+        with closing(sqlite3.connect(self.root / "db.sqlite3")) as connection, connection:
+            connection.execute("UPDATE shop_order SET total = 10 WHERE id = 1")
+        fixtures = export_again()
+        self.assertEqual(fixtures["unchanged"], 1)
+        self.assertEqual((self.root / "dumped.txt").read_text(), "shop.Order\n")
+
+    def test_reexports_models_whose_referenced_rows_changed(self) -> None:
+        with closing(sqlite3.connect(self.root / "db.sqlite3")) as connection, connection:
+            connection.execute("CREATE TABLE shop_customer (id INTEGER PRIMARY KEY, name TEXT)")
+            connection.execute(
+                "CREATE TABLE shop_order (id INTEGER PRIMARY KEY, "
+                "customer_id INTEGER REFERENCES shop_customer (id))"
+            )
+            connection.execute("INSERT INTO shop_customer (name) VALUES ('ada')")
+            connection.execute("INSERT INTO shop_order (customer_id) VALUES (1)")
+        self._run()
+
+        # The order fixture holds the customer's natural key, so renaming it changes both.
+        with closing(sqlite3.connect(self.root / "db.sqlite3")) as connection, connection:
+            connection.execute("UPDATE shop_customer SET name = 'grace' WHERE id = 1")
+        (self.root / "dumped.txt").unlink()
+        self.job = self.job.workspace.scans.create(kind=ScanJob.Kind.FIXTURES, summary="Export")
+        fixtures = self._run()["details"]["fixtures"]
+        self.assertEqual(fixtures["unchanged"], 0)
+        self.assertEqual(
+            sorted((self.root / "dumped.txt").read_text().split()), ["shop.Customer", "shop.Order"]
+        )
+
+    def test_rejects_running_and_unsupported_scans(self) -> None:
+        ScanJob.objects.filter(pk=self.job.pk).update(status=ScanJob.Status.RUNNING)
+        response = Client().post(reverse("inspector:scan-run", args=[self.job.pk]))
+        self.assertEqual(response.status_code, 409)
+
+        logs = self.job.workspace.scans.create(kind=ScanJob.Kind.LOGS, summary="Logs")
+        response = Client().post(reverse("inspector:scan-run", args=[logs.pk]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_model_labels_that_are_not_identifiers(self) -> None:
+        url = reverse("inspector:scan-run", args=[self.job.pk])
+        for label in ("shop.Order --output=/x", "../x", "shop/Order", "shop.Order\n"):
+            response = Client().post(url, data={"models": ["shop.Order", label]})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(repr(label), response.json()["errors"]["models"][0])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ScanJob.Status.PENDING)
+        self.assertNotIn("models", self.job.details)
+
+    def test_engine_crash_fails_the_job(self) -> None:
+        crash = mock.Mock(side_effect=OSError("disk full"))
+        with (
+            mock.patch.dict("djdesk.inspector.tasks.SCAN_ENGINES", {ScanJob.Kind.FIXTURES: crash}),
+            self.assertLogs("djdesk.inspector.tasks", "ERROR"),
+        ):
+            payload = self._run()
+
+        self.assertEqual(payload["status"], "failed")
+        self.assertEqual(payload["summary"], "Fixture export failed: OSError: disk full")
+        # Not left RUNNING, so a plain rerun is accepted.
+        self.assertEqual(self._run()["status"], "completed")
+
+
+class SchemaIngestTests(TestCase):
+    FILES = {
+        "manage.py": (
+            "import os, sys\n"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')\n"
+            "from django.core.management import execute_from_command_line\n"
+            "execute_from_command_line(sys.argv)\n"
+        ),
+        "settings.py": (
+            "SECRET_KEY = 'x'\n"
+            "INSTALLED_APPS = [\n"
+            "    'django.contrib.contenttypes', 'django.contrib.auth', 'shop', 'blog'\n"
+            "]\n"
+            "DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'\n"
+        ),
+        "shop/__init__.py": "",
+        "shop/models.py": (
+            "from django.db import models\n"
+            "class Customer(models.Model):\n"
+            "    name = models.CharField(max_length=20)\n"
+            "class Order(models.Model):\n"
+            "    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)\n"
+            "    groups = models.ManyToManyField('auth.Group')\n"
+        ),
+        "blog/__init__.py": "",
+        "blog/models.py": (
+            "from django.db import models\n"
+            "class Post(models.Model):\n"
+            "    author = models.ForeignKey('auth.User', on_delete=models.CASCADE)\n"
+        ),
+    }
+
+    def setUp(self) -> None:
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        for name, content in self.FILES.items():
+            (self.root / name).parent.mkdir(exist_ok=True)
+            (self.root / name).write_text(content)
+        self.workspace = Workspace.objects.create(name="Blog", project_path=str(self.root))
+
+    def _scan(self) -> dict:
+        job = self.workspace.scans.create(kind=ScanJob.Kind.SCHEMA, summary="Schema")
+        response = Client().post(reverse("inspector:scan-run", args=[job.pk]))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "completed")
+        return response.json()["details"]["schema"]["stats"]
+
+    @override_settings(INSPECTOR_SCHEMA_STATIC=False)
+    def test_builds_graph_and_reintrospects_all_apps_after_a_change(self) -> None:
+        stats = self._scan()
+        self.assertEqual((stats["apps"], stats["introspected_apps"]), (4, 4))
+        self.workspace.refresh_from_db()
+        graph = self.workspace.schema_graph
+        nodes = {node["label"]: node for node in graph["nodes"]}
+        self.assertEqual(nodes["shop.Order"]["fields"], ["id", "customer", "groups"])
+        self.assertEqual(nodes["shop.Order"]["relations"], ["Customer", "Group"])
+        self.assertIn(
+            {"source": "Order", "target": "Customer", "field": "customer", "kind": "fk"},
+            graph["connections"],
+        )
+
+        stats = self._scan()
+        self.assertEqual((stats["introspected_apps"], stats["probe_seconds"]), (0, None))
+
+        with (self.root / "blog" / "models.py").open("a") as models_py:
+            models_py.write("    title = models.CharField(max_length=20)\n")
+        stats = self._scan()
+        self.assertEqual((stats["introspected_apps"], stats["cached_apps"]), (4, 0))
+        self.workspace.refresh_from_db()
+        post = next(n for n in self.workspace.schema_graph["nodes"] if n["label"] == "blog.Post")
+        self.assertEqual(post["fields"], ["id", "author", "title"])
+
+        # blog's models depend on shop's sources: changing only shop re-describes blog too.
+        (self.root / "blog" / "models.py").write_text(
+            "from django.db import models\n"
+            "from shop.models import Stamped\n"
+            "class Post(Stamped):\n"
+            "    title = models.CharField(max_length=20)\n"
+        )
+        with (self.root / "shop" / "models.py").open("a") as models_py:
+            models_py.write(
+                "class Stamped(models.Model):\n"
+                "    note = models.TextField(blank=True)\n"
+                "    class Meta:\n"
+                "        abstract = True\n"
+            )
+        self._scan()
+        with (self.root / "shop" / "models.py").open("a") as models_py:
+            models_py.write("    created = models.DateTimeField(null=True)\n")
+        stats = self._scan()
+        self.assertEqual(stats["introspected_apps"], 4)
+        self.workspace.refresh_from_db()
+        post = next(n for n in self.workspace.schema_graph["nodes"] if n["label"] == "blog.Post")
+        self.assertEqual(post["fields"], ["id", "note", "created", "title"])
+
+    def test_static_extraction_resolves_relations_and_abstract_fields(self) -> None:
+        (self.root / "shop" / "models.py").write_text(
+            "from django.db import models\n"
+            "from django.conf import settings\n"
+            "class Stamped(models.Model):\n"
+            "    created = models.DateTimeField()\n"
+            "    parent = models.ForeignKey('self', null=True, on_delete=models.CASCADE)\n"
+            "    class Meta:\n"
+            "        abstract = True\n"
+            "class Customer(Stamped):\n"
+            "    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)\n"
+            "class Order(Stamped):\n"
+            "    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)\n"
+            "    posts = models.ManyToManyField('blog.post')\n"
+            "    class Meta:\n"
+            "        db_table = 'orders'\n"
+        )
+        with mock.patch("djdesk.inspector.schema_ingest.run_probe") as run_probe:
+            stats = self._scan()
+        run_probe.assert_not_called()
+        self.assertEqual((stats["source"], stats["static_files"]), ("static", 2))
+        self.workspace.refresh_from_db()
+        nodes = {node["label"]: node for node in self.workspace.schema_graph["nodes"]}
+        # Site-packages apps are not parsed; their relation targets stay in the graph.
+        self.assertEqual(set(nodes), {"shop.Customer", "shop.Order", "blog.Post", "auth.User"})
+        order = nodes["shop.Order"]
+        self.assertEqual(order["fields"], ["id", "created", "parent", "customer", "posts"])
+        self.assertEqual(order["table"], "orders")
+        self.assertEqual(order["relations"], ["Order", "Customer", "Post"])
+        self.assertEqual(nodes["shop.Customer"]["relations"], ["Customer", "User"])
+
+        static_models = self.FILES["blog/models.py"]
+        (self.root / "blog" / "models.py").write_text(
+            "from django.db import models\n"
+            "from django.contrib.auth.models import AbstractUser\n"
+            "class Post(models.Model):\n"
+            "    title = models.CharField(max_length=20)\n"
+            "class Author(AbstractUser):\n"
+            "    bio = models.TextField()\n"
+        )
+        stats = self._scan()
+        self.assertEqual((stats["source"], stats["introspected_apps"]), ("runtime", 4))
+        self.assertIn("blog.models.Author: base class AbstractUser", stats["static_issues"][0])
+
+        # Back on the static path, the probe's descriptions of external apps are merged in.
+        (self.root / "blog" / "models.py").write_text(static_models)
+        stats = self._scan()
+        self.assertEqual((stats["source"], stats["cached_apps"]), ("static", 2))
+        self.workspace.refresh_from_db()
+        nodes = {node["label"]: node for node in self.workspace.schema_graph["nodes"]}
+        self.assertIn("contenttypes.ContentType", nodes)
+        self.assertIn("password", nodes["auth.User"]["fields"])
+
+    def test_parse_all_spreads_large_batches_over_a_process_pool(self) -> None:
+        paths = [str(self.root / "shop" / "models.py"), str(self.root / "blog" / "models.py")]
+        inline = static_schema.parse_all(paths, workers=2)
+        with (
+            mock.patch.object(static_schema, "POOL_MIN_BYTES", 0),
+            mock.patch.object(
+                static_schema, "ProcessPoolExecutor", wraps=static_schema.ProcessPoolExecutor
+            ) as pool,
+        ):
+            pooled = static_schema.parse_all(paths, workers=2)
+        pool.assert_called_once()
+        self.assertEqual(pooled, inline)
+        self.assertEqual([cls["name"] for cls in pooled[0]["classes"]], ["Customer", "Order"])
+
+
+@override_settings(INSPECTOR_MIGRATION_SQUASH_THRESHOLD=3)
+class MigrationDiffTests(TestCase):
+    MIGRATIONS = {
+        "0001_initial": "[('auth', '0012_alter_user_first_name_max_length')]",
+        "0002_order": "[('shop', '0001_initial'), migrations.swappable_dependency(settings.X)]",
+        "0003_price": "[('shop', '0002_order')]",
+        "0004_stock": "[('shop', '0003_price')]",
+        "0003_squashed_0004": "[('shop', '0002_order')]",
+    }
+
+    def setUp(self) -> None:
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        (self.root / "manage.py").write_text(
+            "import os\nos.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')\n"
+        )
+        (self.root / "settings.py").write_text("INSTALLED_APPS = ['django.contrib.auth', 'shop']\n")
+        migrations = self.root / "shop" / "migrations"
+        migrations.mkdir(parents=True)
+        (self.root / "shop" / "__init__.py").write_text("")
+        (migrations / "__init__.py").write_text("")
+        for name, dependencies in self.MIGRATIONS.items():
+            replaces = ""
+            if "squashed" in name:
+                replaces = "    replaces = [('shop', '0003_price'), ('shop', '0004_stock')]\n"
+            (migrations / f"{name}.py").write_text(
+                "from django.conf import settings\n"
+                "from django.db import migrations\n"
+                "class Migration(migrations.Migration):\n"
+                f"    dependencies = {dependencies}\n{replaces}"
+                "    operations = [migrations.RunPython(migrations.RunPython.noop)]\n"
+            )
+        with closing(sqlite3.connect(self.root / "db.sqlite3")) as connection:
+            connection.execute("CREATE TABLE django_migrations (app TEXT, name TEXT)")
+            connection.executemany(
+                "INSERT INTO django_migrations VALUES (?, ?)",
+                [("shop", "0001_initial"), ("shop", "0002_order")],
+            )
+            connection.commit()
+        self.workspace = Workspace.objects.create(name="Shop", project_path=str(self.root))
+
+    def _scan(self) -> dict:
+        job = self.workspace.scans.create(kind=ScanJob.Kind.MIGRATIONS, summary="Migrations")
+        response = Client().post(reverse("inspector:scan-run", args=[job.pk]))
+        self.assertEqual(response.json()["status"], "completed")
+        return response.json()["details"]["migrations"]
+
+    def test_first_and_latest_resolve_to_graph_roots_and_leaves(self) -> None:
+        def migration(app: str, name: str, *dependencies: list[str]) -> dict:
+            return {
+                "app": app,
+                "name": name,
+                "dependencies": list(dependencies),
+                "replaces": [],
+                "run_before": [],
+                "initial": not dependencies,
+                "operations": [],
+            }
+
+        nodes = resolve_graph(
+            [
+                migration("shop", "initial"),
+                migration("shop", "add_price", ["shop", "initial"]),
+                migration("blog", "0001_initial", ["shop", "__first__"]),
+                migration("blog", "0002_more", ["blog", "0001_initial"], ["shop", "__latest__"]),
+            ],
+            "auth.User",
+        )
+        self.assertEqual(nodes["blog.0001_initial"]["dependencies"], ["shop.initial"])
+        self.assertEqual(
+            nodes["blog.0002_more"]["dependencies"], ["blog.0001_initial", "shop.add_price"]
+        )
+
+    def test_computes_pending_migrations_and_reparses_changed_files_only(self) -> None:
+        result = self._scan()
+        self.assertEqual(result["plan"], ["shop.0003_squashed_0004"])
+        self.assertEqual(
+            result["apps"]["shop"],
+            {"migrations": 3, "applied": 2, "pending": ["0003_squashed_0004"]},
+        )
+        self.assertEqual((result["stats"]["parsed_files"], result["issues"]), (5, []))
+        self.workspace.refresh_from_db()
+        self.assertEqual(
+            self.workspace.app_overview[0],
+            {
+                "label": "shop",
+                "models": 0,
+                "pending_migrations": 1,
+                "migrations": 3,
+                "status": "warning",
+            },
+        )
+
+        with closing(sqlite3.connect(self.root / "db.sqlite3")) as connection:
+            connection.execute("INSERT INTO django_migrations VALUES ('shop', '0003_price')")
+            connection.commit()
+        path = self.root / "shop" / "migrations" / "0004_stock.py"
+        path.write_text(path.read_text().replace("'0003_price'", "'0002_order'"))
+        result = self._scan()
+        # Partially applied squash: the replaced migrations are used instead.
+        self.assertEqual(result["plan"], ["shop.0004_stock"])
+        stats = result["stats"]
+        self.assertEqual((stats["parsed_files"], stats["cached_files"]), (1, 4))
+
+        # 0003_price and 0004_stock now both follow 0002_order: two leaves.
+        url = reverse("inspector:workspace-migrations", args=[self.workspace.slug])
+        graph = Client().get(url).json()
+        self.assertEqual(graph["conflicts"], {"shop": ["0003_price", "0004_stock"]})
+        self.assertEqual(
+            graph["critical_path"]["path"],
+            ["shop.0001_initial", "shop.0002_order", "shop.0004_stock"],
+        )
+        self.assertEqual(graph["squash_candidates"], ["shop"])
+        app = Client().get(url, {"app": "shop"}).json()
+        self.assertEqual((app["pending"], app["conflict"], app["chain"]), (1, True, 3))
+        self.assertEqual(Client().get(url, {"app": "blog"}).status_code, 404)
+        self.workspace.refresh_from_db()
+        cards = {card["title"]: card for card in self.workspace.insights}
+        self.assertEqual(cards["Migration conflicts"]["severity"], "danger")
+        self.assertEqual(cards["Pending workspace migrations"]["delta"], "unchanged")
+        self.assertNotIn("Pending migrations", cards)
+        self.assertEqual(self.workspace.app_overview[0]["status"], "danger")
+
+    def test_sql_plan_is_precomputed_and_cached_by_file_content(self) -> None:
+        (self.root / "manage.py").write_text(
+            "import os, sys\n"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')\n"
+            "with open('calls.txt', 'a') as calls:\n"
+            "    calls.write(' '.join(sys.argv[1:]) + '\\n')\n"
+            "print(f'CREATE TABLE \"{sys.argv[2]}_{sys.argv[3]}\" (id integer);')\n"
+        )
+        migrations = self.root / "shop" / "migrations"
+        (migrations / "0005_note.py").write_text(
+            (migrations / "0004_stock.py").read_text().replace("0003_price", "0004_stock")
+        )
+        calls = self.root / "calls.txt"
+        url = reverse("inspector:workspace-sql-plan", args=[self.workspace.slug])
+        compute_url = reverse("inspector:workspace-sql-plan-compute", args=[self.workspace.slug])
+        with self.settings(INSPECTOR_SQL_PLAN_ROOT=self.root / "plans"):
+            self.assertEqual(Client().get(url).status_code, 404)
+            self._scan()
+            self.assertEqual(
+                calls.read_text().splitlines(),
+                ["sqlmigrate shop 0003_squashed_0004", "sqlmigrate shop 0005_note"],
+            )
+
+            response = Client().get(url)
+            self.assertEqual(response.status_code, 200)
+            plan = response.json()
+            self.assertEqual(
+                plan["stats"],
+                {"migrations": 2, "cached": 2, "computed": 0, "pending": 0, "failed": 0},
+            )
+            self.assertEqual(
+                plan["sql"].split("\n\n")[0],
+                '-- shop.0003_squashed_0004\nCREATE TABLE "shop_0003_squashed_0004" (id integer);',
+            )
+            self.assertEqual(Client().post(compute_url, {"refresh": "1"}).status_code, 202)
+            self.assertEqual(len(calls.read_text().splitlines()), 4)
+            # Queueing a refresh keeps the cached SQL readable until the task replaces it.
+            with mock.patch("djdesk.inspector.views.precompute_sql_plan"):
+                Client().post(compute_url, {"refresh": "1"})
+            self.assertEqual(Client().get(url).json()["stats"]["cached"], 2)
+
+            # Editing the squash changes the key of 0005_note, which applies on top of it.
+            squash = migrations / "0003_squashed_0004.py"
+            squash.write_text(squash.read_text() + "# reviewed\n")
+            self._scan()
+            self.assertEqual(len(calls.read_text().splitlines()), 6)
+
+            # GET only reads the cache; POST queues the missing plans once.
+            shutil.rmtree(self.root / "plans")
+            with mock.patch("djdesk.inspector.views.precompute_sql_plan") as precompute:
+                plan = Client().get(url).json()
+                self.assertEqual(
+                    [(e["status"], e["queued"]) for e in plan["migrations"]],
+                    [("pending", False), ("pending", False)],
+                )
+                precompute.using.assert_not_called()
+                responses = [Client().post(compute_url) for _ in range(2)]
+            self.assertEqual([r.status_code for r in responses], [202, 200])
+            self.assertEqual(
+                [entry["queued"] for entry in responses[1].json()["migrations"]], [True, True]
+            )
+            precompute.using.return_value.enqueue.assert_called_once_with(self.workspace.pk, False)
+            self.assertEqual(len(calls.read_text().splitlines()), 6)
+
+
+class RunInspectorWorkersCommandTests(TestCase):
+    @mock.patch("djdesk.inspector.management.commands.run_inspector_workers.signal.signal")
+    @mock.patch("djdesk.inspector.management.commands.run_inspector_workers.time.sleep")
+    @mock.patch("djdesk.inspector.management.commands.run_inspector_workers.subprocess.Popen")
+    def test_spawns_and_stops_db_workers(
+        self,
+        popen: mock.MagicMock,
+        sleep: mock.MagicMock,
+        signal_mock: mock.MagicMock,
+    ) -> None:
+        popen.return_value.poll.return_value = None
+        sleep.side_effect = KeyboardInterrupt
+
+        call_command("run_inspector_workers", workers=2, stdout=StringIO())
+
+        self.assertEqual(popen.call_count, 2)
+        self.assertIn("db_worker", popen.call_args.args[0])
+        self.assertEqual(popen.return_value.terminate.call_count, 2)
@@ -10,3 +10,12 @@ class SettingsTests(TestCase):
             settings.INSTALLED_APPS,
             msg="django.contrib.admin should be enabled by default.",
         )
+
+    def test_base_settings_queue_tasks_in_database(self) -> None:
+        """Request threads must not block on commands outside the test settings."""
+        from djdesk.settings import base
+
+        self.assertEqual(
+            base.TASKS["default"]["BACKEND"],
+            "django_tasks.backends.database.DatabaseBackend",
+        )